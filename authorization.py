@@ -0,0 +1,125 @@
+# authorization.py
+import asyncio
+
+import discord
+
+MEMO_KEY = "authorized"  # interaction.extras key holding the decision for that interaction
+
+
+class AuthorizationService:
+    """Answers utils.is_authorized from frozen allow-sets and cached per-member decisions.
+
+    Decisions are cached per (guild, user) and memoised on the interaction, so
+    the on_interaction gate, @app_commands.check and button callbacks share one
+    computation. Member role changes, role permission edits and permission list
+    edits drop the affected cache entries.
+    """
+
+    def __init__(self, client: discord.Client):
+        self.client = client
+        self.allowed_users: frozenset[int] = frozenset()
+        self.allowed_roles: frozenset[int] = frozenset()
+        self._decisions: dict[tuple[int, int], bool] = {}
+        self._edit_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.memo_hits = 0
+
+        client.add_listener(self._on_member_update, "on_member_update")
+        client.add_listener(self._on_member_remove, "on_member_remove")
+        client.add_listener(self._on_role_update, "on_guild_role_update")
+        client.add_listener(self._on_role_delete, "on_guild_role_delete")
+        client.add_listener(self._on_guild_update, "on_guild_update")
+
+    def load(self, permissions: dict):
+        """Swap in new allow-sets from a client.permissions dict and drop every cached decision."""
+        self.allowed_users = frozenset(permissions.get("allowed_users", []))
+        self.allowed_roles = frozenset(permissions.get("allowed_roles", []))
+        self._decisions = {}
+
+    # ─────────────────────────────────
+    # Checks
+    # ─────────────────────────────────
+    def _compute(self, user: discord.abc.User) -> bool:
+        if user.id in self.allowed_users:
+            return True
+        if not isinstance(user, discord.Member):
+            return False
+        if user.guild_permissions.administrator:
+            return True
+        return any(role.id in self.allowed_roles for role in user.roles)
+
+    def is_authorized(self, interaction: discord.Interaction) -> bool:
+        memo = interaction.extras.get(MEMO_KEY)
+        if memo is not None:
+            self.memo_hits += 1
+            return memo
+
+        user = interaction.user
+        if interaction.guild is None:
+            decision = self._compute(user)
+        else:
+            key = (interaction.guild.id, user.id)
+            decision = self._decisions.get(key)
+            if decision is None:
+                self.misses += 1
+                decision = self._decisions[key] = self._compute(user)
+            else:
+                self.hits += 1
+        interaction.extras[MEMO_KEY] = decision
+        return decision
+
+    # ─────────────────────────────────
+    # Permission list edits
+    # ─────────────────────────────────
+    async def set_allowed(self, kind: str, target_id: int, allowed: bool) -> bool:
+        """Grant or revoke a user/role; persists first, then swaps the allow-sets. Returns False if nothing changed."""
+        key = "allowed_users" if kind == "user" else "allowed_roles"
+        async with self._edit_lock:
+            previous = self.client.permissions
+            ids = list(previous[key])
+            if (target_id in ids) == allowed:
+                return False
+            ids = ids + [target_id] if allowed else [i for i in ids if i != target_id]
+            self.client.permissions = {**previous, key: ids}
+            try:
+                await self.client.save_permissions()
+            except Exception:
+                self.client.permissions = previous
+                raise
+            self.load(self.client.permissions)
+            return True
+
+    # ─────────────────────────────────
+    # Invalidation
+    # ─────────────────────────────────
+    def _drop_guild(self, guild_id: int):
+        self._decisions = {k: v for k, v in self._decisions.items() if k[0] != guild_id}
+
+    async def _on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            self._decisions.pop((after.guild.id, after.id), None)
+
+    async def _on_member_remove(self, member: discord.Member):
+        self._decisions.pop((member.guild.id, member.id), None)
+
+    async def _on_role_update(self, before: discord.Role, after: discord.Role):
+        if before.permissions != after.permissions:
+            self._drop_guild(after.guild.id)
+
+    async def _on_role_delete(self, role: discord.Role):
+        self._drop_guild(role.guild.id)
+
+    async def _on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        if before.owner_id != after.owner_id:
+            self._drop_guild(after.id)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memo_hits": self.memo_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cached": len(self._decisions),
+        }
@@ -0,0 +1,143 @@
+# benchmarks/bench_channel_policy.py
+"""Messages/sec of channel policy checks, old per-mode if/elif chain vs compiled bitmasks.
+
+Also checks that both give the same verdict for every (message, policy) pair.
+Run from the repo root: python benchmarks/bench_channel_policy.py
+"""
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.channel_policy import MODE_VIOLATIONS
+from content_flags import URL_PATTERN, classify, compile_policy
+
+MESSAGE_COUNT = 20000
+PREFIX = "!"
+POLICIES = [
+    (["no_links"], []),
+    (["text_only", "no_links"], []),
+    (["media_only"], []),
+    (["no_files", "no_stickers", "no_bot_commands"], []),
+    (["links_only", "no_media"], []),
+    (["custom"], ["text", "links"]),
+    (["no_text", "image_only"], []),
+    (["read_only"], []),
+    (["no_links", "locked"], []),
+]
+TEXTS = [
+    "", "looking for a cofounder", "check https://example.com", "https://a.io https://b.io",
+    "!rank", "launch day! https://producthunt.com/posts/x great feedback so far",
+]
+CONTENT_TYPES = ["image/png", "video/mp4", "application/pdf", None]
+
+
+def build_messages(count: int) -> list[SimpleNamespace]:
+    rng = random.Random(42)
+    messages = []
+    for _ in range(count):
+        attachments = [SimpleNamespace(content_type=rng.choice(CONTENT_TYPES)) for _ in range(rng.choice([0, 0, 0, 1, 2]))]
+        stickers = [object()] if rng.random() < 0.05 else []
+        messages.append(SimpleNamespace(content=rng.choice(TEXTS), attachments=attachments, stickers=stickers))
+    return messages
+
+
+def legacy_check(message, modes: list[str], custom_allowed: list[str]) -> str | None:
+    """The per-mode chain ChannelPolicy used before compiled policies."""
+    kinds = {a.content_type.split("/", 1)[0] for a in message.attachments if a.content_type}
+    has_images, has_videos = "image" in kinds, "video" in kinds
+    has_links = bool(URL_PATTERN.search(message.content))
+    for mode in modes:
+        failed = False
+        if mode == "text_only":
+            failed = bool(message.attachments or message.stickers)
+        elif mode == "image_only":
+            failed = not has_images
+        elif mode == "video_only":
+            failed = not has_videos
+        elif mode == "media_only":
+            failed = not (has_images or has_videos)
+        elif mode == "bot_commands_only":
+            failed = not message.content.startswith(PREFIX)
+        elif mode == "links_only":
+            failed = not has_links
+        elif mode == "no_links":
+            failed = has_links
+        elif mode == "no_files":
+            failed = bool(message.attachments)
+        elif mode == "no_bot_commands":
+            failed = message.content.startswith(PREFIX)
+        elif mode == "no_text":
+            failed = bool(message.content.strip())
+        elif mode == "no_images":
+            failed = has_images
+        elif mode == "no_videos":
+            failed = has_videos
+        elif mode == "no_media":
+            failed = has_images or has_videos
+        elif mode == "no_stickers":
+            failed = bool(message.stickers)
+        elif mode in ("read_only", "locked"):
+            failed = True
+        elif mode == "custom":
+            present = set()
+            text = message.content.strip()
+            if text:
+                if URL_PATTERN.search(text):
+                    present.add("links")
+                    if URL_PATTERN.sub("", text).strip():
+                        present.add("text")
+                else:
+                    present.add("text")
+            for att in message.attachments:
+                ct = att.content_type or ""
+                present.add("images" if ct.startswith("image/") else "videos" if ct.startswith("video/") else "files")
+            if message.stickers:
+                present.add("stickers")
+            failed = bool(present - set(custom_allowed))
+        if failed:
+            return MODE_VIOLATIONS[mode]
+    return None
+
+
+def bench(name: str, fn, messages: list) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        fn(message)
+    elapsed = time.perf_counter() - start
+    rate = len(messages) / elapsed
+    print(f"{name:<16} {rate:>12,.0f} msgs/sec  ({elapsed * 1000:.1f} ms)")
+    return rate
+
+
+def main():
+    messages = build_messages(MESSAGE_COUNT)
+    compiled = [compile_policy(modes, allowed) for modes, allowed in POLICIES]
+
+    def legacy(message):
+        for modes, allowed in POLICIES:
+            legacy_check(message, modes, allowed)
+
+    def masks(message):
+        # classify() runs once per message in the pipeline, so it is counted once here too
+        flags = classify(message, PREFIX)
+        for policy in compiled:
+            policy.violation(flags)
+
+    for message in messages:
+        flags = classify(message, PREFIX)
+        for (modes, allowed), policy in zip(POLICIES, compiled):
+            mode = policy.violation(flags)
+            assert legacy_check(message, modes, allowed) == (MODE_VIOLATIONS[mode] if mode else None), (message, modes)
+
+    print(f"{len(POLICIES)} policies per message, verdicts identical")
+    before = bench("if/elif chain", legacy, messages)
+    after = bench("compiled masks", masks, messages)
+    print(f"speedup          {after / before:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_keyword_matcher.py
+"""Messages/sec of the auto-moderation keyword checks, old loops vs KeywordMatcher.
+
+Run from the repo root: python benchmarks/bench_keyword_matcher.py
+
+On CPython 3.11 the matcher is only about 1.3-1.4x faster than the old loops.
+About half of its remaining time goes to the JOB_PATTERNS regex, which the old
+loops ran as well.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.moderation import BANNED_WORDS, DM_KEYWORDS, JOB_KEYWORDS, JOB_PATTERNS, MODERATION_MATCHER
+
+MESSAGE_COUNT = 20000
+FILLER = (
+    "hey team we just shipped the new onboarding flow and the early numbers look "
+    "great does anyone have advice on pricing for b2b saas in bangladesh thanks"
+).split()
+
+
+def build_messages(count: int) -> list[str]:
+    rng = random.Random(42)
+    keywords = JOB_KEYWORDS + DM_KEYWORDS + BANNED_WORDS
+    messages = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(5, 60))
+        # Roughly one message in ten trips a filter, like a busy general channel
+        if rng.random() < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        messages.append(" ".join(words))
+    return messages
+
+
+def legacy_scan(content_lower: str) -> tuple[bool, bool, bool]:
+    is_job = any(kw in content_lower for kw in JOB_KEYWORDS) or any(p.search(content_lower) for p in JOB_PATTERNS)
+    is_dm = any(kw in content_lower for kw in DM_KEYWORDS)
+    is_banned = any(word in content_lower for word in BANNED_WORDS)
+    return is_job, is_dm, is_banned
+
+
+def matcher_scan(content_lower: str) -> tuple[bool, bool, bool]:
+    hits = MODERATION_MATCHER.scan(content_lower)
+    return "job" in hits, "dm" in hits, "banned" in hits
+
+
+def bench(name: str, fn, messages: list[str]) -> float:
+    start = time.perf_counter()
+    for content in messages:
+        fn(content)
+    elapsed = time.perf_counter() - start
+    rate = len(messages) / elapsed
+    print(f"{name:<16} {rate:>12,.0f} msgs/sec  ({elapsed * 1000:.1f} ms)")
+    return rate
+
+
+def main():
+    messages = build_messages(MESSAGE_COUNT)
+    before = bench("legacy loops", legacy_scan, messages)
+    after = bench("KeywordMatcher", matcher_scan, messages)
+    print(f"speedup          {after / before:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,271 @@
 # cogs/auto_purge.py
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
+import asyncio
 import datetime
+import time
+import typing
+from outbound import Priority, channel_bucket
+
+# --- Configuration ---
+DEFAULT_PURGE_CHANNEL_NAME = "🤖bot-command"
+DEFAULT_MAX_AGE_HOURS = 27          # Seeded once per guild for the bot-command channel
+RETENTION_TICK_SECONDS = 60         # How often every policy channel gets a pass
+CHUNK_SIZE = 100                    # Messages fetched per step; also the bulk-delete maximum
+MAX_DELETES_PER_PASS = 500          # Keeps one channel's backlog from hogging a tick
+OLD_DELETES_PER_PASS = 20           # Messages past the bulk-delete cutoff are deleted one by one, slowly
+OLD_DELETE_INTERVAL_SECONDS = 1.5
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(hours=1)  # Discord's limit, with a margin
+COUNT_CHECK_SECONDS = 600           # How often the max-count boundary is re-measured
+
 
 class AutoPurge(commands.Cog):
+    """Rolling message retention for channels with a policy (max age and/or max count).
+
+    Each tick walks a channel's expired messages oldest first, starting from a
+    saved cursor, and deletes them in bulk chunks of up to 100. Messages older
+    than the 14-day bulk-delete cutoff can only be deleted one at a time, so a
+    few of them are trickled out per pass. Pinned messages are kept.
+    """
+
     def __init__(self, client):
         self.client = client
-        self.purge_channel_name = "🤖bot-command"
-        self.auto_purge_loop.start() # Background task shuru kora hocche
+        self.policies: dict[int, dict] = {}   # channel ID -> policy row
+        self.progress: dict[int, dict] = {}   # channel ID -> progress row
+        self._count_boundary: dict[int, tuple[float, int | None]] = {}  # channel ID -> (measured at, boundary ID)
+        self.last_errors: dict[int, str] = {}
 
-    def cog_unload(self):
-        self.auto_purge_loop.cancel() # Bot bondho hole task-o bondho hobe
+    async def cog_load(self):
+        store = self.client.store
+        self.policies = {row["channel_id"]: row for row in await store.retention_policies.all()}
+        self.progress = {row["channel_id"]: row for row in await store.retention_progress.all()}
+        self.retention_loop.start()
+
+    async def cog_unload(self):
+        self.retention_loop.cancel() # Bot bondho hole task-o bondho hobe
+
+    # ─────────────────────────────────
+    # Policies
+    # ─────────────────────────────────
+    async def _seed_defaults(self):
+        """Give each guild's bot-command channel the old daily-purge policy, once."""
+        store = self.client.store
+        for guild in self.client.guilds:
+            flag = f"retention:seeded:{guild.id}"
+            if await store.meta.get(flag):
+                continue
+            channel = self.client.resolver.text_channel(guild, DEFAULT_PURGE_CHANNEL_NAME)
+            if channel and channel.id not in self.policies:
+                await self.set_policy(channel, DEFAULT_MAX_AGE_HOURS, None, self.client.user.id)
+            await store.meta.upsert({"key": flag, "value": "1"})
 
-    @tasks.loop(hours=24) # Protidin ekbar ei function-ti cholbe
-    async def auto_purge_loop(self):
+    async def set_policy(self, channel: discord.TextChannel, max_age_hours: int | None, max_count: int | None, set_by: int):
+        row = {
+            "channel_id": channel.id,
+            "guild_id": channel.guild.id,
+            "max_age_hours": max_age_hours,
+            "max_count": max_count,
+            "set_by": set_by,
+            "set_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        self.policies[channel.id] = row
+        self._count_boundary.pop(channel.id, None)
+        await self.client.store.retention_policies.upsert(row)
+
+    async def remove_policy(self, channel_id: int) -> bool:
+        self._count_boundary.pop(channel_id, None)
+        self.progress.pop(channel_id, None)
+        if self.policies.pop(channel_id, None) is None:
+            return False
+        await self.client.store.retention_policies.delete(channel_id)
+        await self.client.store.retention_progress.delete(channel_id)
+        return True
+
+    # ─────────────────────────────────
+    # Retention passes
+    # ─────────────────────────────────
+    @tasks.loop(seconds=RETENTION_TICK_SECONDS)
+    async def retention_loop(self):
+        for channel_id, policy in list(self.policies.items()):
+            channel = self.client.get_channel(channel_id)
+            if channel is None:
+                continue
+            try:
+                await self._run_pass(channel, policy)
+                self.last_errors.pop(channel_id, None)
+            except discord.Forbidden:
+                self.last_errors[channel_id] = "Missing permissions"
+                print(f"Error: Bot does not have permission to delete messages in #{channel.name} in {channel.guild.name}.")
+            except Exception as e:
+                self.last_errors[channel_id] = str(e)
+                print(f"[AutoPurge] Retention pass failed for #{channel.name}: {e}")
+
+    @retention_loop.before_loop
+    async def before_retention_loop(self):
         # Bot login korar jonno opekha korbe
         await self.client.wait_until_ready()
-        
-        print("Running daily auto-purge task...")
-        
-        # Bot joto server e ache, protitir jonno check korbe
-        for guild in self.client.guilds:
-            channel = discord.utils.get(guild.text_channels, name=self.purge_channel_name)
-            
-            if channel:
-                try:
-                    deleted = await channel.purge(
-                        before=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=27, minutes=1)
-                    )
-                    if len(deleted) > 0:
-                        print(f"Auto-purged {len(deleted)} messages from #{self.purge_channel_name} in {guild.name}.")
-                except discord.Forbidden:
-                    print(f"Error: Bot does not have permission to delete messages in #{self.purge_channel_name} in {guild.name}.")
-                except Exception as e:
-                    print(f"An error occurred during auto-purge: {e}")
+        await self._seed_defaults()
+
+    async def _boundary(self, channel: discord.TextChannel, policy: dict) -> int | None:
+        """Snowflake below which messages are expired, or None if nothing can be."""
+        boundaries = []
+        if policy["max_age_hours"]:
+            cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=policy["max_age_hours"])
+            boundaries.append(discord.utils.time_snowflake(cutoff))
+        if policy["max_count"]:
+            measured = self._count_boundary.get(channel.id)
+            if measured is None or time.monotonic() - measured[0] > COUNT_CHECK_SECONDS:
+                newest = [m async for m in channel.history(limit=policy["max_count"])]
+                boundary = newest[-1].id if len(newest) == policy["max_count"] else None
+                measured = self._count_boundary[channel.id] = (time.monotonic(), boundary)
+            if measured[1] is not None:
+                boundaries.append(measured[1])
+        return max(boundaries) if boundaries else None
+
+    async def _run_pass(self, channel: discord.TextChannel, policy: dict):
+        boundary = await self._boundary(channel, policy)
+        if boundary is None:
+            return
+
+        progress = self.progress.setdefault(channel.id, {
+            "channel_id": channel.id, "cursor_id": None, "deleted": 0,
+            "bulk_requests": 0, "single_deletes": 0, "busy_ms": 0, "last_pass_at": None,
+        })
+        outbound = self.client.outbound
+        bulk_cutoff = discord.utils.time_snowflake(datetime.datetime.now(datetime.timezone.utc) - BULK_DELETE_MAX_AGE)
+        started = time.perf_counter()
+        deleted = singles = 0
+
+        try:
+            while deleted < MAX_DELETES_PER_PASS:
+                after = discord.Object(id=progress["cursor_id"]) if progress["cursor_id"] else None
+                batch = [m async for m in channel.history(
+                    limit=CHUNK_SIZE, after=after, before=discord.Object(id=boundary), oldest_first=True
+                )]
+                if not batch:
+                    break
+
+                cursor = batch[-1].id
+                expired = [m for m in batch if not m.pinned]
+                old = [m for m in expired if m.id < bulk_cutoff]
+                recent = [m for m in expired if m.id >= bulk_cutoff]
+
+                # Oldest first, so everything past the bulk-delete cutoff comes before the rest
+                capped = False
+                for message in old:
+                    if singles >= OLD_DELETES_PER_PASS:
+                        capped = True
+                        break
+                    try:
+                        await outbound.call(Priority.LOG, channel_bucket(channel.id, "delete"), message.delete)
+                    except discord.NotFound:
+                        pass
+                    singles += 1
+                    deleted += 1
+                    progress["cursor_id"] = message.id
+                    await asyncio.sleep(OLD_DELETE_INTERVAL_SECONDS)
+                if capped:
+                    break  # The rest of the old backlog waits for the next pass
+
+                singly = recent
+                if len(recent) > 1:
+                    try:
+                        await outbound.call(
+                            Priority.LOG, channel_bucket(channel.id, "bulk-delete"),
+                            lambda recent=recent: channel.delete_messages(recent, reason="Retention policy")
+                        )
+                        progress["bulk_requests"] += 1
+                        singly = []
+                    except discord.Forbidden:
+                        raise
+                    except discord.HTTPException as e:
+                        # E.g. a message in the chunk was deleted meanwhile; fall back so the cursor still moves
+                        print(f"[AutoPurge] Bulk delete failed in #{channel.name}, deleting one by one: {e}")
+                for message in singly:
+                    try:
+                        await outbound.call(Priority.LOG, channel_bucket(channel.id, "delete"), message.delete)
+                    except discord.NotFound:
+                        pass
+                    progress["single_deletes"] += 1
+                deleted += len(recent)
+                progress["cursor_id"] = cursor
+                if len(batch) < CHUNK_SIZE:
+                    break
+        finally:
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+            progress["deleted"] += deleted
+            progress["single_deletes"] += singles
+            progress["busy_ms"] += elapsed_ms
+            progress["last_pass_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            # Saved every pass so a restart resumes from the cursor instead of rescanning
+            await self.client.store.retention_progress.upsert(progress)
+
+        if deleted:
+            print(f"[AutoPurge] Removed {deleted} message(s) from #{channel.name} in {channel.guild.name} ({elapsed_ms} ms).")
+
+    # ─────────────────────────────────
+    # /retention set | remove | stats
+    # ─────────────────────────────────
+    retention_group = app_commands.Group(
+        name="retention",
+        description="Manage automatic message retention (Admins only).",
+        default_permissions=discord.Permissions(administrator=True),
+    )
+
+    @retention_group.command(name="set", description="Set how long and/or how many messages a channel keeps.")
+    @app_commands.describe(
+        channel="The channel to apply the policy to.",
+        max_age_hours="Delete messages older than this many hours.",
+        max_count="Keep at most this many recent messages.",
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def retention_set(self, interaction: discord.Interaction, channel: discord.TextChannel,
+                            max_age_hours: typing.Optional[app_commands.Range[int, 1, 24 * 365]] = None,
+                            max_count: typing.Optional[app_commands.Range[int, 1, 1000]] = None):
+        if max_age_hours is None and max_count is None:
+            return await interaction.response.send_message("❌ Set a maximum age, a maximum count, or both.", ephemeral=True)
+        await self.set_policy(channel, max_age_hours, max_count, interaction.user.id)
+        limits = []
+        if max_age_hours:
+            limits.append(f"messages older than **{max_age_hours}h**")
+        if max_count:
+            limits.append(f"anything beyond the newest **{max_count}** messages")
+        await interaction.response.send_message(
+            f"✅ {channel.mention} will automatically remove {' and '.join(limits)} (pinned messages are kept).", ephemeral=True
+        )
+
+    @retention_group.command(name="remove", description="Stop automatic message retention in a channel.")
+    @app_commands.describe(channel="The channel to remove the policy from.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def retention_remove(self, interaction: discord.Interaction, channel: discord.TextChannel):
+        if not await self.remove_policy(channel.id):
+            return await interaction.response.send_message(f"ℹ️ {channel.mention} has no retention policy.", ephemeral=True)
+        await interaction.response.send_message(f"✅ Retention policy removed from {channel.mention}.", ephemeral=True)
+
+    @retention_group.command(name="stats", description="Show retention policies and how much each channel has removed.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def retention_stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="🧹 Message Retention", color=discord.Color.blurple())
+        guild_policies = [(cid, p) for cid, p in self.policies.items() if p["guild_id"] == interaction.guild_id]
+        for channel_id, policy in guild_policies[:25]:  # Embed field limit
+            progress = self.progress.get(channel_id, {})
+            limits = " • ".join(filter(None, [
+                f"max age {policy['max_age_hours']}h" if policy["max_age_hours"] else None,
+                f"max count {policy['max_count']}" if policy["max_count"] else None,
+            ]))
+            value = (
+                f"{limits}\n{progress.get('deleted', 0)} removed "
+                f"({progress.get('bulk_requests', 0)} bulk requests, {progress.get('single_deletes', 0)} one by one), "
+                f"{progress.get('busy_ms', 0) / 1000:.1f}s spent"
+            )
+            if channel_id in self.last_errors:
+                value += f"\n⚠️ {self.last_errors[channel_id][:100]}"
+            embed.add_field(name=f"#{getattr(self.client.get_channel(channel_id), 'name', channel_id)}", value=value, inline=False)
+        if not embed.fields:
+            embed.description = "No retention policies in this server."
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(client):
     await client.add_cog(AutoPurge(client))
-
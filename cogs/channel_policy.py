@@ -2,10 +2,10 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-import os
-import re
 import datetime
+from content_flags import CompiledPolicy, compile_policy
+from pipeline import MessageContext, CHANNEL_POLICY_STAGE
+from outbound import Priority, channel_bucket, dm_bucket
 
 # ─────────────────────────────────────────────────
 # Configuration
@@ -13,9 +13,6 @@ import datetime
 PRIMARY_FOUNDER_ID = 759445506426142781
 LOG_CHANNEL_NAME = "punishment-log"
 
-# URL detection pattern
-URL_PATTERN = re.compile(r'https?://\S+', re.IGNORECASE)
-
 # Human-readable descriptions for each mode
 MODE_DESCRIPTIONS = {
     "text_only":         "📝 Text Only — Only plain text allowed",
@@ -120,7 +117,7 @@ class CustomTypeSelect(discord.ui.View):
             "set_by": self.founder_id,
             "set_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         }
-        self.cog._set_policy(self.channel.id, policy_data)
+        await self.cog._set_policy(self.channel.id, policy_data)
 
         # Build a nice display string
         non_custom = [m for m in self.modes if m != "custom"]
@@ -150,28 +147,29 @@ class CustomTypeSelect(discord.ui.View):
 class ChannelPolicy(commands.Cog):
     def __init__(self, client: commands.Bot):
         self.client = client
-        self.db_filepath = "channel_policies.json"
-        self.db = self._load_db()
+        self.db = {"founders": [PRIMARY_FOUNDER_ID], "policies": {}}
+        self._compiled: dict[int, CompiledPolicy] = {}  # channel ID -> policy as bitmasks
+
+    async def cog_load(self):
+        self.db = await self._load_db()
+        self._compiled = {int(cid): self._compile(p) for cid, p in self.db["policies"].items()}
+        self.client.pipeline.register("channel_policy", CHANNEL_POLICY_STAGE, self.enforce_policy)
+
+    async def cog_unload(self):
+        self.client.pipeline.unregister("channel_policy")
 
     # ─────────────────────────────────
     # Database helpers
     # ─────────────────────────────────
-    def _load_db(self) -> dict:
-        if not os.path.exists(self.db_filepath):
-            data = {"founders": [PRIMARY_FOUNDER_ID], "policies": {}}
-            with open(self.db_filepath, "w") as f:
-                json.dump(data, f, indent=4)
-            return data
-        with open(self.db_filepath, "r") as f:
-            data = json.load(f)
+    async def _load_db(self) -> dict:
+        store = self.client.store
+        founders = [r["user_id"] for r in await store.founders.all()]
         # Ensure primary founder is always present
-        if PRIMARY_FOUNDER_ID not in data.get("founders", []):
-            data.setdefault("founders", []).append(PRIMARY_FOUNDER_ID)
-        return data
-
-    def _save_db(self):
-        with open(self.db_filepath, "w") as f:
-            json.dump(self.db, f, indent=4)
+        if PRIMARY_FOUNDER_ID not in founders:
+            founders.append(PRIMARY_FOUNDER_ID)
+            await store.founders.upsert({"user_id": PRIMARY_FOUNDER_ID})
+        policies = {str(p["channel_id"]): p for p in await store.channel_policies.all()}
+        return {"founders": founders, "policies": policies}
 
     def _is_founder(self, user_id: int) -> bool:
         return user_id in self.db.get("founders", [])
@@ -179,20 +177,27 @@ class ChannelPolicy(commands.Cog):
     def _get_policy(self, channel_id: int) -> dict | None:
         return self.db["policies"].get(str(channel_id))
 
-    def _set_policy(self, channel_id: int, data: dict):
+    @staticmethod
+    def _compile(policy: dict) -> CompiledPolicy:
+        return compile_policy(policy.get("modes", []), policy.get("custom_allowed", []))
+
+    async def _set_policy(self, channel_id: int, data: dict):
+        data["channel_id"] = channel_id
         self.db["policies"][str(channel_id)] = data
-        self._save_db()
+        self._compiled[channel_id] = self._compile(data)
+        await self.client.store.channel_policies.upsert(data)
 
-    def _remove_policy(self, channel_id: int):
+    async def _remove_policy(self, channel_id: int):
         self.db["policies"].pop(str(channel_id), None)
-        self._save_db()
+        self._compiled.pop(channel_id, None)
+        await self.client.store.channel_policies.delete(channel_id)
 
     # ─────────────────────────────────
     # Logging helper
     # ─────────────────────────────────
     async def _log_event(self, guild: discord.Guild, action: str, description: str,
                          color: discord.Color, user: discord.Member | discord.User | None = None):
-        log_channel = discord.utils.get(guild.channels, name=LOG_CHANNEL_NAME)
+        log_channel = self.client.resolver.channel(guild, LOG_CHANNEL_NAME)
         if not log_channel:
             print(f"[ChannelPolicy] Log channel '{LOG_CHANNEL_NAME}' not found in {guild.name}.")
             return
@@ -208,172 +213,23 @@ class ChannelPolicy(commands.Cog):
                 text=f"User ID: {user.id}",
                 icon_url=user.display_avatar.url if user.display_avatar else None,
             )
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            print(f"[ChannelPolicy] Failed to send log: {e}")
-
-    # ─────────────────────────────────
-    # Content detection helpers
-    # ─────────────────────────────────
-    @staticmethod
-    def _has_images(message: discord.Message) -> bool:
-        return any(a.content_type and a.content_type.startswith("image/") for a in message.attachments)
-
-    @staticmethod
-    def _has_videos(message: discord.Message) -> bool:
-        return any(a.content_type and a.content_type.startswith("video/") for a in message.attachments)
-
-    @staticmethod
-    def _has_attachments(message: discord.Message) -> bool:
-        return len(message.attachments) > 0
-
-    @staticmethod
-    def _has_stickers(message: discord.Message) -> bool:
-        return len(message.stickers) > 0
-
-    @staticmethod
-    def _has_links(message: discord.Message) -> bool:
-        return bool(URL_PATTERN.search(message.content))
+        self.client.log_sink.emit(log_channel, embed)
 
     # ─────────────────────────────────
     # Enforcement logic
     # ─────────────────────────────────
-    def _check_violation(self, message: discord.Message, policy: dict) -> str | None:
-        """Return a violation reason string, or None if the message is allowed."""
-        modes = policy.get("modes", [])
-        custom_allowed = policy.get("custom_allowed", [])
-
-        for mode in modes:
-            reason = self._check_single_mode(message, mode, custom_allowed)
-            if reason:
-                return reason
-        return None
-
-    def _check_single_mode(self, message: discord.Message, mode: str, custom_allowed: list) -> str | None:
-        """Return a violation message if the message fails this mode, else None."""
-
-        if mode == "text_only":
-            # Must be plain text — no attachments, no stickers
-            if self._has_attachments(message) or self._has_stickers(message):
-                return MODE_VIOLATIONS["text_only"]
-
-        elif mode == "image_only":
-            # Must contain at least one image attachment
-            if not self._has_images(message):
-                return MODE_VIOLATIONS["image_only"]
-
-        elif mode == "video_only":
-            # Must contain at least one video attachment
-            if not self._has_videos(message):
-                return MODE_VIOLATIONS["video_only"]
-
-        elif mode == "media_only":
-            # Must contain an image or video
-            if not (self._has_images(message) or self._has_videos(message)):
-                return MODE_VIOLATIONS["media_only"]
-
-        elif mode == "bot_commands_only":
-            # Only allow messages that start with the bot prefix
-            prefix = getattr(self.client, "command_prefix", "!")
-            if not message.content.startswith(prefix):
-                return MODE_VIOLATIONS["bot_commands_only"]
-
-        elif mode == "links_only":
-            # Must contain a URL
-            if not self._has_links(message):
-                return MODE_VIOLATIONS["links_only"]
-
-        elif mode == "no_links":
-            # Must NOT contain a URL
-            if self._has_links(message):
-                return MODE_VIOLATIONS["no_links"]
-
-        elif mode == "no_files":
-            # Must NOT contain attachments
-            if self._has_attachments(message):
-                return MODE_VIOLATIONS["no_files"]
-
-        elif mode == "no_bot_commands":
-            # Must NOT start with the bot prefix
-            prefix = getattr(self.client, "command_prefix", "!")
-            if message.content.startswith(prefix):
-                return MODE_VIOLATIONS["no_bot_commands"]
-
-        elif mode == "no_text":
-            # Must NOT contain plain text messages
-            if message.content.strip():
-                return MODE_VIOLATIONS["no_text"]
-
-        elif mode == "no_images":
-            # Must NOT contain images
-            if self._has_images(message):
-                return MODE_VIOLATIONS["no_images"]
-
-        elif mode == "no_videos":
-            # Must NOT contain videos
-            if self._has_videos(message):
-                return MODE_VIOLATIONS["no_videos"]
-
-        elif mode == "no_media":
-            # Must NOT contain images or videos
-            if self._has_images(message) or self._has_videos(message):
-                return MODE_VIOLATIONS["no_media"]
-
-        elif mode == "no_stickers":
-            # Must NOT contain stickers
-            if self._has_stickers(message):
-                return MODE_VIOLATIONS["no_stickers"]
-
-        elif mode == "read_only":
-            # Only founders can send (founder check is done in the listener,
-            # so if we reach here the user is NOT a founder)
-            return MODE_VIOLATIONS["read_only"]
-
-        elif mode == "locked":
-            # Block everything (founders already bypassed before this)
-            return MODE_VIOLATIONS["locked"]
-
-        elif mode == "custom":
-            return self._check_custom(message, custom_allowed)
-
-        return None
-
-    def _check_custom(self, message: discord.Message, allowed_types: list) -> str | None:
-        """Determine which content types are present, then reject if any are disallowed."""
-        present: set[str] = set()
-
-        # --- Text / Links ---
-        text = message.content.strip()
-        if text:
-            if URL_PATTERN.search(text):
-                present.add("links")
-                # If there's text beyond just the URLs, mark "text" as present too
-                text_without_urls = URL_PATTERN.sub("", text).strip()
-                if text_without_urls:
-                    present.add("text")
-            else:
-                present.add("text")
-
-        # --- Attachments ---
-        for att in message.attachments:
-            ct = att.content_type or ""
-            if ct.startswith("image/"):
-                present.add("images")
-            elif ct.startswith("video/"):
-                present.add("videos")
-            else:
-                present.add("files")
-
-        # --- Stickers ---
-        if message.stickers:
-            present.add("stickers")
-
-        # --- Check ---
-        disallowed = present - set(allowed_types)
-        if disallowed:
-            return MODE_VIOLATIONS["custom"]
-        return None
+    def _check_violation(self, ctx: MessageContext, channel_id: int) -> str | None:
+        """Return a violation reason string, or None if the message is allowed.
+
+        The message is classified once into ContentFlags and tested against the
+        channel's compiled masks; modes are still checked in the order they
+        were set, so the reason matches the first mode that fails.
+        """
+        compiled = self._compiled.get(channel_id)
+        if compiled is None:
+            return None
+        mode = compiled.violation(ctx.content_flags)
+        return MODE_VIOLATIONS[mode] if mode else None
 
     # ═════════════════════════════════════════════
     #  SLASH COMMANDS — /founder
@@ -391,7 +247,7 @@ class ChannelPolicy(commands.Cog):
             return await interaction.response.send_message(f"ℹ️ {user.mention} already has Founder access.", ephemeral=True)
 
         self.db["founders"].append(user.id)
-        self._save_db()
+        await self.client.store.founders.upsert({"user_id": user.id})
 
         await interaction.response.send_message(f"✅ {user.mention} has been granted **Founder** access.", ephemeral=True)
         await self._log_event(
@@ -411,7 +267,7 @@ class ChannelPolicy(commands.Cog):
             return await interaction.response.send_message(f"ℹ️ {user.mention} does not have Founder access.", ephemeral=True)
 
         self.db["founders"].remove(user.id)
-        self._save_db()
+        await self.client.store.founders.delete(user.id)
 
         await interaction.response.send_message(f"✅ {user.mention}'s Founder access has been revoked.", ephemeral=True)
         await self._log_event(
@@ -502,7 +358,7 @@ class ChannelPolicy(commands.Cog):
             "set_by": interaction.user.id,
             "set_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         }
-        self._set_policy(channel.id, policy_data)
+        await self._set_policy(channel.id, policy_data)
 
         mode_display = "\n".join(MODE_DESCRIPTIONS.get(m, m) for m in modes)
         await interaction.response.send_message(
@@ -525,7 +381,7 @@ class ChannelPolicy(commands.Cog):
         if not self._get_policy(channel.id):
             return await interaction.response.send_message(f"ℹ️ {channel.mention} has no active policy.", ephemeral=True)
 
-        self._remove_policy(channel.id)
+        await self._remove_policy(channel.id)
         await interaction.response.send_message(f"✅ Policy removed from {channel.mention}.", ephemeral=True)
         await self._log_event(
             interaction.guild, "📋 Policy Removed",
@@ -605,15 +461,12 @@ class ChannelPolicy(commands.Cog):
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     # ═════════════════════════════════════════════
-    #  ON_MESSAGE — Enforcement Listener
+    #  ON_MESSAGE — Enforcement pipeline stage
     # ═════════════════════════════════════════════
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        # --- Skip bots and DMs ---
-        if message.author.bot or not message.guild:
-            return
+    async def enforce_policy(self, ctx: MessageContext):
+        message = ctx.message
         # --- Skip non-user message types (system, join, pin, etc.) ---
-        if message.type not in (discord.MessageType.default, discord.MessageType.reply):
+        if not ctx.is_user_message:
             return
         # --- Founders always bypass ---
         if self._is_founder(message.author.id):
@@ -622,16 +475,13 @@ class ChannelPolicy(commands.Cog):
         # --- Enforce dedicated profile channel (1416508832775012497) ---
         if message.channel.id == 1416508832775012497:
             try:
-                await message.delete()
-            except Exception:
-                pass
-            try:
-                await message.channel.send(
-                    f"⚠️ {message.author.mention}, your message was removed.\n**Reason:** Only `/profile`, `/setprofile`, and `/deleteprofile` commands can be used in this channel.",
-                    delete_after=8,
-                )
+                await ctx.delete()
             except Exception:
                 pass
+            self.client.outbound.submit(Priority.REPLY, channel_bucket(message.channel.id), lambda: message.channel.send(
+                f"⚠️ {message.author.mention}, your message was removed.\n**Reason:** Only `/profile`, `/setprofile`, `/deleteprofile`, and `/findtalent` commands can be used in this channel.",
+                delete_after=8,
+            ))
             return
 
         # --- Check if channel has a policy ---
@@ -639,15 +489,13 @@ class ChannelPolicy(commands.Cog):
         if not policy:
             return
 
-        violation = self._check_violation(message, policy)
+        violation = self._check_violation(ctx, message.channel.id)
         if not violation:
             return
 
         # ── Delete ──
         try:
-            await message.delete()
-        except discord.NotFound:
-            return  # Already deleted (e.g. by moderation cog)
+            await ctx.delete()
         except discord.Forbidden:
             print(f"[ChannelPolicy] Missing permissions to delete in #{message.channel.name}")
             return
@@ -658,21 +506,15 @@ class ChannelPolicy(commands.Cog):
         # ── Notify ──
         notify_method = policy.get("notify", "channel")
         if notify_method == "dm":
-            try:
-                await message.author.send(
-                    f"⚠️ Your message in **{message.guild.name}** → <#{message.channel.id}> was removed.\n"
-                    f"**Reason:** {violation}"
-                )
-            except discord.Forbidden:
-                pass  # DMs disabled
+            self.client.outbound.submit(Priority.REPLY, dm_bucket(message.author.id), lambda: message.author.send(
+                f"⚠️ Your message in **{message.guild.name}** → <#{message.channel.id}> was removed.\n"
+                f"**Reason:** {violation}"
+            ))
         else:
-            try:
-                await message.channel.send(
-                    f"⚠️ {message.author.mention}, your message was removed.\n**Reason:** {violation}",
-                    delete_after=8,
-                )
-            except Exception:
-                pass
+            self.client.outbound.submit(Priority.REPLY, channel_bucket(message.channel.id), lambda: message.channel.send(
+                f"⚠️ {message.author.mention}, your message was removed.\n**Reason:** {violation}",
+                delete_after=8,
+            ))
 
 
 async def setup(client):
@@ -0,0 +1,191 @@
+# cogs/diagnostics.py
+import discord
+from discord import app_commands
+from discord.ext import commands
+from cogs.ticket_system import TICKET_POOL_SIZE
+
+
+class Diagnostics(commands.Cog):
+    def __init__(self, client: commands.Bot):
+        self.client = client
+
+    debug_group = app_commands.Group(
+        name="debug",
+        description="Inspect the bot's internal stats (Admins only).",
+        default_permissions=discord.Permissions(administrator=True),
+    )
+
+    # ─────────────────────────────────
+    # /debug pipeline
+    # ─────────────────────────────────
+    @debug_group.command(name="pipeline", description="Show message pipeline stage order and timings.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_pipeline(self, interaction: discord.Interaction):
+        pipeline = self.client.pipeline
+        stats = pipeline.stats
+        lines = []
+        for stage in pipeline.stages:
+            avg_ms = stage.total_ms / stage.runs if stage.runs else 0.0
+            lines.append(
+                f"`{stage.order:>3}` **{stage.name}** — {stage.runs} runs, "
+                f"avg {avg_ms:.2f} ms, max {stage.max_ms:.1f} ms, "
+                f"{stage.deletes} deletes, {stage.errors} errors"
+            )
+        embed = discord.Embed(
+            title="Message Pipeline",
+            description="\n".join(lines) or "No stages registered.",
+            color=discord.Color.blurple(),
+        )
+        embed.add_field(name="Messages", value=str(stats.messages), inline=True)
+        embed.add_field(name="Short-circuited", value=str(stats.short_circuited), inline=True)
+        embed.add_field(name="Stage calls skipped", value=str(stats.stage_calls_skipped), inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ─────────────────────────────────
+    # /debug perspective
+    # ─────────────────────────────────
+    @debug_group.command(name="perspective", description="Show Perspective API cache and circuit breaker stats.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_perspective(self, interaction: discord.Interaction):
+        moderation = self.client.get_cog("Moderation")
+        perspective = moderation.perspective_client if moderation else None
+        if not perspective:
+            return await interaction.response.send_message("ℹ️ AI moderation is disabled.", ephemeral=True)
+
+        stats = perspective.stats()
+        embed = discord.Embed(title="Perspective API", color=discord.Color.blurple())
+        embed.add_field(name="Cache", value=f"{stats['hits']} hits / {stats['misses']} misses / {stats['shared']} shared\nHit rate {stats['hit_rate']:.0%}, {stats['cached']} cached", inline=False)
+        embed.add_field(name="Calls", value=f"{stats['calls']} sent, {stats['errors']} errors, {stats['in_flight']} in flight", inline=False)
+        embed.add_field(name="Skipped", value=f"{stats['skipped_open']} (breaker open), {stats['shed']} (limiter)", inline=False)
+        embed.add_field(name="Circuit breaker", value=f"{stats['breaker']} ({stats['breaker_trips']} trips)", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ─────────────────────────────────
+    # /debug resolver
+    # ─────────────────────────────────
+    @debug_group.command(name="resolver", description="Show channel/role name resolver cache stats.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_resolver(self, interaction: discord.Interaction):
+        stats = self.client.resolver.stats()
+        embed = discord.Embed(title="Name Resolver", color=discord.Color.blurple())
+        embed.add_field(name="Lookups", value=f"{stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})", inline=False)
+        embed.add_field(name="Rebuilds", value=str(stats["rebuilds"]), inline=True)
+        embed.add_field(name="Invalidations", value=str(stats["invalidations"]), inline=True)
+        embed.add_field(name="Guilds cached", value=str(stats["guilds_cached"]), inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+    # ─────────────────────────────────
+    # /debug loop
+    # ─────────────────────────────────
+    @debug_group.command(name="loop", description="Show event-loop lag, slowest stalls and live tasks.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_loop(self, interaction: discord.Interaction):
+        monitor = self.client.loop_monitor
+        embed = discord.Embed(title="Event Loop", color=discord.Color.blurple())
+        embed.add_field(
+            name="Lag",
+            value=f"p50 {monitor.percentile(0.5) * 1000:.1f} ms • p95 {monitor.percentile(0.95) * 1000:.1f} ms • max {monitor.max_lag * 1000:.0f} ms",
+            inline=False,
+        )
+        embed.add_field(name=f"Stalls over {monitor.budget * 1000:.0f} ms", value=str(monitor.stalls), inline=True)
+
+        tasks = monitor.task_counts()
+        waiters = sum(len(v) for v in getattr(self.client, "_listeners", {}).values())
+        top_tasks = "\n".join(f"`{count:>3}` {name}" for name, count in tasks.most_common(8))
+        embed.add_field(name="wait_for waiters", value=str(waiters), inline=True)
+        embed.add_field(name=f"Live tasks ({sum(tasks.values())})", value=top_tasks or "None", inline=False)
+
+        for record in monitor.slowest()[:3]:
+            # The innermost frames are the ones that were blocking the loop
+            stack_tail = "".join(record["stack"].splitlines(keepends=True)[-6:])[-900:]
+            embed.add_field(
+                name=f"{record['lag_ms']:.0f} ms stall • <t:{int(record['at'])}:R>",
+                value=f"```{stack_tail}```",
+                inline=False,
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ─────────────────────────────────
+    # /debug tickets
+    # ─────────────────────────────────
+    @debug_group.command(name="tickets", description="Show ticket warm pool state and ticket-open latency.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_tickets(self, interaction: discord.Interaction):
+        tickets = self.client.get_cog("TicketSystem")
+        if not tickets:
+            return await interaction.response.send_message("ℹ️ The ticket system is not loaded.", ephemeral=True)
+
+        spare = len(tickets.pool.get(interaction.guild_id, []))
+        embed = discord.Embed(title="Ticket System", color=discord.Color.blurple())
+        embed.add_field(
+            name="Open latency",
+            value=f"p50 {tickets.open_percentile(0.5):.0f} ms • p95 {tickets.open_percentile(0.95):.0f} ms ({len(tickets.open_latencies)} samples)",
+            inline=False,
+        )
+        embed.add_field(name="Opened", value=f"{tickets.opens['pooled']} from pool / {tickets.opens['created']} created", inline=True)
+        embed.add_field(name="Warm pool", value=f"{spare} spare (target {TICKET_POOL_SIZE})", inline=True)
+        embed.add_field(name="Pool refills", value=f"{tickets.pool_created} created, {tickets.pool_errors} errors", inline=True)
+        embed.add_field(name="Open tickets", value=str(len(tickets.tickets)), inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ─────────────────────────────────
+    # /debug private
+    # ─────────────────────────────────
+    @debug_group.command(name="private", description="Show private room counts and permission edit timings.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_private(self, interaction: discord.Interaction):
+        private = self.client.get_cog("PrivateChannels")
+        if not private:
+            return await interaction.response.send_message("ℹ️ Private channels are not loaded.", ephemeral=True)
+
+        rooms = private.db["rooms"].values()
+        active = sum(1 for room in rooms if room["status"] == "active")
+        lines = []
+        for operation, stats in sorted(private.overwrite_stats.items()):
+            avg_ms = stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+            lines.append(
+                f"**{operation}** — {stats['calls']} edits, avg {avg_ms:.0f} ms, max {stats['max_ms']:.0f} ms, "
+                f"{stats['retries']} retries, {stats['failures']} failures"
+            )
+        embed = discord.Embed(title="Private Channels", color=discord.Color.blurple())
+        embed.add_field(name="Rooms", value=f"{active} active / {len(rooms) - active} locked", inline=True)
+        embed.add_field(name="Pending deadlines", value=str(len(private._scheduled)), inline=True)
+        embed.add_field(name="Permission edits", value="\n".join(lines) or "None yet.", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ─────────────────────────────────
+    # /debug outbound
+    # ─────────────────────────────────
+    @debug_group.command(name="outbound", description="Show outbound REST queue depth, waits and busy buckets.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def debug_outbound(self, interaction: discord.Interaction):
+        outbound = self.client.outbound
+        lines = []
+        for priority, stats in outbound.stats.items():
+            lines.append(
+                f"**{priority.name}** — {stats.queued} queued, {stats.completed} sent, {stats.failed} failed, "
+                f"{stats.shed} shed, {stats.expired} expired • wait p50 {stats.wait_percentile(0.5):.0f} ms, "
+                f"p95 {stats.wait_percentile(0.95):.0f} ms, max {stats.wait_max_ms:.0f} ms"
+            )
+        state = "under pressure" if outbound.under_pressure else "normal"
+        embed = discord.Embed(title="Outbound Queue", description="\n".join(lines), color=discord.Color.blurple())
+        embed.add_field(name="Depth", value=f"{outbound.depth} ({state})", inline=True)
+        embed.add_field(name="Buckets tracked", value=str(len(outbound.buckets)), inline=True)
+        hot = "\n".join(
+            f"`{name}` — {len(bucket.parked)} parked, {bucket.rate_limited} rate-limited"
+            for name, bucket in outbound.hot_buckets()
+        )
+        embed.add_field(name="Busy buckets", value=hot or "None", inline=False)
+        sink = self.client.log_sink.stats()
+        embed.add_field(
+            name="Log sink",
+            value=f"{sink['events']} events in {sink['messages']} messages ({sink['embeds_per_message']:.1f} per message), "
+                  f"{sink['webhook_messages']} via webhook, {sink['buffered']} buffered",
+            inline=False,
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(client):
+    await client.add_cog(Diagnostics(client))
@@ -16,7 +16,7 @@ class JobPostModal(Modal, title='Post a New Job'):
     location = TextInput(label='Preferred Location', placeholder='Example: Remote or Dhaka, Bangladesh', required=False, default="Not Specified")
 
     async def on_submit(self, interaction: discord.Interaction):
-        job_channel = discord.utils.get(interaction.guild.channels, name="jobs-market")
+        job_channel = interaction.client.resolver.channel(interaction.guild, "jobs-market")
         if not job_channel:
             return await interaction.response.send_message("❌ Error: `#jobs-market` channel not found. Please create it.", ephemeral=True)
 
@@ -42,8 +42,8 @@ class JobPostModal(Modal, title='Post a New Job'):
         
         view = ApplyView() # Simple ApplyView for all jobs now
 
-        verified_seller_role = discord.utils.get(interaction.guild.roles, name="Verified Seller")
-        premium_seller_role = discord.utils.get(interaction.guild.roles, name="Premium Seller")
+        verified_seller_role = interaction.client.resolver.role(interaction.guild, "Verified Seller")
+        premium_seller_role = interaction.client.resolver.role(interaction.guild, "Premium Seller")
         mentions = [r.mention for r in [verified_seller_role, premium_seller_role] if r]
         notification_content = f"New job posted! {' & '.join(mentions) if mentions else ''}"
 
@@ -62,7 +62,7 @@ class ServicePostModal(Modal, title='Post Your Service'):
     experience = TextInput(label='Your Experience', placeholder='Example: 5+ years in graphic design', style=discord.TextStyle.paragraph, required=True)
 
     async def on_submit(self, interaction: discord.Interaction):
-        service_channel = discord.utils.get(interaction.guild.channels, name="post-service")
+        service_channel = interaction.client.resolver.channel(interaction.guild, "post-service")
         if not service_channel:
             return await interaction.response.send_message("❌ Error: `#post-service` channel not found. Please create it.", ephemeral=True)
 
@@ -102,7 +102,7 @@ class ApplyView(View):
     
     @discord.ui.button(label="Apply Now", style=discord.ButtonStyle.success, custom_id="apply_now_button")
     async def apply(self, interaction: discord.Interaction, button: Button):
-        support_channel = discord.utils.get(interaction.guild.channels, name="🆘support")
+        support_channel = interaction.client.resolver.channel(interaction.guild, "🆘support")
         support_mention = support_channel.mention if support_channel else "#🆘support"
         await interaction.response.send_message(f"To apply or hire, please open a middleman request ticket in the {support_mention} channel.", ephemeral=True)
 
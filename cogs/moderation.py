@@ -3,21 +3,16 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import typing
-import json
 import os
 import datetime
-import asyncio
 import re
 from utils import is_authorized
+from keyword_matcher import KeywordMatcher
+from perspective import PerspectiveClient
+from pipeline import MessageContext, MODERATION_STAGE
+from outbound import Priority, channel_bucket, dm_bucket, member_bucket
 from dotenv import load_dotenv
 
-# --- Perspective API Client ---
-try:
-    from googleapiclient import discovery, errors
-except ImportError:
-    print("Google API Client not found. To use AI moderation, run: pip install google-api-python-client")
-    discovery = None
-
 # Load environment variables from .env file
 load_dotenv()
 
@@ -69,6 +64,12 @@ DM_KEYWORDS = [
     "knock me", "knock inbox", "inbox a aso", "inbox e aso",
 ]
 
+# Every keyword list and price pattern compiled into one single-pass matcher
+MODERATION_MATCHER = KeywordMatcher(
+    {"job": JOB_KEYWORDS, "dm": DM_KEYWORDS, "banned": BANNED_WORDS},
+    patterns={"job": JOB_PATTERNS},
+)
+
 # Punishment log channel ID
 PUNISHMENT_LOG_CHANNEL_ID = 1415794024085721108
 
@@ -80,36 +81,33 @@ LOW_THRESHOLD = 0.6
 class Moderation(commands.Cog):
     def __init__(self, client):
         self.client = client
-        self.cases_filepath = "punishment_cases.json"
         self.dm_offenses = {}  # Tracks DM solicitation offenses: {user_id: count}
         
         self.api_key = os.getenv("PERSPECTIVE_API_KEY")
-        if self.api_key and discovery:
-            self.perspective_client = discovery.build(
-                "commentanalyzer", "v1alpha1", developerKey=self.api_key, static_discovery=False
-            )
+        if self.api_key:
+            self.perspective_client = PerspectiveClient(self.api_key)
             print("Perspective API client initialized successfully.")
         else:
             self.perspective_client = None
-            print("Warning: Perspective API key not found or google-api-python-client is not installed. AI moderation is disabled.")
+            print("Warning: Perspective API key not found. AI moderation is disabled.")
+
+    async def cog_load(self):
+        self.client.pipeline.register("moderation", MODERATION_STAGE, self.moderate_message)
+
+    async def cog_unload(self):
+        self.client.pipeline.unregister("moderation")
+        if self.perspective_client:
+            self.perspective_client.close()
 
     # --- Helper function for logging punishments ---
     async def log_punishment(self, source: typing.Union[discord.Interaction, discord.Message], action: str, user: typing.Union[discord.Member, discord.User], moderator: discord.Member, reason: str, color: discord.Color = discord.Color.orange()):
         guild = source.guild
-        log_channel = discord.utils.get(guild.channels, name="punishment-log")
+        log_channel = self.client.resolver.channel(guild, "punishment-log")
         if not log_channel:
             print(f"Error: `punishment-log` channel not found in {guild.name}.")
             return
 
-        if not os.path.exists(self.cases_filepath):
-            with open(self.cases_filepath, 'w') as f: json.dump({"case_number": 0}, f)
-        
-        with open(self.cases_filepath, 'r+') as f:
-            data = json.load(f)
-            case_number = data.get("case_number", 0) + 1
-            data["case_number"] = case_number
-            f.seek(0)
-            json.dump(data, f, indent=4)
+        case_number = await self.client.store.next_value("case_number")
 
         embed = discord.Embed(title=f"Case {case_number} | {action} | {user.name}", color=color)
         embed.add_field(name="User", value=user.mention, inline=True)
@@ -117,12 +115,8 @@ class Moderation(commands.Cog):
         embed.add_field(name="Reason", value=reason, inline=False)
         embed.set_footer(text=f"ID: {user.id} • {datetime.datetime.now().strftime('%d/%m/%Y, %H:%M')}")
 
-        try:
-            await log_channel.send(embed=embed)
-        except discord.Forbidden:
-            print(f"Error: Bot does not have permission to send messages in `#punishment-log`.")
-        except Exception as e:
-            print(f"Error sending to log channel: {e}")
+        # Batched with other log events and sent behind deletes/timeouts/replies
+        self.client.log_sink.emit(log_channel, embed)
 
     # --- Helper to get ordinal string (1st, 2nd, 3rd...) ---
     @staticmethod
@@ -137,66 +131,36 @@ class Moderation(commands.Cog):
     async def analyze_message(self, text: str) -> dict:
         if not self.perspective_client or not text.strip():
             return {}
-        
-        analyze_request = {
-            'comment': {'text': text},
-            'requestedAttributes': {'TOXICITY': {}, 'SEVERE_TOXICITY': {}, 'INSULT': {}, 'THREAT': {}},
-            'languages': ['en']
-        }
-        
-        try:
-            loop = asyncio.get_running_loop()
-            response = await loop.run_in_executor(None, lambda: self.perspective_client.comments().analyze(body=analyze_request).execute())
-            return {attr: response['attributeScores'][attr]['summaryScore']['value'] for attr in response['attributeScores']}
-        except errors.HttpError as e:
-            print(f"Perspective API HTTP error: {e.status_code}")
-            return {}
-        except Exception as e:
-            print(f"An unexpected error occurred with Perspective API: {e}")
-            return {}
+        # Cached, concurrency-limited and guarded by a circuit breaker; fails open with {}
+        return await self.perspective_client.analyze(text)
 
-    # --- Auto-Moderation Listener ---
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
+    # --- Auto-Moderation Pipeline Stage ---
+    async def moderate_message(self, ctx: MessageContext):
+        message = ctx.message
 
         # Owner bypass — no restrictions at all
         if message.author.id == 759445506426142781:
             return
 
         author = message.author
-        content_lower = message.content.lower()
+        outbound = self.client.outbound
+        # One pass over the message tags every keyword/pattern category it hits
+        hits = MODERATION_MATCHER.scan(ctx.content_lower)
 
         # --- 1. Job Post Filter (applies to everyone, including admins) ---
         if message.channel.name not in ALLOWED_JOB_CHANNELS:
-            is_job_post = False
-            # Check keyword match
-            matched_keyword = next((kw for kw in JOB_KEYWORDS if kw in content_lower), None)
-            if matched_keyword:
-                is_job_post = True
-            # Check regex pattern match (price/rate patterns)
-            if not is_job_post:
-                for pattern in JOB_PATTERNS:
-                    if pattern.search(message.content):
-                        is_job_post = True
-                        break
-            
-            if is_job_post:
+            if "job" in hits:
                 try:
-                    await message.delete()
+                    await ctx.delete()
                     warning_msg = f"Hey {author.mention}, you cannot post job or service posts in general channels. Please use <#1415292502671491102> for that."
-                    await message.channel.send(warning_msg, delete_after=15)
-                    try:
-                        await author.send(f"You cannot post job or service posts in general channels. Please use the designated channel in **{message.guild.name}** for that.")
-                    except discord.Forbidden:
-                        pass
+                    outbound.submit(Priority.REPLY, channel_bucket(message.channel.id), lambda: message.channel.send(warning_msg, delete_after=15))
+                    outbound.submit(Priority.REPLY, dm_bucket(author.id), lambda: author.send(f"You cannot post job or service posts in general channels. Please use the designated channel in **{message.guild.name}** for that."))
                     return
                 except Exception as e:
                     print(f"Job post filter error: {e}")
 
         # --- 2. DM Solicitation Filter (applies to everyone, including admins) ---
-        if any(keyword in content_lower for keyword in DM_KEYWORDS):
+        if "dm" in hits:
             user_id = author.id
             self.dm_offenses[user_id] = self.dm_offenses.get(user_id, 0) + 1
             offense_count = self.dm_offenses[user_id]
@@ -209,10 +173,10 @@ class Moderation(commands.Cog):
                 duration_str = "15 minutes"
 
             try:
-                await message.delete()
+                await ctx.delete()
                 warning_msg = f"⚠️ {author.mention}, you are not allowed to solicit DMs or private messages here. This is your **{self.ordinal(offense_count)} offense**. You have been muted for **{duration_str}**."
-                await message.channel.send(warning_msg, delete_after=20)
-                await author.timeout(duration, reason=f"DM solicitation (Offense #{offense_count})")
+                outbound.submit(Priority.REPLY, channel_bucket(message.channel.id), lambda: message.channel.send(warning_msg, delete_after=20))
+                await outbound.call(Priority.MODERATION, member_bucket(message.guild.id), lambda: author.timeout(duration, reason=f"DM solicitation (Offense #{offense_count})"))
                 await self.log_punishment(message, f"Timeout ({duration_str})", author, self.client.user, f"DM solicitation detected (Offense #{offense_count})", color=discord.Color.red())
                 return
             except discord.Forbidden:
@@ -220,8 +184,8 @@ class Moderation(commands.Cog):
             except Exception as e:
                 print(f"DM solicitation filter error: {e}")
 
-        # Skip remaining moderation for admins
-        if isinstance(message.author, discord.Member) and message.author.guild_permissions.administrator:
+        # Skip remaining moderation for admins, and for messages already removed above
+        if ctx.is_admin or ctx.deleted:
             return
 
         # --- 2. AI Moderation Check ---
@@ -238,13 +202,10 @@ class Moderation(commands.Cog):
             
             if duration:
                 try:
-                    await message.delete()
-                    await author.timeout(duration, reason=reason)
+                    await ctx.delete()
+                    await outbound.call(Priority.MODERATION, member_bucket(message.guild.id), lambda: author.timeout(duration, reason=reason))
                     await self.log_punishment(message, f"Timeout (AI, {duration_str})", author, self.client.user, reason)
-                    try:
-                        await author.send(f"Your message in **{message.guild.name}** was automatically removed and you have been timed out for **{duration_str}** for violating our community guidelines.")
-                    except discord.Forbidden:
-                        print(f"Could not DM {author.name} (ID: {author.id}). They may have DMs disabled.")
+                    outbound.submit(Priority.REPLY, dm_bucket(author.id), lambda: author.send(f"Your message in **{message.guild.name}** was automatically removed and you have been timed out for **{duration_str}** for violating our community guidelines."))
                     return
                 except discord.Forbidden:
                     print(f"Failed to timeout {author.name}. Check bot's role hierarchy.")
@@ -252,14 +213,11 @@ class Moderation(commands.Cog):
                     print(f"AI auto-mod error: {e}")
                     
         # --- 3. Banned Word Filter ---
-        if any(word in content_lower for word in BANNED_WORDS):
+        if "banned" in hits and not ctx.deleted:
             try:
-                await message.delete()
+                await ctx.delete()
                 await self.log_punishment(message, "Warn (Auto)", author, self.client.user, "Used a banned word.")
-                try:
-                    await author.send(f"Your message in **{message.guild.name}** was deleted for containing a banned word.")
-                except discord.Forbidden:
-                    print(f"Could not DM {author.name} (ID: {author.id}). They may have DMs disabled.")
+                outbound.submit(Priority.REPLY, dm_bucket(author.id), lambda: author.send(f"Your message in **{message.guild.name}** was deleted for containing a banned word."))
             except Exception as e:
                 print(f"Banned word filter error: {e}")
 
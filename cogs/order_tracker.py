@@ -3,6 +3,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import typing
+import asyncio
 import datetime
 import re
 from utils import is_authorized
@@ -22,10 +23,20 @@ class OrderTracker(commands.Cog):
         self.client = client
         self.tracker_channel_name = "🗳️order-tracker"
         self.tickets_category_name = "TICKETS"
+        # Deal registry: deal number -> deal row, and deal number -> status timeline
+        self.deals: dict[int, dict] = {}
+        self.history: dict[int, list[dict]] = {}
+        self._status_lock = asyncio.Lock()  # Serialises timeline writes so sequence numbers never collide
+
+    async def cog_load(self):
+        store = self.client.store
+        self.deals = {row["deal_number"]: row for row in await store.deals.all()}
+        for entry in sorted(await store.deal_status_history.all(), key=lambda e: (e["deal_number"], e["seq"])):
+            self.history.setdefault(entry["deal_number"], []).append(entry)
 
     async def get_tracker_channel(self, guild: discord.Guild) -> typing.Optional[discord.TextChannel]:
         """Finds or creates the private order tracker channel."""
-        tracker_channel = discord.utils.get(guild.text_channels, name=self.tracker_channel_name)
+        tracker_channel = self.client.resolver.text_channel(guild, self.tracker_channel_name)
         if tracker_channel is None:
             overwrites = {
                 guild.default_role: discord.PermissionOverwrite(read_messages=False),
@@ -38,29 +49,80 @@ class OrderTracker(commands.Cog):
                 return None
         return tracker_channel
 
-    async def find_deal_participants(self, guild: discord.Guild, deal_number: int) -> tuple[typing.Optional[discord.Member], typing.Optional[discord.Member]]:
-        """Finds the buyer and seller from the original deal ticket."""
-        tickets_category = discord.utils.get(guild.categories, name=self.tickets_category_name)
+    # ─────────────────────────────────
+    # Deal registry
+    # ─────────────────────────────────
+    async def register_deal(self, deal_number: int, buyer_id: int | None, seller_id: int | None,
+                            channel_id: int | None, registered_by: int) -> dict:
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        existing = self.deals.get(deal_number, {})
+        deal = {
+            "deal_number": deal_number,
+            "buyer_id": buyer_id,
+            "seller_id": seller_id,
+            "channel_id": channel_id,
+            "status": existing.get("status"),
+            "registered_by": registered_by,
+            "created_at": existing.get("created_at", now),
+            "updated_at": now,
+        }
+        self.deals[deal_number] = deal
+        await self.client.store.deals.upsert(deal)
+        return deal
+
+    async def record_status(self, deal_number: int, status: str, details: str | None, updated_by: int) -> dict:
+        """Append a status change to the deal's timeline and persist both in one transaction.
+
+        Memory is only updated once the transaction has committed.
+        """
+        async with self._status_lock:
+            now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            timeline = self.history.get(deal_number, [])
+            entry = {
+                "deal_number": deal_number,
+                "seq": len(timeline) + 1,
+                "status": status,
+                "details": details,
+                "updated_by": updated_by,
+                "updated_at": now,
+            }
+            deal = {**self.deals[deal_number], "status": status, "updated_at": now}
+
+            store = self.client.store
+
+            def _write(conn):
+                store.deal_status_history._sync_upsert_many(conn, [entry])
+                store.deals._sync_upsert_many(conn, [deal])
+
+            await store.transaction(_write)
+            self.deals[deal_number] = deal
+            self.history.setdefault(deal_number, []).append(entry)
+            return entry
+
+    async def _backfill_legacy_deal(self, guild: discord.Guild, deal_number: int, registered_by: int) -> dict | None:
+        """One-time import of a deal that predates the registry, from its `deal-{n}` ticket channel.
+
+        Returns None (and registers nothing) unless both participants were read,
+        so a transient error is retried on the next /updatestatus.
+        """
+        tickets_category = self.client.resolver.category(guild, self.tickets_category_name)
         if not tickets_category:
-            return None, None
+            return None
 
-        deal_channel_name = f"deal-{deal_number}"
-        deal_channel = discord.utils.get(tickets_category.channels, name=deal_channel_name)
-        
+        deal_channel = discord.utils.get(tickets_category.channels, name=f"deal-{deal_number}")
         if not deal_channel:
-            return None, None
+            return None
 
         try:
-            # Fetch the first message in the channel which should contain the deal embed
-            first_message = [msg async for msg in deal_channel.history(limit=1, oldest=True)][0]
-            if first_message and first_message.embeds:
-                embed = first_message.embeds[0]
-                buyer = guild.get_member(int(embed.fields[0].value.strip('<@!>')))
-                seller = guild.get_member(int(embed.fields[1].value.strip('<@!>')))
-                return buyer, seller
-        except (IndexError, AttributeError, ValueError):
-            return None, None
-        return None, None
+            # The first message in the channel should contain the deal embed
+            first_message = [msg async for msg in deal_channel.history(limit=1, oldest_first=True)][0]
+            embed = first_message.embeds[0]
+            buyer_id = int(embed.fields[0].value.strip('<@!>'))
+            seller_id = int(embed.fields[1].value.strip('<@!>'))
+        except (IndexError, AttributeError, ValueError, discord.HTTPException) as e:
+            print(f"[OrderTracker] Could not read participants of deal #{deal_number}: {e}")
+            return None
+        return await self.register_deal(deal_number, buyer_id, seller_id, deal_channel.id, registered_by)
 
 
     @app_commands.command(name="updatestatus", description="Update the status of a marketplace deal.")
@@ -83,8 +145,19 @@ class OrderTracker(commands.Cog):
         if not tracker_channel:
             return await interaction.response.send_message("❌ The order tracker channel is not set up correctly.", ephemeral=True)
 
-        # Find the buyer and seller automatically
-        buyer, seller = await self.find_deal_participants(interaction.guild, deal_number)
+        # Look the deal up in the registry; older deals are imported from their ticket once
+        deal = self.deals.get(deal_number)
+        if deal is None or (deal["buyer_id"] is None and deal["channel_id"] is None):
+            # Unknown, or only registered without participants: (re)try the import from the ticket
+            await interaction.response.defer(ephemeral=True)
+            deal = await self._backfill_legacy_deal(interaction.guild, deal_number, interaction.user.id) or deal
+            if deal is None:
+                # Deals handled outside a ticket still get a status, just without buyer/seller
+                deal = await self.register_deal(deal_number, None, None, None, interaction.user.id)
+        respond = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+
+        buyer = interaction.guild.get_member(deal["buyer_id"]) if deal["buyer_id"] else None
+        seller = interaction.guild.get_member(deal["seller_id"]) if deal["seller_id"] else None
         
         # Get the preset message and color for the selected status
         preset_title, preset_desc, preset_color = STATUS_PRESETS[status.value]
@@ -106,12 +179,63 @@ class OrderTracker(commands.Cog):
             embed.set_footer(text=f"Updated by {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url)
 
             await tracker_channel.send(embed=embed)
-            await interaction.response.send_message(f"✅ Status for Deal #{deal_number} has been updated in {tracker_channel.mention}.", ephemeral=True)
+            await self.record_status(deal_number, status.value, details, interaction.user.id)
+            await respond(f"✅ Status for Deal #{deal_number} has been updated in {tracker_channel.mention}.", ephemeral=True)
 
         except Exception as e:
-            await interaction.response.send_message(f"❌ An unexpected error occurred: {e}", ephemeral=True)
+            await respond(f"❌ An unexpected error occurred: {e}", ephemeral=True)
+
+    # ─────────────────────────────────
+    # /deal register | history
+    # ─────────────────────────────────
+    deal_group = app_commands.Group(name="deal", description="Marketplace deal registry.")
+
+    @deal_group.command(name="register", description="Register (or update) a deal's buyer, seller and ticket channel.")
+    @app_commands.describe(
+        deal_number="The unique number of the deal (e.g., 1042).",
+        buyer="The buyer in this deal.",
+        seller="The seller in this deal.",
+        channel="(Optional) The deal's ticket channel.",
+    )
+    @app_commands.check(is_authorized)
+    async def deal_register(self, interaction: discord.Interaction, deal_number: int, buyer: discord.Member,
+                            seller: discord.Member, channel: typing.Optional[discord.TextChannel] = None):
+        existed = deal_number in self.deals
+        await self.register_deal(deal_number, buyer.id, seller.id, channel.id if channel else None, interaction.user.id)
+        verb = "updated" if existed else "registered"
+        await interaction.response.send_message(
+            f"✅ Deal #{deal_number} {verb}: {buyer.mention} (buyer) ↔ {seller.mention} (seller).", ephemeral=True
+        )
+
+    @deal_group.command(name="history", description="Show the full status timeline of a deal.")
+    @app_commands.describe(deal_number="The unique number of the deal (e.g., 1042).")
+    @app_commands.check(is_authorized)
+    async def deal_history(self, interaction: discord.Interaction, deal_number: int):
+        deal = self.deals.get(deal_number)
+        if deal is None:
+            return await interaction.response.send_message(f"❌ Deal #{deal_number} is not registered.", ephemeral=True)
+
+        lines = []
+        for entry in self.history.get(deal_number, [])[-20:]:
+            title = STATUS_PRESETS.get(entry["status"], (entry["status"],))[0]
+            when = int(datetime.datetime.fromisoformat(entry["updated_at"]).timestamp())
+            line = f"`{entry['seq']}.` **{title}** — <t:{when}:f> by <@{entry['updated_by']}>"
+            if entry["details"]:
+                line += f"\n> {entry['details'][:200]}"
+            lines.append(line)
+
+        current = STATUS_PRESETS.get(deal["status"], (None, None, discord.Color.dark_grey()))
+        embed = discord.Embed(
+            title=f"🎟️ Deal #{deal_number} — History",
+            description="\n".join(lines) or "No status updates yet.",
+            color=current[2],
+        )
+        embed.add_field(name="Buyer", value=f"<@{deal['buyer_id']}>" if deal["buyer_id"] else "Unknown", inline=True)
+        embed.add_field(name="Seller", value=f"<@{deal['seller_id']}>" if deal["seller_id"] else "Unknown", inline=True)
+        embed.add_field(name="Channel", value=f"<#{deal['channel_id']}>" if deal["channel_id"] else "—", inline=True)
+        embed.set_footer(text=f"{len(self.history.get(deal_number, []))} update(s)")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
 async def setup(client):
     await client.add_cog(OrderTracker(client))
-
@@ -2,56 +2,136 @@
 import discord
 from discord.ext import commands
 import asyncio
+import time
+from dataclasses import dataclass, field
+from pipeline import MessageContext, OWNER_NOTIFY_STAGE
+from outbound import Priority, channel_bucket
 
 # --- Owner details for the auto-responder ---
 OWNER_USERNAME = "shahriararafat"
-OWNER_ROLE_NAME = "Founder 👑" 
+OWNER_ROLE_NAME = "Founder 👑"
+OWNER_REPLY_TIMEOUT_SECONDS = 60.0   # How long the owner has to answer before the auto-reply
+AWAY_REPLY_COOLDOWN_SECONDS = 60.0   # At most one auto-reply per channel in this window
+
+
+@dataclass
+class PendingMention:
+    channel: discord.abc.Messageable
+    owner_id: int
+    timer: asyncio.TimerHandle
+    authors: dict[int, str] = field(default_factory=dict)  # user ID -> mention, in arrival order
+
+
 class OwnerNotify(commands.Cog):
     def __init__(self, client):
         self.client = client
+        # guild ID -> owner member ID (None when the owner is not in that guild)
+        self._owner_ids: dict[int, int | None] = {}
+        # channel ID -> mentions waiting for the owner; one timer per channel
+        self._pending: dict[int, PendingMention] = {}
+        # channel ID -> monotonic time of the last auto-reply
+        self._last_reply: dict[int, float] = {}
+
+    async def cog_load(self):
+        self.client.pipeline.register("owner_notify", OWNER_NOTIFY_STAGE, self.check_owner_mention)
+
+    async def cog_unload(self):
+        self.client.pipeline.unregister("owner_notify")
+        for pending in self._pending.values():
+            pending.timer.cancel()
+        self._pending.clear()
+
+    # ─────────────────────────────────
+    # Owner lookup (cached per guild)
+    # ─────────────────────────────────
+    def _owner_id(self, guild: discord.Guild) -> int | None:
+        if guild.id not in self._owner_ids:
+            owner = discord.utils.get(guild.members, name=OWNER_USERNAME)
+            self._owner_ids[guild.id] = owner.id if owner else None
+        return self._owner_ids[guild.id]
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.name == OWNER_USERNAME:
+            self._owner_ids[member.guild.id] = member.id
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # Usernames are user-level, so renames arrive here rather than in on_member_update
+        if before.name != after.name and OWNER_USERNAME in (before.name, after.name):
+            # Forget guilds that cached this user as owner, or that had no owner to find
+            for guild_id, owner_id in list(self._owner_ids.items()):
+                if owner_id in (after.id, None):
+                    self._owner_ids.pop(guild_id, None)
 
     @commands.Cog.listener()
-    async def on_message(self, message):
-        # This listener now runs AFTER the moderation listener, so we add a check here.
-        if message.author.bot or not message.guild or (isinstance(message.author, discord.Member) and message.author.guild_permissions.administrator):
+    async def on_member_remove(self, member: discord.Member):
+        if self._owner_ids.get(member.guild.id) == member.id:
+            self._owner_ids.pop(member.guild.id, None)
+
+    # ─────────────────────────────────
+    # Pipeline stage
+    # ─────────────────────────────────
+    async def check_owner_mention(self, ctx: MessageContext):
+        # Runs last in the pipeline, so messages removed by moderation/policy never get here
+        message = ctx.message
+        owner_id = self._owner_id(message.guild)
+        if owner_id is None:
+            return
+
+        # The owner speaking in a channel answers everyone waiting there
+        if message.author.id == owner_id:
+            pending = self._pending.pop(message.channel.id, None)
+            if pending:
+                pending.timer.cancel()
             return
 
-        owner_member = discord.utils.get(message.guild.members, name=OWNER_USERNAME)
-        if not owner_member:
+        if ctx.is_admin:
             return
-        if message.author.id == owner_member.id:
+
+        owner_role = self.client.resolver.role(message.guild, OWNER_ROLE_NAME)
+        owner_mentioned = (
+            owner_id in message.raw_mentions
+            or (owner_role is not None and owner_role.id in message.raw_role_mentions)
+            or message.mention_everyone
+        )
+        if not owner_mentioned:
             return
 
-        owner_role = discord.utils.get(message.guild.roles, name=OWNER_ROLE_NAME)
-        
-        # Correctly checks if the role was mentioned in the message.
-        is_role_mentioned = owner_role and owner_role in message.role_mentions
-        owner_mentioned = owner_member.mentioned_in(message) or is_role_mentioned
-
-        if owner_mentioned:
-            channel = message.channel
-
-            def check(m):
-                return m.author.id == owner_member.id and m.channel == channel
-
-            try:
-                await self.client.wait_for('message', check=check, timeout=60.0)
-            except asyncio.TimeoutError:
-                # --- UPDATED: Website link embed is now suppressed ---
-                # By wrapping the link in <>, we tell Discord not to create a preview.
-                response_message = (
-                    f"Hey {message.author.mention} 👋\n\n"
-                    f"Our Founder 👑 {owner_member.mention} is currently away or busy right now.\n\n"
-                    f"He’ll get back to you as soon as possible.\n"
-                    f"Meanwhile, you can also check out his website 🌐\n\n"
-                    f"👉 <https://shahriararafat.ninja>\n"
-                    f"Thanks for your patience! ✨"
-                )
-                try:
-                    await channel.send(response_message)
-                except Exception as e:
-                    print(f"Failed to send auto-response: {e}")
+        channel_id = message.channel.id
+        pending = self._pending.get(channel_id)
+        if pending:
+            pending.authors.setdefault(message.author.id, message.author.mention)
+            return
+        last_reply = self._last_reply.get(channel_id)
+        if last_reply is not None and time.monotonic() - last_reply < AWAY_REPLY_COOLDOWN_SECONDS:
+            return
+
+        timer = asyncio.get_running_loop().call_later(OWNER_REPLY_TIMEOUT_SECONDS, self._owner_timed_out, channel_id)
+        self._pending[channel_id] = PendingMention(
+            channel=message.channel, owner_id=owner_id, timer=timer,
+            authors={message.author.id: message.author.mention},
+        )
+
+    def _owner_timed_out(self, channel_id: int):
+        pending = self._pending.pop(channel_id, None)
+        if not pending:
+            return
+        self._last_reply[channel_id] = time.monotonic()
+        self._send_away_reply(pending)
+
+    def _send_away_reply(self, pending: PendingMention):
+        # --- UPDATED: Website link embed is now suppressed ---
+        # By wrapping the link in <>, we tell Discord not to create a preview.
+        response_message = (
+            f"Hey {' '.join(pending.authors.values())} 👋\n\n"
+            f"Our Founder 👑 <@{pending.owner_id}> is currently away or busy right now.\n\n"
+            f"He’ll get back to you as soon as possible.\n"
+            f"Meanwhile, you can also check out his website 🌐\n\n"
+            f"👉 <https://shahriararafat.ninja>\n"
+            f"Thanks for your patience! ✨"
+        )
+        self.client.outbound.submit(Priority.REPLY, channel_bucket(pending.channel.id), lambda: pending.channel.send(response_message))
 
 async def setup(client):
     await client.add_cog(OwnerNotify(client))
-
@@ -0,0 +1,73 @@
+# cogs/permissions.py
+import discord
+from discord import app_commands
+from discord.ext import commands
+import datetime
+import typing
+
+
+class Permissions(commands.Cog):
+    """Manage the custom users/roles allowed to run authorized bot commands."""
+
+    def __init__(self, client: commands.Bot):
+        self.client = client
+
+    permissions_group = app_commands.Group(
+        name="permissions",
+        description="Manage who can use authorized bot commands (Admins only).",
+        default_permissions=discord.Permissions(administrator=True),
+    )
+
+    async def _update(self, interaction: discord.Interaction, user: typing.Optional[discord.Member],
+                      role: typing.Optional[discord.Role], allowed: bool):
+        if (user is None) == (role is None):
+            return await interaction.response.send_message("❌ Pick exactly one user **or** one role.", ephemeral=True)
+
+        kind, target = ("user", user) if user else ("role", role)
+        try:
+            changed = await self.client.authz.set_allowed(kind, target.id, allowed)
+        except Exception as e:
+            print(f"[Permissions] Failed to save permissions: {e}")
+            return await interaction.response.send_message("❌ Could not save the permission change.", ephemeral=True)
+
+        if not changed:
+            state = "already has" if allowed else "does not have"
+            return await interaction.response.send_message(f"ℹ️ {target.mention} {state} bot command access.", ephemeral=True)
+        verb = "granted" if allowed else "revoked"
+        await interaction.response.send_message(f"✅ Bot command access {verb} for {target.mention}.", ephemeral=True)
+
+    @permissions_group.command(name="add", description="Allow a user or role to use authorized bot commands.")
+    @app_commands.describe(user="The user to allow.", role="The role to allow.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def permissions_add(self, interaction: discord.Interaction,
+                              user: typing.Optional[discord.Member] = None, role: typing.Optional[discord.Role] = None):
+        await self._update(interaction, user, role, allowed=True)
+
+    @permissions_group.command(name="remove", description="Revoke a user's or role's access to authorized bot commands.")
+    @app_commands.describe(user="The user to revoke.", role="The role to revoke.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def permissions_remove(self, interaction: discord.Interaction,
+                                 user: typing.Optional[discord.Member] = None, role: typing.Optional[discord.Role] = None):
+        await self._update(interaction, user, role, allowed=False)
+
+    @permissions_group.command(name="list", description="List users and roles with bot command access.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def permissions_list(self, interaction: discord.Interaction):
+        authz = self.client.authz
+        users = [f"<@{uid}>" for uid in sorted(authz.allowed_users)]
+        roles = [f"<@&{rid}>" for rid in sorted(authz.allowed_roles)]
+
+        embed = discord.Embed(
+            title="🔐 Bot Command Access",
+            color=discord.Color.blurple(),
+            timestamp=datetime.datetime.now(datetime.timezone.utc),
+        )
+        embed.add_field(name="Users", value="\n".join(users) or "None", inline=True)
+        embed.add_field(name="Roles", value="\n".join(roles) or "None", inline=True)
+        stats = authz.stats()
+        embed.set_footer(text=f"Administrators always have access • Decision cache: {stats['cached']} entries, {stats['hit_rate']:.0%} hit rate")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(client):
+    await client.add_cog(Permissions(client))
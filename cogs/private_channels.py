@@ -2,70 +2,374 @@
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-import json
-import os
+import asyncio
 import datetime
+import heapq
+import os
+import re
+import time
+from pipeline import MessageContext, PRIVATE_ACTIVITY_STAGE
 
 # --- Configuration ---
 PRIVATE_CATEGORY_ID = 1182157524208717925
 LOG_CHANNEL_NAME = "private-channel-logs"
 INACTIVITY_THRESHOLD_HOURS = 12
 MAX_ROOMS_PER_USER = 2
+ACTIVITY_FLUSH_SECONDS = 15
+ACTIVITY_JOURNAL_FILEPATH = "private_activity.journal"
+LOCK_RETRY_SECONDS = 300  # A failed auto-lock is retried after this long
+OVERWRITE_ATTEMPTS = 3    # Tries for a batched overwrite edit on 5xx errors
+OVERWRITE_BACKOFF_SECONDS = 0.5
+ROOM_NAME_PREFIX = "🔒-"
+RECONCILE_WAIT_SECONDS = 2.0  # How long a /private command waits for startup reconciliation
+OWNER_TOPIC_PATTERN = re.compile(r"\(ID: (\d+)\)")
 
 
 class PrivateChannels(commands.Cog):
     def __init__(self, client: commands.Bot):
         self.client = client
-        self.db_filepath = "private_channels.json"
-        self.db = self._load_db()
-        self.inactivity_check_loop.start()
-
-    def cog_unload(self):
-        self.inactivity_check_loop.cancel()
+        self.db = {"rooms": {}}
+        # Channel IDs whose last_activity changed since the last flush
+        self._dirty_activity: set[int] = set()
+        self._journal = None  # Append-only activity journal, see _journal_activity
+        # Inactivity deadlines for active rooms: a min-heap of (deadline, channel ID).
+        # Activity only updates _activity; a popped entry whose room saw activity since
+        # is pushed back with its real deadline, so each room has one live heap entry.
+        self._activity: dict[int, float] = {}    # channel ID -> last activity (epoch seconds)
+        self._scheduled: dict[int, float] = {}   # channel ID -> deadline of its live heap entry
+        self._deadlines: list[tuple[float, int]] = []
+        self._deadline_changed = asyncio.Event()
+        self._inactivity_task: asyncio.Task | None = None
+        # Batched overwrite edits per operation: calls, retries, failures, total_ms, max_ms
+        self.overwrite_stats: dict[str, dict[str, float]] = {}
+        # Owner index: owner ID -> their active room channel IDs, plus channel ID -> indexed owner
+        self._active_by_owner: dict[int, set[int]] = {}
+        self._indexed_owner: dict[int, int] = {}
+        # Set once stored rooms have been checked against the live channels
+        self.reconciled = asyncio.Event()
+        self._reconcile_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        self.db = await self._load_db()
+        await self._replay_activity_journal()
+        self._open_journal()
+        for channel_id_str, room in self.db["rooms"].items():
+            self._index_room(int(channel_id_str), room)
+            if room["status"] == "active":
+                self._schedule(int(channel_id_str), self._parse_activity(room["last_activity"]))
+        self._reconcile_task = asyncio.create_task(self._reconcile())
+        self._inactivity_task = asyncio.create_task(self._inactivity_loop())
+        self.activity_flush_loop.start()
+        self.client.pipeline.register("private_activity", PRIVATE_ACTIVITY_STAGE, self.track_message_activity)
+
+    async def cog_unload(self):
+        self.client.pipeline.unregister("private_activity")
+        if self._inactivity_task:
+            self._inactivity_task.cancel()
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        self.activity_flush_loop.cancel()
+        await self._flush_activity()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
 
     # ─────────────────────────────────────────────
     # Database helpers
     # ─────────────────────────────────────────────
-    def _load_db(self) -> dict:
-        if not os.path.exists(self.db_filepath):
-            with open(self.db_filepath, 'w') as f:
-                json.dump({"rooms": {}}, f)
-            return {"rooms": {}}
-        with open(self.db_filepath, 'r') as f:
-            return json.load(f)
-
-    def _save_db(self):
-        with open(self.db_filepath, 'w') as f:
-            json.dump(self.db, f, indent=4)
+    async def _load_db(self) -> dict:
+        rooms = await self.client.store.private_rooms.all()
+        return {"rooms": {str(r["channel_id"]): r for r in rooms}}
 
     def _get_room(self, channel_id: int) -> dict | None:
         return self.db["rooms"].get(str(channel_id))
 
-    def _set_room(self, channel_id: int, data: dict):
+    async def _set_room(self, channel_id: int, data: dict):
+        data["channel_id"] = channel_id
         self.db["rooms"][str(channel_id)] = data
-        self._save_db()
-
-    def _delete_room(self, channel_id: int):
+        self._index_room(channel_id, data)
+        if data["status"] == "active":
+            self._schedule(channel_id, self._parse_activity(data["last_activity"]))
+        else:
+            self._unschedule(channel_id)
+        await self.client.store.private_rooms.upsert(data)
+
+    async def _delete_room(self, channel_id: int):
         self.db["rooms"].pop(str(channel_id), None)
-        self._save_db()
+        self._unindex_room(channel_id)
+        self._unschedule(channel_id)
+        await self.client.store.private_rooms.delete(channel_id)
+
+    def _index_room(self, channel_id: int, room: dict):
+        self._unindex_room(channel_id)
+        if room["status"] == "active":
+            self._active_by_owner.setdefault(room["owner_id"], set()).add(channel_id)
+            self._indexed_owner[channel_id] = room["owner_id"]
+
+    def _unindex_room(self, channel_id: int):
+        owner_id = self._indexed_owner.pop(channel_id, None)
+        if owner_id is None:
+            return
+        rooms = self._active_by_owner.get(owner_id)
+        if rooms:
+            rooms.discard(channel_id)
+            if not rooms:
+                del self._active_by_owner[owner_id]
 
     def _touch_activity(self, channel_id: int):
+        """Record activity in memory and the journal; the flush loop persists it in batches."""
         room = self._get_room(channel_id)
         if room and room["status"] == "active":
-            room["last_activity"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-            self._set_room(channel_id, room)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            room["last_activity"] = now.isoformat()
+            self._activity[channel_id] = now.timestamp()
+            self._dirty_activity.add(channel_id)
+            self._journal_activity(channel_id, room["last_activity"])
+
+    # ─────────────────────────────────────────────
+    # Inactivity deadlines
+    # ─────────────────────────────────────────────
+    @staticmethod
+    def _parse_activity(value: str) -> float:
+        last_activity = datetime.datetime.fromisoformat(value)
+        # Ensure timezone-aware comparison
+        if last_activity.tzinfo is None:
+            last_activity = last_activity.replace(tzinfo=datetime.timezone.utc)
+        return last_activity.timestamp()
+
+    def _push_deadline(self, channel_id: int, deadline: float):
+        self._scheduled[channel_id] = deadline
+        heapq.heappush(self._deadlines, (deadline, channel_id))
+        if self._deadlines[0][1] == channel_id:
+            # New earliest deadline: wake the loop so it re-arms its sleep
+            self._deadline_changed.set()
+
+    def _schedule(self, channel_id: int, last_activity: float):
+        self._activity[channel_id] = max(last_activity, self._activity.get(channel_id, 0.0))
+        deadline = self._activity[channel_id] + INACTIVITY_THRESHOLD_HOURS * 3600
+        scheduled = self._scheduled.get(channel_id)
+        if scheduled is None or deadline < scheduled:
+            self._push_deadline(channel_id, deadline)
+
+    def _unschedule(self, channel_id: int):
+        # The heap entry is left in place and discarded when it surfaces
+        self._activity.pop(channel_id, None)
+        self._scheduled.pop(channel_id, None)
+
+    # ─────────────────────────────────────────────
+    # Write-behind activity flushing
+    # ─────────────────────────────────────────────
+    # The journal holds one "<channel_id> <iso timestamp>" line per touch since the
+    # last successful flush. Lines go to the OS on every write (no fsync), so a
+    # process crash loses nothing that was journalled; a host power loss can
+    # still lose up to ACTIVITY_FLUSH_SECONDS of activity.
+    def _open_journal(self):
+        try:
+            self._journal = open(ACTIVITY_JOURNAL_FILEPATH, 'a', buffering=1, encoding='utf-8')
+        except OSError as e:
+            self._journal = None
+            print(f"[PrivateChannels] Activity journal unavailable, activity is only flushed every {ACTIVITY_FLUSH_SECONDS}s: {e}")
+
+    def _journal_activity(self, channel_id: int, timestamp: str):
+        if self._journal is None:
+            return
+        try:
+            self._journal.write(f"{channel_id} {timestamp}\n")
+        except OSError as e:
+            print(f"[PrivateChannels] Could not write the activity journal: {e}")
+
+    def _truncate_journal(self):
+        """Drop flushed lines, keeping the rooms touched while the flush ran."""
+        if self._journal is None:
+            return
+        try:
+            self._journal.seek(0)
+            self._journal.truncate()
+            for cid in self._dirty_activity:
+                if room := self._get_room(cid):
+                    self._journal.write(f"{cid} {room['last_activity']}\n")
+        except OSError as e:
+            print(f"[PrivateChannels] Could not truncate the activity journal: {e}")
+
+    @staticmethod
+    def _read_journal() -> dict[int, str]:
+        """Latest journalled timestamp per channel; unreadable lines are skipped."""
+        if not os.path.exists(ACTIVITY_JOURNAL_FILEPATH):
+            return {}
+        latest: dict[int, str] = {}
+        try:
+            with open(ACTIVITY_JOURNAL_FILEPATH, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        cid, ts = line.split()
+                        cid = int(cid)
+                    except ValueError:
+                        continue  # A torn last line from a crash
+                    if ts > latest.get(cid, ""):
+                        latest[cid] = ts
+        except OSError as e:
+            print(f"[PrivateChannels] Ignoring unreadable activity journal: {e}")
+        return latest
+
+    async def _persist_activity(self, batch: dict[int, str]):
+        def _update(conn):
+            conn.executemany(
+                "UPDATE private_rooms SET last_activity = ? WHERE channel_id = ?",
+                [(ts, cid) for cid, ts in batch.items()]
+            )
+        await self.client.store.transaction(_update)
+
+    async def _flush_activity(self):
+        """Write every dirty activity timestamp in one transaction, then truncate the journal."""
+        if not self._dirty_activity:
+            return
+        dirty, self._dirty_activity = self._dirty_activity, set()
+        batch = {
+            cid: room["last_activity"]
+            for cid in dirty if (room := self._get_room(cid))
+        }
+        if not batch:
+            return
+        try:
+            await self._persist_activity(batch)
+        except Exception as e:
+            # Keep the rooms dirty so the next tick retries them; the journal still has them
+            self._dirty_activity |= batch.keys()
+            print(f"[PrivateChannels] Failed to flush activity for {len(batch)} room(s): {e}")
+            return
+        self._truncate_journal()
+
+    async def _replay_activity_journal(self):
+        batch = self._read_journal()
+        replayed = {}
+        for cid, ts in batch.items():
+            room = self._get_room(cid)
+            if not room:
+                continue
+            if ts > room["last_activity"]:
+                room["last_activity"] = ts
+            replayed[cid] = room["last_activity"]
+        if replayed:
+            await self._persist_activity(replayed)
+            print(f"[PrivateChannels] Replayed {len(replayed)} activity update(s) from the journal.")
+        if os.path.exists(ACTIVITY_JOURNAL_FILEPATH):
+            os.remove(ACTIVITY_JOURNAL_FILEPATH)
+
+    @tasks.loop(seconds=ACTIVITY_FLUSH_SECONDS)
+    async def activity_flush_loop(self):
+        await self._flush_activity()
 
     def _count_active_rooms(self, owner_id: int) -> int:
-        return sum(
-            1 for r in self.db["rooms"].values()
-            if r["owner_id"] == owner_id and r["status"] == "active"
+        return len(self._active_by_owner.get(owner_id, ()))
+
+    # ─────────────────────────────────────────────
+    # Startup reconciliation
+    # ─────────────────────────────────────────────
+    def _adopt_room(self, guild: discord.Guild, channel: discord.abc.GuildChannel) -> dict | None:
+        """Rebuild a room record from a live channel's topic and overwrites; None if the owner is unclear."""
+        member_overwrites = {
+            target.id: overwrite for target, overwrite in channel.overwrites.items()
+            if not isinstance(target, discord.Role) and target.id != guild.me.id
+        }
+        match = OWNER_TOPIC_PATTERN.search(getattr(channel, "topic", None) or "")
+        owner_id = int(match.group(1)) if match else next(
+            (tid for tid, ow in member_overwrites.items() if ow.manage_messages), None
         )
+        if owner_id is None:
+            return None
+
+        owner_overwrite = member_overwrites.pop(owner_id, None)
+        locked = owner_overwrite is not None and owner_overwrite.view_channel is False
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        return {
+            "channel_id": channel.id,
+            "owner_id": owner_id,
+            "type": "voice" if isinstance(channel, discord.VoiceChannel) else "text",
+            "members": [tid for tid, ow in member_overwrites.items() if locked or ow.view_channel],
+            "status": "locked" if locked else "active",
+            "created_at": channel.created_at.isoformat(),
+            # Adopted rooms get a full inactivity window from now
+            "last_activity": now,
+        }
+
+    async def _is_orphan(self, channel_id: int) -> bool:
+        """True only when Discord confirms the channel no longer exists."""
+        if self.client.get_channel(channel_id) is not None:
+            return False
+        try:
+            await self.client.fetch_channel(channel_id)
+        except discord.NotFound:
+            return True
+        except discord.HTTPException:
+            pass  # Forbidden or a transient error: keep the room and look again next start
+        return False
+
+    async def _reconcile(self):
+        """Drop rooms whose channel is gone and adopt 🔒- channels the room map doesn't know about.
+
+        A room missing from the cache is only dropped once fetch_channel says
+        NotFound, so a guild that is unavailable or partly cached at READY keeps
+        its rooms. Adoption only sees guilds that are available at the time.
+        """
+        await self.client.wait_until_ready()
+        try:
+            orphans = [
+                int(cid) for cid in list(self.db["rooms"]) if await self._is_orphan(int(cid))
+            ]
+            adopted = []
+            for guild in self.client.guilds:
+                category = None if guild.unavailable else guild.get_channel(PRIVATE_CATEGORY_ID)
+                if not isinstance(category, discord.CategoryChannel):
+                    continue
+                for channel in category.channels:
+                    if not channel.name.startswith(ROOM_NAME_PREFIX) or self._get_room(channel.id):
+                        continue
+                    room = self._adopt_room(guild, channel)
+                    if room is None:
+                        print(f"[PrivateChannels] Could not work out the owner of {channel.name} ({channel.id}); left untracked.")
+                        continue
+                    adopted.append(room)
+
+            if orphans or adopted:
+                store = self.client.store
+
+                def _write(conn):
+                    for channel_id in orphans:
+                        store.private_rooms._sync_delete(conn, (channel_id,))
+                    store.private_rooms._sync_upsert_many(conn, adopted)
+
+                await store.transaction(_write)
+                for channel_id in orphans:
+                    self.db["rooms"].pop(str(channel_id), None)
+                    self._unindex_room(channel_id)
+                    self._unschedule(channel_id)
+                for room in adopted:
+                    self.db["rooms"][str(room["channel_id"])] = room
+                    self._index_room(room["channel_id"], room)
+                    if room["status"] == "active":
+                        self._schedule(room["channel_id"], self._parse_activity(room["last_activity"]))
+                print(f"[PrivateChannels] Reconciled rooms: {len(orphans)} orphan(s) removed, {len(adopted)} adopted.")
+        except Exception as e:
+            print(f"[PrivateChannels] Room reconciliation failed: {e}")
+        finally:
+            self.reconciled.set()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # /private commands only act on room state once it matches the live channels
+        if self.reconciled.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self.reconciled.wait(), RECONCILE_WAIT_SECONDS)
+            return True
+        except asyncio.TimeoutError:
+            await interaction.response.send_message("⏳ Private channels are still starting up. Please try again in a moment.", ephemeral=True)
+            return False
 
     # ─────────────────────────────────────────────
     # Logging helper
     # ─────────────────────────────────────────────
     async def _log_event(self, guild: discord.Guild, action: str, description: str, color: discord.Color, user: discord.Member | discord.User | None = None):
-        log_channel = discord.utils.get(guild.channels, name=LOG_CHANNEL_NAME)
+        log_channel = self.client.resolver.channel(guild, LOG_CHANNEL_NAME)
         if not log_channel:
             try:
                 overwrites = {
@@ -86,10 +390,7 @@ class PrivateChannels(commands.Cog):
         if user:
             embed.set_footer(text=f"User ID: {user.id}", icon_url=user.display_avatar.url if user.display_avatar else None)
 
-        try:
-            await log_channel.send(embed=embed)
-        except Exception as e:
-            print(f"[PrivateChannels] Failed to send log: {e}")
+        self.client.log_sink.emit(log_channel, embed)
 
     # ─────────────────────────────────────────────
     # Permission helpers
@@ -122,6 +423,46 @@ class PrivateChannels(commands.Cog):
             connect=False
         )
 
+    async def _apply_overwrites(self, channel: discord.abc.GuildChannel,
+                                changes: dict[int, discord.PermissionOverwrite], operation: str):
+        """Apply per-member overwrite changes in a single channel edit.
+
+        The edit replaces the channel's whole overwrite map at once, so a failure leaves
+        the previous permissions untouched; callers update the room only after it succeeds.
+        Server errors are retried with backoff; anything else is raised immediately.
+        """
+        # Keyed by ID so cached members, uncached members and roles merge cleanly
+        targets = {target.id: (target, overwrite) for target, overwrite in channel.overwrites.items()}
+        for target_id, overwrite in changes.items():
+            target = targets[target_id][0] if target_id in targets else (
+                channel.guild.get_member(target_id) or discord.Object(id=target_id)
+            )
+            targets[target_id] = (target, overwrite)
+        overwrites = dict(targets.values())
+
+        stats = self.overwrite_stats.setdefault(
+            operation, {"calls": 0, "retries": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        started = time.perf_counter()
+        try:
+            for attempt in range(OVERWRITE_ATTEMPTS):
+                try:
+                    await channel.edit(overwrites=overwrites)
+                    break
+                except discord.HTTPException as e:
+                    if e.status < 500 or attempt == OVERWRITE_ATTEMPTS - 1:
+                        raise
+                    stats["retries"] += 1
+                    await asyncio.sleep(OVERWRITE_BACKOFF_SECONDS * 2 ** attempt)
+        except Exception:
+            stats["failures"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
     # ─────────────────────────────────────────────
     # Slash command group: /private
     # ─────────────────────────────────────────────
@@ -189,7 +530,7 @@ class PrivateChannels(commands.Cog):
                 "created_at": now.isoformat(),
                 "last_activity": now.isoformat()
             }
-            self._set_room(channel.id, room_data)
+            await self._set_room(channel.id, room_data)
 
             await interaction.followup.send(
                 f"✅ Your private {channel_type.value} channel has been created: {channel.mention}",
@@ -246,7 +587,7 @@ class PrivateChannels(commands.Cog):
             channel = interaction.channel
             await channel.set_permissions(user, overwrite=self._member_overwrite())
             room["members"].append(user.id)
-            self._set_room(interaction.channel_id, room)
+            await self._set_room(interaction.channel_id, room)
             self._touch_activity(interaction.channel_id)
 
             await interaction.response.send_message(f"✅ {user.mention} has been added to this channel.")
@@ -276,7 +617,7 @@ class PrivateChannels(commands.Cog):
             channel = interaction.channel
             await channel.set_permissions(user, overwrite=None)
             room["members"].remove(user.id)
-            self._set_room(interaction.channel_id, room)
+            await self._set_room(interaction.channel_id, room)
             self._touch_activity(interaction.channel_id)
 
             await interaction.response.send_message(f"✅ {user.mention} has been removed from this channel.")
@@ -334,10 +675,11 @@ class PrivateChannels(commands.Cog):
             channel = interaction.channel
             old_owner = interaction.user
 
-            # Demote old owner to member permissions
-            await channel.set_permissions(old_owner, overwrite=self._member_overwrite())
-            # Promote new owner
-            await channel.set_permissions(user, overwrite=self._owner_overwrite())
+            # Demote old owner to member permissions and promote the new owner in one edit
+            await self._apply_overwrites(channel, {
+                old_owner.id: self._member_overwrite(),
+                user.id: self._owner_overwrite(),
+            }, "transfer")
 
             # Update DB: swap owner, manage members list
             room["owner_id"] = user.id
@@ -347,7 +689,7 @@ class PrivateChannels(commands.Cog):
             # Remove new owner from members list (they are now owner)
             if user.id in room["members"]:
                 room["members"].remove(user.id)
-            self._set_room(interaction.channel_id, room)
+            await self._set_room(interaction.channel_id, room)
             self._touch_activity(interaction.channel_id)
 
             await interaction.response.send_message(
@@ -417,21 +759,15 @@ class PrivateChannels(commands.Cog):
             channel = interaction.channel
             guild = interaction.guild
 
-            # Restore owner permissions
-            owner = guild.get_member(room["owner_id"])
-            if owner:
-                await channel.set_permissions(owner, overwrite=self._owner_overwrite())
-
-            # Restore member permissions
-            for mid in room["members"]:
-                member = guild.get_member(mid)
-                if member:
-                    await channel.set_permissions(member, overwrite=self._member_overwrite())
+            # Restore owner and member permissions in one edit
+            changes = {mid: self._member_overwrite() for mid in room["members"]}
+            changes[room["owner_id"]] = self._owner_overwrite()
+            await self._apply_overwrites(channel, changes, "reopen")
 
             # Update status and activity
             room["status"] = "active"
             room["last_activity"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
-            self._set_room(interaction.channel_id, room)
+            await self._set_room(interaction.channel_id, room)
 
             await interaction.followup.send("✅ This channel has been reopened. All previous members have regained access.", ephemeral=True)
             await self._log_event(
@@ -455,14 +791,18 @@ class PrivateChannels(commands.Cog):
             return await interaction.response.send_message("ℹ️ This channel is already locked.", ephemeral=True)
 
         await interaction.response.defer(ephemeral=True)
-        await self._lock_room(interaction.guild, interaction.channel, room)
 
-        await interaction.followup.send("✅ This channel has been locked.", ephemeral=True)
-        await self._log_event(
-            interaction.guild, "🔒 Lock (Manual)",
-            f"**{interaction.user.mention}** manually locked <#{interaction.channel_id}>",
-            discord.Color.red(), interaction.user
-        )
+        try:
+            await self._lock_room(interaction.guild, interaction.channel, room)
+
+            await interaction.followup.send("✅ This channel has been locked.", ephemeral=True)
+            await self._log_event(
+                interaction.guild, "🔒 Lock (Manual)",
+                f"**{interaction.user.mention}** manually locked <#{interaction.channel_id}>",
+                discord.Color.red(), interaction.user
+            )
+        except Exception as e:
+            await interaction.followup.send(f"❌ Failed to lock channel: {e}", ephemeral=True)
 
     # ── /private unlock (alias for reopen) ───────
     @private_group.command(name="unlock", description="[Admin] Unlock a locked private channel (alias for reopen).")
@@ -492,7 +832,7 @@ class PrivateChannels(commands.Cog):
             discord.Color.dark_red(), interaction.user
         )
 
-        self._delete_room(channel_id)
+        await self._delete_room(channel_id)
 
         try:
             await interaction.channel.delete(reason=f"Private channel deleted by {interaction.user}")
@@ -504,71 +844,83 @@ class PrivateChannels(commands.Cog):
     # ─────────────────────────────────────────────
     async def _lock_room(self, guild: discord.Guild, channel: discord.abc.GuildChannel, room: dict):
         """Hide the channel from owner and all members."""
-        # Hide from owner
-        owner = guild.get_member(room["owner_id"])
-        if owner:
-            await channel.set_permissions(owner, overwrite=self._hidden_overwrite())
-
-        # Hide from all members
-        for mid in room["members"]:
-            member = guild.get_member(mid)
-            if member:
-                await channel.set_permissions(member, overwrite=self._hidden_overwrite())
+        # Hide from owner and all members in one edit
+        hidden = {mid: self._hidden_overwrite() for mid in [room["owner_id"], *room["members"]]}
+        await self._apply_overwrites(channel, hidden, "lock")
 
         # Update DB
         room["status"] = "locked"
-        self._set_room(channel.id, room)
+        await self._set_room(channel.id, room)
 
     # ─────────────────────────────────────────────
     # Inactivity check loop
     # ─────────────────────────────────────────────
-    @tasks.loop(minutes=5)
-    async def inactivity_check_loop(self):
-        await self.client.wait_until_ready()
-
-        now = datetime.datetime.now(datetime.timezone.utc)
-        threshold = datetime.timedelta(hours=INACTIVITY_THRESHOLD_HOURS)
-
-        # Iterate over a copy of keys since we may modify during iteration
-        for channel_id_str, room in list(self.db["rooms"].items()):
-            if room["status"] != "active":
-                continue
-
-            last_activity = datetime.datetime.fromisoformat(room["last_activity"])
-            # Ensure timezone-aware comparison
-            if last_activity.tzinfo is None:
-                last_activity = last_activity.replace(tzinfo=datetime.timezone.utc)
+    async def _inactivity_loop(self):
+        await self.reconciled.wait()
+        while True:
+            self._deadline_changed.clear()
+            for channel_id in self._pop_due(time.time()):
+                try:
+                    await self._auto_lock(channel_id)
+                except Exception as e:
+                    # One bad room must not end the loop for every other room
+                    print(f"[PrivateChannels] Auto-lock check failed for {channel_id}: {e}")
+
+            timeout = self._deadlines[0][0] - time.time() if self._deadlines else None
+            try:
+                await asyncio.wait_for(self._deadline_changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _pop_due(self, now: float) -> list[int]:
+        """Pop every expired deadline; rooms with newer activity are pushed back with their real deadline."""
+        due = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, channel_id = heapq.heappop(self._deadlines)
+            last_activity = self._activity.get(channel_id)
+            if self._scheduled.get(channel_id) != deadline or last_activity is None:
+                continue  # Superseded or unscheduled
+            real_deadline = last_activity + INACTIVITY_THRESHOLD_HOURS * 3600
+            if real_deadline > now:
+                self._push_deadline(channel_id, real_deadline)
+            else:
+                del self._scheduled[channel_id]
+                due.append(channel_id)
+        return due
 
-            if now - last_activity < threshold:
-                continue
+    async def _auto_lock(self, channel_id: int):
+        room = self._get_room(channel_id)
+        if not room or room["status"] != "active":
+            return
 
+        try:
             # Find the channel across all guilds the bot is in
-            channel = self.client.get_channel(int(channel_id_str))
+            channel = self.client.get_channel(channel_id)
             if not channel:
-                # Channel was deleted externally, clean up DB
-                self._delete_room(int(channel_id_str))
-                continue
+                if await self._is_orphan(channel_id):
+                    # Channel was deleted externally, clean up DB
+                    await self._delete_room(channel_id)
+                    return
+                raise RuntimeError("channel is not cached")
 
             guild = channel.guild
-
-            try:
-                await self._lock_room(guild, channel, room)
-                await self._log_event(
-                    guild, "🔒 Lock (Auto)",
-                    f"<#{channel_id_str}> was auto-locked due to **{INACTIVITY_THRESHOLD_HOURS}h** of inactivity.",
-                    discord.Color.dark_orange()
-                )
-                print(f"[PrivateChannels] Auto-locked channel {channel.name} ({channel_id_str}) due to inactivity.")
-            except Exception as e:
-                print(f"[PrivateChannels] Failed to auto-lock {channel_id_str}: {e}")
+            await self._lock_room(guild, channel, room)
+            await self._log_event(
+                guild, "🔒 Lock (Auto)",
+                f"<#{channel_id}> was auto-locked due to **{INACTIVITY_THRESHOLD_HOURS}h** of inactivity.",
+                discord.Color.dark_orange()
+            )
+            print(f"[PrivateChannels] Auto-locked channel {channel.name} ({channel_id}) due to inactivity.")
+        except Exception as e:
+            print(f"[PrivateChannels] Failed to auto-lock {channel_id}: {e}")
+            if room["status"] == "active" and channel_id not in self._scheduled:
+                self._push_deadline(channel_id, time.time() + LOCK_RETRY_SECONDS)
 
     # ─────────────────────────────────────────────
     # Activity tracking listeners
     # ─────────────────────────────────────────────
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
+    async def track_message_activity(self, ctx: MessageContext):
+        message = ctx.message
         # Only track if this channel is a known private room
         room = self._get_room(message.channel.id)
         if room and room["status"] == "active":
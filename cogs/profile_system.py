@@ -4,11 +4,70 @@ from discord import app_commands
 from discord.ext import commands
 from discord.ui import View, Button, Modal, TextInput
 import typing
-import json
-import os
 import re
+import math
 from utils import is_authorized
 
+# --- Talent Search Configuration ---
+# How much a query term counts depending on which profile field it matched
+SEARCH_FIELD_WEIGHTS = {"skills": 3.0, "certification": 2.0, "experience": 1.0}
+SEARCH_RESULTS_PER_PAGE = 5
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+NOT_PROVIDED = "Not Provided"  # Stored for empty optional fields; never indexed
+
+
+def tokenize(text: str | None) -> set[str]:
+    if not text:
+        return set()
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+# --- Inverted Index over profile fields ---
+class TalentIndex:
+    """Maps each term to the users whose skills/experience/certification contain it."""
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = {}
+        self._terms: dict[int, dict[str, float]] = {}
+
+    def __len__(self):
+        return len(self._terms)
+
+    def update(self, user_id: int, profile: dict):
+        self.remove(user_id)
+        terms: dict[str, float] = {}
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            value = (profile.get(field) or "").strip()
+            if not value or value == NOT_PROVIDED:
+                continue
+            for term in tokenize(value):
+                terms[term] = max(terms.get(term, 0.0), weight)
+        for term, weight in terms.items():
+            self._postings.setdefault(term, {})[user_id] = weight
+        self._terms[user_id] = terms
+
+    def remove(self, user_id: int):
+        for term in self._terms.pop(user_id, {}):
+            postings = self._postings[term]
+            postings.pop(user_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        """Rank users by how many query terms they match, then by idf-weighted score."""
+        total = len(self._terms)
+        matched: dict[int, int] = {}
+        scores: dict[int, float] = {}
+        for term in tokenize(query):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for user_id, weight in postings.items():
+                matched[user_id] = matched.get(user_id, 0) + 1
+                scores[user_id] = scores.get(user_id, 0.0) + weight * idf
+        return sorted(scores.items(), key=lambda item: (-matched[item[0]], -item[1]))
+
 # --- Profile Modal (The form users will fill) ---
 class ProfileSetModal(Modal, title="Set Your Professional Profile"):
     display_name = TextInput(
@@ -40,7 +99,7 @@ class ProfileSetModal(Modal, title="Set Your Professional Profile"):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
-        log_channel = discord.utils.get(interaction.guild.channels, name="profile-log")
+        log_channel = interaction.client.resolver.channel(interaction.guild, "profile-log")
         if not log_channel:
             return await interaction.response.send_message("❌ Error: `#profile-log` channel not found. Please ask an admin to create it.", ephemeral=True)
 
@@ -51,9 +110,9 @@ class ProfileSetModal(Modal, title="Set Your Professional Profile"):
         approval_embed.set_author(name=f"{interaction.user.name} ({interaction.user.id})", icon_url=interaction.user.display_avatar.url)
         approval_embed.add_field(name="👤 Name", value=self.display_name.value, inline=False)
         approval_embed.add_field(name="💼 Skills", value=self.skills.value, inline=False)
-        approval_embed.add_field(name="📂 Portfolio", value=self.portfolio.value or "Not Provided", inline=False)
-        approval_embed.add_field(name="📊 Experience", value=self.experience.value or "Not Provided", inline=False)
-        approval_embed.add_field(name="📜 Certifications", value=self.certification.value or "Not Provided", inline=False)
+        approval_embed.add_field(name="📂 Portfolio", value=self.portfolio.value or NOT_PROVIDED, inline=False)
+        approval_embed.add_field(name="📊 Experience", value=self.experience.value or NOT_PROVIDED, inline=False)
+        approval_embed.add_field(name="📜 Certifications", value=self.certification.value or NOT_PROVIDED, inline=False)
         
         view = ApprovalView()
         await log_channel.send(embed=approval_embed, view=view)
@@ -65,18 +124,8 @@ class ApprovalView(View):
     def __init__(self):
         super().__init__(timeout=None)
 
-    def _save_profile(self, user_id: int, profile_data: dict):
-        filepath = "profiles.json"
-        if not os.path.exists(filepath): profiles = {}
-        else:
-            with open(filepath, 'r') as f:
-                try: profiles = json.load(f)
-                except json.JSONDecodeError: profiles = {}
-        
-        profiles[str(user_id)] = profile_data
-        
-        with open(filepath, 'w') as f:
-            json.dump(profiles, f, indent=4)
+    async def _save_profile(self, client: commands.Bot, user_id: int, profile_data: dict):
+        await client.get_cog("ProfileSystem").save_profile(user_id, profile_data)
 
     @discord.ui.button(label="Approve", style=discord.ButtonStyle.green, custom_id="approve_profile_final")
     async def approve(self, interaction: discord.Interaction, button: Button):
@@ -99,7 +148,7 @@ class ApprovalView(View):
             "certification": original_embed.fields[4].value
         }
         
-        self._save_profile(user_id_from_author, profile_data)
+        await self._save_profile(interaction.client, user_id_from_author, profile_data)
 
         approved_embed = original_embed
         approved_embed.title = "Profile Approved"
@@ -145,21 +194,80 @@ class ApprovalView(View):
             try: await user.send(f"Sorry, your profile submission on **{interaction.guild.name}** was not approved.")
             except discord.Forbidden: pass
 
+# --- Paginated search results ---
+class TalentResultsView(View):
+    def __init__(self, cog: "ProfileSystem", invoker_id: int, query: str, results: list[tuple[int, float]]):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.invoker_id = invoker_id
+        self.query = query
+        self.results = results
+        self.page = 0
+        self.pages = max(1, math.ceil(len(results) / SEARCH_RESULTS_PER_PAGE))
+        self._sync_buttons()
+
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    def build_embed(self) -> discord.Embed:
+        # Embed titles are capped at 256 characters
+        embed = discord.Embed(title=f"🔍 Talent matching \"{self.query[:200]}\"", color=discord.Color.blue())
+        start = self.page * SEARCH_RESULTS_PER_PAGE
+        for rank, (user_id, _score) in enumerate(self.results[start:start + SEARCH_RESULTS_PER_PAGE], start + 1):
+            profile = self.cog.profiles.get(user_id)
+            if not profile:
+                continue
+            value = f"<@{user_id}>\n**💼 Skills:** {profile['skills']}"
+            if profile.get("experience") and profile["experience"] != NOT_PROVIDED:
+                value += f"\n**📊 Experience:** {profile['experience']}"
+            embed.add_field(name=f"#{rank} • {profile['name']}", value=value[:1024], inline=False)
+        embed.set_footer(text=f"Page {self.page + 1}/{self.pages} • {len(self.results)} match(es) • Use /profile @user for details")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.invoker_id:
+            await interaction.response.send_message("Only the person who ran the search can change pages.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: Button):
+        self.page -= 1
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: Button):
+        self.page += 1
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
 # --- Cog Class ---
 class ProfileSystem(commands.Cog):
     def __init__(self, client):
         self.client = client
-        self.profiles_filepath = "profiles.json"
+        self.profiles: dict[int, dict] = {}
+        self.talent_index = TalentIndex()
 
-    def _load_profiles(self):
-        if not os.path.exists(self.profiles_filepath): return {}
-        with open(self.profiles_filepath, 'r') as f:
-            try: return json.load(f)
-            except json.JSONDecodeError: return {}
-            
-    def _save_profiles(self, profiles_data: dict):
-        with open(self.profiles_filepath, 'w') as f:
-            json.dump(profiles_data, f, indent=4)
+    async def cog_load(self):
+        for profile in await self.client.store.profiles.all():
+            self.profiles[profile["user_id"]] = profile
+            self.talent_index.update(profile["user_id"], profile)
+
+    async def save_profile(self, user_id: int, profile_data: dict):
+        profile = {"user_id": user_id, **profile_data}
+        await self.client.store.profiles.upsert(profile)
+        self.profiles[user_id] = profile
+        self.talent_index.update(user_id, profile)
+
+    async def delete_profile(self, user_id: int) -> bool:
+        if user_id not in self.profiles:
+            return False
+        await self.client.store.profiles.delete(user_id)
+        del self.profiles[user_id]
+        self.talent_index.remove(user_id)
+        return True
 
     @app_commands.command(name="setprofile", description="Set or update your professional profile.")
     async def setprofile(self, interaction: discord.Interaction):
@@ -170,8 +278,7 @@ class ProfileSystem(commands.Cog):
     async def profile(self, interaction: discord.Interaction, user: typing.Optional[discord.Member] = None):
         target_user = user or interaction.user
         
-        profiles = self._load_profiles()
-        user_profile = profiles.get(str(target_user.id))
+        user_profile = self.profiles.get(target_user.id)
 
         if not user_profile:
             msg = "You do not have an approved profile yet. Use `/setprofile` to create one." if target_user == interaction.user else f"{target_user.display_name} does not have an approved profile yet."
@@ -184,9 +291,9 @@ class ProfileSystem(commands.Cog):
         description = (
             f"**👤 Name:** {user_profile['name']}\n"
             f"**💼 Skills:** {user_profile['skills']}\n"
-            f"**📂 Portfolio:** {user_profile.get('portfolio', 'Not Provided')}\n"
-            f"**📊 Experience:** {user_profile.get('experience', 'Not Provided')}\n"
-            f"**📜 Certification:** {user_profile.get('certification', 'Not Provided')}"
+            f"**📂 Portfolio:** {user_profile.get('portfolio') or 'Not Provided'}\n"
+            f"**📊 Experience:** {user_profile.get('experience') or 'Not Provided'}\n"
+            f"**📜 Certification:** {user_profile.get('certification') or 'Not Provided'}"
         )
         
         profile_embed.description = description
@@ -206,17 +313,12 @@ class ProfileSystem(commands.Cog):
         if user and not is_authorized(interaction):
             return await interaction.response.send_message("❌ You need admin permission to delete another user's profile.", ephemeral=True)
         
-        profiles = self._load_profiles()
-        
-        if str(target_user.id) not in profiles:
+        # Delete the profile (False if there was nothing to delete)
+        deleted = await self.delete_profile(target_user.id)
+
+        if not deleted:
             msg = "You do not have a profile to delete." if target_user == interaction.user else f"{target_user.display_name} does not have a profile."
             return await interaction.response.send_message(msg, ephemeral=True)
-            
-        # Delete the profile from the dictionary
-        del profiles[str(target_user.id)]
-        
-        # Save the updated dictionary to the JSON file
-        self._save_profiles(profiles)
         
         # Send confirmation
         if user: # Admin deleted someone's profile
@@ -228,6 +330,16 @@ class ProfileSystem(commands.Cog):
         else: # User deleted their own profile
             await interaction.response.send_message("✅ Your profile has been successfully deleted.", ephemeral=True)
 
+    @app_commands.command(name="findtalent", description="Search approved profiles by skills, experience or certifications.")
+    @app_commands.describe(query="What you are looking for (e.g., python django, logo design).")
+    async def findtalent(self, interaction: discord.Interaction, query: str):
+        results = self.talent_index.search(query)
+        if not results:
+            return await interaction.response.send_message(f"No profiles matched `{query[:200]}`. Try different or fewer keywords.", ephemeral=True)
+
+        view = TalentResultsView(self, interaction.user.id, query, results)
+        await interaction.response.send_message(embed=view.build_embed(), view=view)
+
 
 async def setup(client):
     await client.add_cog(ProfileSystem(client))
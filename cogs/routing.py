@@ -0,0 +1,52 @@
+# cogs/routing.py
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+
+class Routing(commands.Cog):
+    """Admin controls for the slash command channel routing table (routing.json)."""
+
+    def __init__(self, client: commands.Bot):
+        self.client = client
+
+    routing_group = app_commands.Group(
+        name="routing",
+        description="Manage where bot commands can be used (Admins only).",
+        default_permissions=discord.Permissions(administrator=True),
+    )
+
+    @routing_group.command(name="reload", description="Reload routing.json without restarting the bot.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def routing_reload(self, interaction: discord.Interaction):
+        router = self.client.router
+        try:
+            router.load()
+        except Exception as e:
+            print(f"[Routing] Failed to reload {router.filepath}: {e}")
+            return await interaction.response.send_message(
+                f"❌ Could not reload `{router.filepath}`; the previous rules are still active.\n**Error:** {e}", ephemeral=True
+            )
+        config = router.config
+        await interaction.response.send_message(
+            f"✅ Routing reloaded: {len(config.commands)} command rule(s), {len(config.channel_groups)} channel group(s).",
+            ephemeral=True,
+        )
+
+    @routing_group.command(name="stats", description="Show allowed/rejected counts per command.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def routing_stats(self, interaction: discord.Interaction):
+        router = self.client.router
+        names = sorted(set(router.passed) | set(router.rejected), key=lambda n: -router.rejected[n])
+        lines = [f"`/{n}` — {router.passed[n]} allowed, {router.rejected[n]} rejected" for n in names[:25]]
+        embed = discord.Embed(
+            title="Command Routing",
+            description="\n".join(lines) or "No routed commands yet.",
+            color=discord.Color.blurple(),
+        )
+        embed.set_footer(text=f"Config version {router.config_version} • Admins and authorized users bypass routing")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(client):
+    await client.add_cog(Routing(client))
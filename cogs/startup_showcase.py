@@ -2,41 +2,358 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-import os
+import asyncio
+import bisect
 import datetime
+import time
+from outbound import OutboundDispatcher, Priority, channel_bucket
 
 # ─────────────────────────────────────────────────
 # Configuration
 # ─────────────────────────────────────────────────
 SHOWCASE_CHANNEL_ID = 1524586288127283290
-DB_FILEPATH = "startups_showcase.json"
 PRIMARY_FOUNDER_ID = 759445506426142781
+# Minimum seconds between two label edits on the same showcase card
+LABEL_REFRESH_WINDOW_SECONDS = 5.0
+# Leaderboard periods and their window in days (None = all-time)
+LEADERBOARD_PERIODS = {"all": None, "week": 7, "month": 30}
+LEADERBOARD_TITLES = {"all": "All-Time", "week": "This Week", "month": "This Month"}
+LEADERBOARD_SIZE = 10
+
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+
+def _day_of(iso_timestamp: str | None) -> int:
+    if not iso_timestamp:
+        return 0
+    return int(datetime.datetime.fromisoformat(iso_timestamp).timestamp() // 86400)
 
 
 # ─────────────────────────────────────────────────
-# Database Helpers
+# Leaderboard
+# ─────────────────────────────────────────────────
+class Ranking:
+    """Showcase IDs kept sorted by score; updates are a bisect, reads are a slice."""
+
+    def __init__(self, keep_zero: bool = False):
+        self.keep_zero = keep_zero
+        self._order: list[tuple[int, int]] = []
+        self._scores: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def score(self, showcase_id: int) -> int:
+        return self._scores.get(showcase_id, 0)
+
+    def discard(self, showcase_id: int):
+        old = self._scores.pop(showcase_id, None)
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, (-old, showcase_id))]
+
+    def set(self, showcase_id: int, score: int):
+        self.discard(showcase_id)
+        if score or self.keep_zero:
+            self._scores[showcase_id] = score
+            bisect.insort(self._order, (-score, showcase_id))
+
+    def add(self, showcase_id: int, delta: int):
+        self.set(showcase_id, self.score(showcase_id) + delta)
+
+    def top(self, n: int) -> list[tuple[int, int]]:
+        return [(showcase_id, -neg) for neg, showcase_id in self._order[:n]]
+
+
+class ShowcaseLeaderboard:
+    """All-time, weekly and monthly rankings maintained vote by vote.
+
+    Windowed scores come from per-day vote buckets. Windows only shift
+    once a day, and that is the only time the rankings are rescored.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.rankings = {period: Ranking(keep_zero=days is None) for period, days in LEADERBOARD_PERIODS.items()}
+        self._buckets: dict[int, dict[int, int]] = {}
+        self._day = _today()
+        self._embeds: dict[str, tuple[tuple, discord.Embed]] = {}
+
+    def rebuild(self, showcases):
+        self._reset()
+        horizon = self._day - max(d for d in LEADERBOARD_PERIODS.values() if d)
+        for s in showcases:
+            buckets = self._buckets[s["id"]] = {}
+            for day in s["upvotes"].values():
+                if day > horizon:
+                    buckets[day] = buckets.get(day, 0) + 1
+            self.rankings["all"].set(s["id"], len(s["upvotes"]))
+            self._rescore_windows(s["id"])
+
+    def _rescore_windows(self, showcase_id: int):
+        buckets = self._buckets.get(showcase_id, {})
+        for period, days in LEADERBOARD_PERIODS.items():
+            if days:
+                score = sum(c for d, c in buckets.items() if d > self._day - days)
+                self.rankings[period].set(showcase_id, score)
+
+    def _roll(self):
+        today = _today()
+        if today == self._day:
+            return
+        self._day = today
+        horizon = today - max(d for d in LEADERBOARD_PERIODS.values() if d)
+        for showcase_id, buckets in self._buckets.items():
+            for day in [d for d in buckets if d <= horizon]:
+                del buckets[day]
+            self._rescore_windows(showcase_id)
+
+    def add(self, showcase_id: int):
+        self._buckets[showcase_id] = {}
+        self.rankings["all"].set(showcase_id, 0)
+
+    def remove(self, showcase_id: int):
+        self._buckets.pop(showcase_id, None)
+        for ranking in self.rankings.values():
+            ranking.discard(showcase_id)
+
+    def _apply_vote(self, showcase_id: int, day: int, delta: int):
+        self._roll()
+        self.rankings["all"].add(showcase_id, delta)
+        buckets = self._buckets.setdefault(showcase_id, {})
+        if day in buckets or delta > 0:
+            buckets[day] = buckets.get(day, 0) + delta
+            if not buckets[day]:
+                del buckets[day]
+            for period, days in LEADERBOARD_PERIODS.items():
+                if days and day > self._day - days:
+                    self.rankings[period].add(showcase_id, delta)
+
+    def vote_added(self, showcase_id: int, day: int):
+        self._apply_vote(showcase_id, day, 1)
+
+    def vote_removed(self, showcase_id: int, day: int):
+        self._apply_vote(showcase_id, day, -1)
+
+    def top(self, period: str, n: int = LEADERBOARD_SIZE) -> list[tuple[int, int]]:
+        self._roll()
+        return self.rankings[period].top(n)
+
+    def cached_embed(self, period: str, signature: tuple) -> discord.Embed | None:
+        cached = self._embeds.get(period)
+        if cached and cached[0] == signature:
+            return cached[1]
+        return None
+
+    def cache_embed(self, period: str, signature: tuple, embed: discord.Embed):
+        self._embeds[period] = (signature, embed)
+
+
 # ─────────────────────────────────────────────────
-def load_db() -> dict:
-    if not os.path.exists(DB_FILEPATH):
-        data = {"next_id": 1, "showcases": {}}
-        with open(DB_FILEPATH, "w") as f:
-            json.dump(data, f, indent=4)
-        return data
-    with open(DB_FILEPATH, "r") as f:
-        return json.load(f)
+# Showcase Repository
+# ─────────────────────────────────────────────────
+class ShowcaseRepository:
+    """All showcases held in memory, indexed by ID and by card message ID.
+
+    Reads and vote toggles never touch disk. Each mutation is applied in
+    memory first, then queued for a single writer task that persists it
+    row by row in order.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.showcases: dict[int, dict] = {}
+        self._by_message: dict[int, dict] = {}
+        self.leaderboard = ShowcaseLeaderboard()
+        self._thread_locks: dict[int, asyncio.Lock] = {}
+        self._writes: asyncio.Queue = asyncio.Queue()
+        self._writer_task: asyncio.Task | None = None
+
+    async def load(self):
+        for s in await self.store.showcases.all():
+            # user_id -> day the vote was cast
+            s["upvotes"] = {}
+            self._index(s)
+        for vote in await self.store.showcase_upvotes.all():
+            showcase = self.showcases.get(vote["showcase_id"])
+            if showcase:
+                showcase["upvotes"][vote["user_id"]] = _day_of(vote["voted_at"])
+        self.leaderboard.rebuild(self.showcases.values())
+
+    def start(self):
+        self._writer_task = asyncio.create_task(self._writer())
+
+    async def close(self):
+        await self._writes.join()
+        if self._writer_task:
+            self._writer_task.cancel()
+
+    # ── Single writer ─────────────────────────────
+    async def _writer(self):
+        while True:
+            op = await self._writes.get()
+            try:
+                await op()
+            except Exception as e:
+                print(f"[StartupShowcase] Failed to persist showcase change: {e}")
+            finally:
+                self._writes.task_done()
+
+    def _persist(self, op):
+        self._writes.put_nowait(op)
+
+    # ── Lookups ───────────────────────────────────
+    def _index(self, showcase: dict):
+        self.showcases[showcase["id"]] = showcase
+        if showcase.get("message_id"):
+            self._by_message[showcase["message_id"]] = showcase
+
+    def get(self, showcase_id: int) -> dict | None:
+        return self.showcases.get(showcase_id)
+
+    def get_by_message_id(self, message_id: int) -> dict | None:
+        return self._by_message.get(message_id)
+
+    def by_founder(self, founder_id: int) -> list[dict]:
+        return [s for s in self.showcases.values() if s["founder_id"] == founder_id]
+
+    def thread_lock(self, showcase_id: int) -> asyncio.Lock:
+        return self._thread_locks.setdefault(showcase_id, asyncio.Lock())
+
+    # ── Mutations ─────────────────────────────────
+    async def next_id(self) -> int:
+        return await self.store.next_value("showcase_id")
+
+    def add(self, showcase: dict):
+        showcase.setdefault("upvotes", {})
+        self._index(showcase)
+        self.leaderboard.add(showcase["id"])
+        self._persist(lambda: self.store.showcases.upsert(showcase))
+
+    def toggle_upvote(self, showcase: dict, user_id: int) -> bool:
+        """Flip the user's vote. Returns True if the vote was added."""
+        upvotes: dict[int, int] = showcase["upvotes"]
+        showcase_id = showcase["id"]
+        if user_id in upvotes:
+            self.leaderboard.vote_removed(showcase_id, upvotes.pop(user_id))
+            self._persist(lambda: self.store.showcase_upvotes.delete(showcase_id, user_id))
+            return False
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        upvotes[user_id] = _day_of(now.isoformat())
+        self.leaderboard.vote_added(showcase_id, upvotes[user_id])
+        vote = {
+            "showcase_id": showcase_id,
+            "user_id": user_id,
+            "voted_at": now.isoformat()
+        }
+        self._persist(lambda: self.store.showcase_upvotes.upsert(vote))
+        return True
+
+    def set_thread(self, showcase: dict, thread_id: int):
+        showcase["thread_id"] = thread_id
+        self._persist(lambda: self.store.showcases.update(showcase["id"], thread_id=thread_id))
+
+    def remove(self, showcase_id: int) -> dict | None:
+        showcase = self.showcases.pop(showcase_id, None)
+        if not showcase:
+            return None
+        self._by_message.pop(showcase.get("message_id"), None)
+        self._thread_locks.pop(showcase_id, None)
+        self.leaderboard.remove(showcase_id)
+
+        async def _delete():
+            await self.store.showcases.delete(showcase_id)
+            await self.store.showcase_upvotes.delete_where(showcase_id=showcase_id)
+        self._persist(_delete)
+        return showcase
+
+
+def get_repository(client: commands.Bot) -> ShowcaseRepository:
+    return client.get_cog("StartupShowcase").repository
 
 
-def save_db(db: dict):
-    with open(DB_FILEPATH, "w") as f:
-        json.dump(db, f, indent=4)
+def get_label_refresher(client: commands.Bot) -> "LabelRefresher":
+    return client.get_cog("StartupShowcase").label_refresher
 
 
-def get_showcase_by_message_id(db: dict, message_id: int) -> dict | None:
-    for s in db.get("showcases", {}).values():
-        if s.get("message_id") == message_id:
-            return s
-    return None
+# ─────────────────────────────────────────────────
+# Upvote Label Coalescer
+# ─────────────────────────────────────────────────
+class LabelRefresher:
+    """Collapses upvote label edits into at most one edit per card per window.
+
+    The first click after a quiet period edits straight away; clicks inside
+    the window only mark the card pending, and a single trailing edit shows
+    whatever the count is when the window closes.
+    """
+
+    def __init__(self, outbound: OutboundDispatcher, window: float = LABEL_REFRESH_WINDOW_SECONDS):
+        self.outbound = outbound
+        self.window = window
+        self._pending: dict[int, tuple[discord.Message, dict]] = {}
+        self._requests: dict[int, int] = {}
+        self._last_edit: dict[int, float] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self.requested = 0
+        self.edits = 0
+
+    @property
+    def edits_saved(self) -> int:
+        return self.requested - self.edits - sum(self._requests.values())
+
+    def request(self, message: discord.Message, showcase: dict):
+        self.requested += 1
+        self._pending[message.id] = (message, showcase)
+        self._requests[message.id] = self._requests.get(message.id, 0) + 1
+        if message.id not in self._tasks:
+            self._tasks[message.id] = asyncio.create_task(self._run(message.id))
+
+    async def _run(self, message_id: int):
+        loop = asyncio.get_running_loop()
+        try:
+            while message_id in self._pending:
+                delay = self._last_edit.get(message_id, 0.0) + self.window - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                message, showcase = self._pending.pop(message_id)
+                self._requests.pop(message_id, None)
+                self._last_edit[message_id] = loop.time()
+                await self._edit(message, showcase)
+                self.edits += 1
+                self._prune(loop.time())
+        finally:
+            self._tasks.pop(message_id, None)
+
+    def _prune(self, now: float):
+        """Forget edit times outside the window; those cards would edit straight away anyway."""
+        for message_id, edited_at in list(self._last_edit.items()):
+            if now - edited_at >= self.window:
+                del self._last_edit[message_id]
+
+    async def _edit(self, message: discord.Message, showcase: dict):
+        view = ShowcaseVoteView(website_url=showcase.get("link"))
+        view.children[0].label = f"🚀 Upvote ({len(showcase['upvotes'])})"
+        try:
+            # Cosmetic: may be shed under pressure; the next upvote refreshes the label anyway
+            await self.outbound.call(Priority.COSMETIC, channel_bucket(message.channel.id, "edit"), lambda: message.edit(view=view))
+        except Exception as e:
+            print(f"[StartupShowcase] Failed to edit view button label: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "edits": self.edits,
+            "edits_saved": self.edits_saved,
+            "pending": len(self._pending),
+        }
+
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
 
 
 # ─────────────────────────────────────────────────
@@ -60,47 +377,44 @@ class ShowcaseVoteView(discord.ui.View):
         custom_id="showcase_upvote_button"
     )
     async def upvote_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        db = load_db()
-        showcase = get_showcase_by_message_id(db, interaction.message.id)
+        repository = get_repository(interaction.client)
+        showcase = repository.get_by_message_id(interaction.message.id)
         if not showcase:
             return await interaction.response.send_message(
                 "❌ Could not find showcase data in database.", ephemeral=True
             )
 
-        upvotes: list[int] = showcase.setdefault("upvotes", [])
-        user_id = interaction.user.id
+        added = repository.toggle_upvote(showcase, interaction.user.id)
+        upvote_count = len(showcase["upvotes"])
 
-        if user_id in upvotes:
-            upvotes.remove(user_id)
-            msg = f"↩️ Removed your upvote from **{showcase['name']}**."
+        if added:
+            msg = f"🚀 You upvoted **{showcase['name']}**! Total Upvotes: **{upvote_count}**"
         else:
-            upvotes.append(user_id)
-            msg = f"🚀 You upvoted **{showcase['name']}**! Total Upvotes: **{len(upvotes)}**"
-
-        save_db(db)
-
-        # Update button label live
-        button.label = f"🚀 Upvote ({len(upvotes)})"
-        try:
-            await interaction.message.edit(view=self)
-        except Exception as e:
-            print(f"[StartupShowcase] Failed to edit view button label: {e}")
+            msg = f"↩️ Removed your upvote from **{showcase['name']}**."
 
         await interaction.response.send_message(msg, ephemeral=True)
 
+        # Update button label live (coalesced per card)
+        get_label_refresher(interaction.client).request(interaction.message, showcase)
+
     @discord.ui.button(
         label="💬 Discussion Thread",
         style=discord.ButtonStyle.secondary,
         custom_id="showcase_discuss_button"
     )
     async def discuss_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        db = load_db()
-        showcase = get_showcase_by_message_id(db, interaction.message.id)
+        repository = get_repository(interaction.client)
+        showcase = repository.get_by_message_id(interaction.message.id)
         if not showcase:
             return await interaction.response.send_message(
                 "❌ Could not find showcase data in database.", ephemeral=True
             )
 
+        # Two quick clicks must not open two threads
+        async with repository.thread_lock(showcase["id"]):
+            await self._open_discussion(interaction, repository, showcase)
+
+    async def _open_discussion(self, interaction: discord.Interaction, repository: ShowcaseRepository, showcase: dict):
         thread_id = showcase.get("thread_id")
         if thread_id:
             thread = interaction.guild.get_thread(thread_id)
@@ -121,8 +435,7 @@ class ShowcaseVoteView(discord.ui.View):
                 name=f"💬 {showcase['name']} — Q&A & Discussion",
                 auto_archive_duration=10080
             )
-            showcase["thread_id"] = thread.id
-            save_db(db)
+            repository.set_thread(showcase, thread.id)
 
             founder_id = showcase["founder_id"]
             founder_mention = f"<@{founder_id}>"
@@ -199,9 +512,8 @@ class ShowcaseLaunchModal(discord.ui.Modal, title="🚀 Launch Startup Showcase"
                     ephemeral=True
                 )
 
-        db = load_db()
-        showcase_id = db["next_id"]
-        db["next_id"] += 1
+        repository = get_repository(interaction.client)
+        showcase_id = await repository.next_id()
 
         embed = discord.Embed(
             title=f"🚀 {self.startup_name.value} — {self.tagline.value}",
@@ -229,7 +541,7 @@ class ShowcaseLaunchModal(discord.ui.Modal, title="🚀 Launch Startup Showcase"
                 ephemeral=True
             )
 
-        db["showcases"][str(showcase_id)] = {
+        repository.add({
             "id": showcase_id,
             "founder_id": interaction.user.id,
             "name": self.startup_name.value,
@@ -240,10 +552,8 @@ class ShowcaseLaunchModal(discord.ui.Modal, title="🚀 Launch Startup Showcase"
             "message_id": msg.id,
             "channel_id": channel.id,
             "thread_id": None,
-            "upvotes": [],
             "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
-        }
-        save_db(db)
+        })
 
         await interaction.response.send_message(
             f"🎉 Congratulations! **{self.startup_name.value}** has been launched in {channel.mention}!\n"
@@ -258,6 +568,16 @@ class ShowcaseLaunchModal(discord.ui.Modal, title="🚀 Launch Startup Showcase"
 class StartupShowcase(commands.Cog):
     def __init__(self, client: commands.Bot):
         self.client = client
+        self.repository = ShowcaseRepository(client.store)
+        self.label_refresher = LabelRefresher(client.outbound)
+
+    async def cog_load(self):
+        await self.repository.load()
+        self.repository.start()
+
+    async def cog_unload(self):
+        self.label_refresher.cancel()
+        await self.repository.close()
 
     showcase_group = app_commands.Group(
         name="showcase",
@@ -268,47 +588,58 @@ class StartupShowcase(commands.Cog):
     async def showcase_launch(self, interaction: discord.Interaction):
         await interaction.response.send_modal(ShowcaseLaunchModal())
 
-    @showcase_group.command(name="leaderboard", description="View the top startups ranked by community upvotes.")
-    async def showcase_leaderboard(self, interaction: discord.Interaction):
-        db = load_db()
-        showcases = list(db.get("showcases", {}).values())
-        if not showcases:
-            return await interaction.response.send_message(
-                "ℹ️ No startups have been launched yet. Run `/showcase launch` to be the first!",
-                ephemeral=True
-            )
-
-        # Sort by upvote count descending
-        showcases.sort(key=lambda s: len(s.get("upvotes", [])), reverse=True)
-        top_startups = showcases[:10]
+    def _render_leaderboard(self, period: str) -> discord.Embed:
+        """Build the leaderboard embed, reusing the cached one while the top-N is unchanged."""
+        repository = self.repository
+        leaderboard = repository.leaderboard
+        top = leaderboard.top(period)
+        signature = (tuple(top), len(repository.showcases))
+        embed = leaderboard.cached_embed(period, signature)
+        if embed:
+            return embed
 
         medals = ["🥇", "🥈", "🥉"]
         lines = []
-        for index, s in enumerate(top_startups):
+        for index, (showcase_id, upvote_count) in enumerate(top):
+            s = repository.get(showcase_id)
             rank_icon = medals[index] if index < 3 else f"`#{index + 1}`"
-            upvote_count = len(s.get("upvotes", []))
             lines.append(
                 f"{rank_icon} **{s['name']}** (`{s['category']}`) — **{upvote_count}** 🚀\n"
                 f"└ *{s['tagline']}* • Founder: <@{s['founder_id']}>"
             )
 
         embed = discord.Embed(
-            title="🏆 Startup Showcase Leaderboard",
-            description="\n\n".join(lines),
+            title=f"🏆 Startup Showcase Leaderboard — {LEADERBOARD_TITLES[period]}",
+            description="\n\n".join(lines) if lines else "No upvotes in this period yet.",
             color=discord.Color.gold(),
             timestamp=datetime.datetime.now(datetime.timezone.utc)
         )
-        embed.set_footer(text=f"Total Showcases: {len(showcases)}")
+        embed.set_footer(text=f"Total Showcases: {len(repository.showcases)}")
+        leaderboard.cache_embed(period, signature, embed)
+        return embed
+
+    @showcase_group.command(name="leaderboard", description="View the top startups ranked by community upvotes.")
+    @app_commands.describe(period="Ranking window (default: all-time).")
+    @app_commands.choices(period=[
+        app_commands.Choice(name="All-Time", value="all"),
+        app_commands.Choice(name="This Week", value="week"),
+        app_commands.Choice(name="This Month", value="month"),
+    ])
+    async def showcase_leaderboard(self, interaction: discord.Interaction, period: app_commands.Choice[str] | None = None):
+        if not self.repository.showcases:
+            return await interaction.response.send_message(
+                "ℹ️ No startups have been launched yet. Run `/showcase launch` to be the first!",
+                ephemeral=True
+            )
+
+        embed = self._render_leaderboard(period.value if period else "all")
         await interaction.response.send_message(embed=embed)
 
     @showcase_group.command(name="list", description="List all startup showcases launched by a user.")
     @app_commands.describe(user="Filter by a specific founder (leave blank for your own).")
     async def showcase_list(self, interaction: discord.Interaction, user: discord.Member | None = None):
         target = user or interaction.user
-        db = load_db()
-        user_showcases = [
-            s for s in db.get("showcases", {}).values() if s.get("founder_id") == target.id
-        ]
+        user_showcases = self.repository.by_founder(target.id)
 
         if not user_showcases:
             return await interaction.response.send_message(
@@ -318,7 +649,7 @@ class StartupShowcase(commands.Cog):
 
         lines = []
         for s in user_showcases:
-            upvotes = len(s.get("upvotes", []))
+            upvotes = len(s["upvotes"])
             lines.append(
                 f"• **#{s['id']} | {s['name']}** — {upvotes} 🚀 upvotes (`{s['category']}`)"
             )
@@ -333,8 +664,7 @@ class StartupShowcase(commands.Cog):
     @showcase_group.command(name="delete", description="Delete a startup showcase post.")
     @app_commands.describe(showcase_id="The numeric ID of the showcase to delete.")
     async def showcase_delete(self, interaction: discord.Interaction, showcase_id: int):
-        db = load_db()
-        s = db["showcases"].get(str(showcase_id))
+        s = self.repository.get(showcase_id)
         if not s:
             return await interaction.response.send_message(
                 f"❌ Showcase `#{showcase_id}` not found.",
@@ -362,8 +692,7 @@ class StartupShowcase(commands.Cog):
             except Exception:
                 pass
 
-        db["showcases"].pop(str(showcase_id), None)
-        save_db(db)
+        self.repository.remove(showcase_id)
 
         await interaction.response.send_message(
             f"✅ Showcase `#{showcase_id}` (**{s['name']}**) has been deleted.",
@@ -1,10 +1,23 @@
 # cogs/ticket_system.py
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import View, Button, Select
+import asyncio
 import datetime
-import io
+import os
+import time
+from collections import deque
+from transcripts import export_transcript
+
+TICKETS_CATEGORY_NAME = "TICKETS"
+
+# --- Warm pool of hidden, pre-created ticket channels ---
+TICKET_POOL_SIZE = int(os.getenv("TICKET_POOL_SIZE", "3"))  # Spare channels kept per guild (0 disables)
+TICKET_POOL_REFILL_SECONDS = 30      # At most one channel is created per guild per tick
+TICKET_POOL_CHANNEL_NAME = "ticket-spare"
+TICKET_POOL_TOPIC = "Unclaimed ticket channel (warm pool)."
+OPEN_LATENCY_WINDOW = 200            # Recent ticket-open timings kept for percentiles
 
 # --- Helper Embeds for instant responses ---
 
@@ -63,7 +76,7 @@ class TicketCloseView(View):
         await interaction.response.send_message("Logging the ticket and deleting it permanently...", ephemeral=True)
 
         try:
-            log_channel = discord.utils.get(interaction.guild.channels, name="ticket-logs")
+            log_channel = interaction.client.resolver.channel(interaction.guild, "ticket-logs")
             if not log_channel:
                 overwrites = {
                     interaction.guild.default_role: discord.PermissionOverwrite(read_messages=False),
@@ -71,13 +84,16 @@ class TicketCloseView(View):
                 }
                 log_channel = await interaction.guild.create_text_channel("ticket-logs", overwrites=overwrites)
 
-            messages = [message async for message in interaction.channel.history(limit=None, oldest_first=True)]
-            transcript_content = "\n".join(
-                f"[{message.created_at.strftime('%Y-%m-%d %H:%M:%S')}] {message.author.name}: {message.content}" for message in messages
-            )
+            # Streamed page by page into gzip text/HTML on spooled temp files
+            transcript = await export_transcript(interaction.channel)
 
             owner_mention = "Unknown User"
-            if interaction.channel.topic and interaction.channel.topic.startswith("Ticket for "):
+            tickets = interaction.client.get_cog("TicketSystem")
+            owner_id = tickets.owner_of(interaction.channel.id) if tickets else None
+            if owner_id:
+                ticket_owner = interaction.guild.get_member(owner_id)
+                owner_mention = ticket_owner.mention if ticket_owner else f"<@{owner_id}>"
+            elif interaction.channel.topic and interaction.channel.topic.startswith("Ticket for "):
                 try:
                     user_id = int(interaction.channel.topic.split(" ")[2])
                     ticket_owner = interaction.guild.get_member(user_id)
@@ -94,13 +110,23 @@ class TicketCloseView(View):
             log_embed.add_field(name="Ticket Owner", value=owner_mention, inline=True)
             log_embed.add_field(name="Closed By", value=interaction.user.mention, inline=True)
             log_embed.add_field(name="Ticket Channel", value=f"`{interaction.channel.name}`", inline=False)
+            log_embed.add_field(
+                name="Transcript",
+                value=f"{transcript.index['messages']} messages • {transcript.index['attachments']} attachments • {len(transcript.index['participants'])} participants",
+                inline=False,
+            )
 
-            transcript_file = discord.File(io.StringIO(transcript_content), filename=f"{interaction.channel.name}-transcript.txt")
-            await log_channel.send(embed=log_embed, file=transcript_file)
+            try:
+                await log_channel.send(embed=log_embed, files=transcript.files(interaction.guild.filesize_limit))
+            finally:
+                transcript.close()
             
         except Exception as e:
             print(f"Error creating ticket log: {e}")
         
+        tickets = interaction.client.get_cog("TicketSystem")
+        if tickets:
+            await tickets.forget_ticket(interaction.channel.id)
         await interaction.channel.delete()
 
 
@@ -119,14 +145,34 @@ class TicketCreateView(View):
         ]
     )
     async def select_callback(self, interaction: discord.Interaction, select: Select):
-        category = discord.utils.get(interaction.guild.categories, name="TICKETS")
-        if category:
-            for channel in category.channels:
-                if isinstance(channel, discord.TextChannel) and channel.topic and channel.topic.startswith(f"Ticket for {interaction.user.id}"):
-                    await interaction.response.send_message(f"You already have an open ticket ({channel.mention}). Please close it before opening a new one.", ephemeral=True)
+        tickets = interaction.client.get_cog("TicketSystem")
+        if not tickets:
+            # The cog is mid-reload; the persistent view outlives it
+            await interaction.response.send_message("❌ The ticket system is restarting. Please try again in a moment.", ephemeral=True)
+            return
+        key = (interaction.guild.id, interaction.user.id)
+        lock = tickets.lock_for(key)
+        if lock.locked():
+            # A previous click is still creating this user's ticket
+            await interaction.response.send_message("⏳ Your ticket is already being created.", ephemeral=True)
+            return
+
+        try:
+            async with lock:
+                existing = tickets.open_ticket(interaction.guild, interaction.user.id)
+                if existing:
+                    await interaction.response.send_message(f"You already have an open ticket ({existing.mention}). Please close it before opening a new one.", ephemeral=True)
                     return
+                await self._create_ticket(interaction, select, tickets)
+        finally:
+            # Only needed while a creation is running; the open-ticket index prevents duplicates after
+            tickets.release_lock(key, lock)
 
+    async def _create_ticket(self, interaction: discord.Interaction, select: Select, tickets: "TicketSystem"):
+        started = time.perf_counter()
+        category = interaction.client.resolver.category(interaction.guild, TICKETS_CATEGORY_NAME)
         await interaction.response.defer(ephemeral=True)
+        reason = select.values[0]
         
         user_string = str(interaction.user)
         ticket_channel_name = f"ticket-{user_string.replace('#', '-')}"
@@ -137,7 +183,7 @@ class TicketCreateView(View):
             interaction.guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
         }
         
-        support_role = discord.utils.get(interaction.guild.roles, name="Support Team")
+        support_role = interaction.client.resolver.role(interaction.guild, "Support Team")
         if support_role:
             overwrites[support_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
 
@@ -147,27 +193,36 @@ class TicketCreateView(View):
                     interaction.guild.default_role: discord.PermissionOverwrite(read_messages=False),
                     interaction.guild.me: discord.PermissionOverwrite(read_messages=True)
                 }
-                category = await interaction.guild.create_category("TICKETS", overwrites=category_overwrites)
+                category = await interaction.guild.create_category(TICKETS_CATEGORY_NAME, overwrites=category_overwrites)
             
-            channel = await interaction.guild.create_text_channel(
-                name=ticket_channel_name, 
-                overwrites=overwrites, 
-                category=category,
-                topic=f"Ticket for {interaction.user.id}. Reason: {select.values[0]}"
-            )
+            topic = f"Ticket for {interaction.user.id}. Reason: {reason}"
+            # A spare channel from the warm pool needs one edit; otherwise create one as before
+            channel = await tickets.claim_pooled(interaction.guild, name=ticket_channel_name, topic=topic, overwrites=overwrites)
+            pooled = channel is not None
+            if channel is None:
+                channel = await interaction.guild.create_text_channel(
+                    name=ticket_channel_name, 
+                    overwrites=overwrites, 
+                    category=category,
+                    topic=topic
+                )
+            await tickets.register_ticket(interaction.guild.id, interaction.user.id, channel.id, reason)
 
             await interaction.followup.send(f"Your ticket has been created: {channel.mention}", ephemeral=True)
+            tickets.record_open((time.perf_counter() - started) * 1000, pooled)
             
-            welcome_embed = discord.Embed(title=f"Ticket: {select.values[0]}", description=f"Welcome {interaction.user.mention}! The support team will be with you shortly.", color=discord.Color.green())
-            await channel.send(embed=welcome_embed, view=TicketCloseView())
+            welcome_embed = discord.Embed(title=f"Ticket: {reason}", description=f"Welcome {interaction.user.mention}! The support team will be with you shortly.", color=discord.Color.green())
+            embeds = [welcome_embed]
 
             # --- INSTANT RESPONSE SYSTEM ---
-            if select.values[0] == "Verification":
-                await channel.send(embed=get_verification_embed())
-            elif select.values[0] == "Report User":
-                await channel.send(embed=get_report_embed())
-            elif select.values[0] == "Middleman Request": # Notun response
-                await channel.send(embed=get_middleman_embed())
+            # Sent with the welcome in one message instead of a second send
+            if reason == "Verification":
+                embeds.append(get_verification_embed())
+            elif reason == "Report User":
+                embeds.append(get_report_embed())
+            elif reason == "Middleman Request": # Notun response
+                embeds.append(get_middleman_embed())
+            await channel.send(embeds=embeds, view=TicketCloseView())
 
         except Exception as e:
             await interaction.followup.send(f"An error occurred while creating the ticket. Error: {e}", ephemeral=True)
@@ -177,6 +232,188 @@ class TicketCreateView(View):
 class TicketSystem(commands.Cog):
     def __init__(self, client):
         self.client = client
+        # Open tickets: (guild ID, user ID) -> ticket row, plus the reverse channel index
+        self.tickets: dict[tuple[int, int], dict] = {}
+        self._by_channel: dict[int, tuple[int, int]] = {}
+        # Per-user creation locks so two fast clicks can never create two tickets
+        self._locks: dict[tuple[int, int], asyncio.Lock] = {}
+        self._reconcile_task: asyncio.Task | None = None
+        # Warm pool: guild ID -> spare channel IDs, plus recent open timings (ms)
+        self.pool: dict[int, list[int]] = {}
+        self.open_latencies: deque[float] = deque(maxlen=OPEN_LATENCY_WINDOW)
+        self.opens = {"pooled": 0, "created": 0}
+        self.pool_created = 0
+        self.pool_errors = 0
+
+    async def cog_load(self):
+        for row in await self.client.store.tickets.all():
+            self._index(row)
+        self._reconcile_task = asyncio.create_task(self._reconcile())
+
+    async def cog_unload(self):
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        self.refill_pool.cancel()
+
+    # ─────────────────────────────────
+    # Open-ticket index
+    # ─────────────────────────────────
+    def _index(self, row: dict):
+        key = (row["guild_id"], row["user_id"])
+        self.tickets[key] = row
+        self._by_channel[row["channel_id"]] = key
+
+    def lock_for(self, key: tuple[int, int]) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def release_lock(self, key: tuple[int, int], lock: asyncio.Lock):
+        if self._locks.get(key) is lock and not lock.locked():
+            del self._locks[key]
+
+    def owner_of(self, channel_id: int) -> int | None:
+        key = self._by_channel.get(channel_id)
+        return key[1] if key else None
+
+    def open_ticket(self, guild: discord.Guild, user_id: int) -> discord.TextChannel | None:
+        row = self.tickets.get((guild.id, user_id))
+        if not row:
+            return None
+        channel = guild.get_channel(row["channel_id"])
+        if channel is None:
+            # Deleted while we weren't looking; the delete listener/reconcile will drop the row
+            return None
+        return channel
+
+    async def register_ticket(self, guild_id: int, user_id: int, channel_id: int, reason: str):
+        previous = self.tickets.get((guild_id, user_id))
+        if previous:
+            self._by_channel.pop(previous["channel_id"], None)
+        row = {
+            "guild_id": guild_id,
+            "user_id": user_id,
+            "channel_id": channel_id,
+            "reason": reason,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        self._index(row)
+        await self.client.store.tickets.upsert(row)
+
+    async def forget_ticket(self, channel_id: int):
+        key = self._by_channel.pop(channel_id, None)
+        if key is None:
+            return
+        self.tickets.pop(key, None)
+        await self.client.store.tickets.delete(*key)
+
+    async def _reconcile(self):
+        await self.client.wait_until_ready()
+        try:
+            await self._reconcile_index()
+        except Exception as e:
+            print(f"[TicketSystem] Reconcile failed: {e}")
+        # Start refilling even after a failed reconcile; spares it missed are simply recreated
+        if TICKET_POOL_SIZE > 0 and not self.refill_pool.is_running():
+            self.refill_pool.start()
+
+    async def _reconcile_index(self):
+        """Drop rows whose channel is gone and adopt ticket channels the index doesn't know about."""
+        dropped = adopted = 0
+        for row in list(self.tickets.values()):
+            if self.client.get_channel(row["channel_id"]) is None:
+                await self.forget_ticket(row["channel_id"])
+                dropped += 1
+
+        self.pool.clear()  # Rebuilt from the channels below, so nothing is counted twice
+        for guild in self.client.guilds:
+            category = self.client.resolver.category(guild, TICKETS_CATEGORY_NAME)
+            if not category:
+                continue
+            for channel in category.text_channels:
+                if channel.topic == TICKET_POOL_TOPIC:
+                    # Spare channels survive restarts; pick them back up
+                    self.pool.setdefault(guild.id, []).append(channel.id)
+                    continue
+                if channel.id in self._by_channel or not (channel.topic and channel.topic.startswith("Ticket for ")):
+                    continue
+                try:
+                    user_id = int(channel.topic.split(" ")[2].rstrip("."))
+                except (ValueError, IndexError):
+                    continue
+                if (guild.id, user_id) in self.tickets:
+                    continue
+                reason = channel.topic.split("Reason: ", 1)[1] if "Reason: " in channel.topic else "Unknown"
+                await self.register_ticket(guild.id, user_id, channel.id, reason)
+                adopted += 1
+        if dropped or adopted:
+            print(f"[TicketSystem] Reconciled ticket index: {dropped} stale removed, {adopted} adopted.")
+
+    # ─────────────────────────────────
+    # Warm pool
+    # ─────────────────────────────────
+    async def claim_pooled(self, guild: discord.Guild, name: str, topic: str,
+                           overwrites: dict) -> discord.TextChannel | None:
+        """Turn a spare channel into a ticket with a single edit; None if the pool is empty."""
+        spare = self.pool.get(guild.id)
+        while spare:
+            channel = guild.get_channel(spare.pop())
+            if channel is None:
+                continue
+            try:
+                await channel.edit(name=name, topic=topic, overwrites=overwrites)
+            except discord.HTTPException as e:
+                self.pool_errors += 1
+                print(f"[TicketSystem] Could not claim spare channel {channel.id}: {e}")
+                continue
+            return channel
+        return None
+
+    @tasks.loop(seconds=TICKET_POOL_REFILL_SECONDS)
+    async def refill_pool(self):
+        for guild in self.client.guilds:
+            category = self.client.resolver.category(guild, TICKETS_CATEGORY_NAME)
+            if not category:
+                continue
+            spare = self.pool.setdefault(guild.id, [])
+            if len(spare) >= TICKET_POOL_SIZE:
+                continue
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True),
+            }
+            try:
+                channel = await guild.create_text_channel(
+                    TICKET_POOL_CHANNEL_NAME, category=category, overwrites=overwrites, topic=TICKET_POOL_TOPIC
+                )
+            except discord.HTTPException as e:
+                self.pool_errors += 1
+                print(f"[TicketSystem] Could not create a spare ticket channel in {guild.name}: {e}")
+                continue
+            spare.append(channel.id)
+            self.pool_created += 1
+
+    @refill_pool.error
+    async def refill_pool_error(self, error: BaseException):
+        print(f"[TicketSystem] Pool refill stopped: {error}")
+
+    def record_open(self, elapsed_ms: float, pooled: bool):
+        self.open_latencies.append(elapsed_ms)
+        self.opens["pooled" if pooled else "created"] += 1
+
+    def open_percentile(self, p: float) -> float:
+        if not self.open_latencies:
+            return 0.0
+        ordered = sorted(self.open_latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        spare = self.pool.get(channel.guild.id)
+        if spare and channel.id in spare:
+            spare.remove(channel.id)
+        await self.forget_ticket(channel.id)
 
     @app_commands.command(name="ticketsetup", description="Set up the panel for creating tickets.")
     @app_commands.describe(
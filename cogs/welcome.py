@@ -1,6 +1,7 @@
 # cogs/welcome.py
 import discord
 from discord.ext import commands
+from outbound import Priority, channel_bucket
 
 class Welcome(commands.Cog):
     def __init__(self, client):
@@ -13,7 +14,7 @@ class Welcome(commands.Cog):
             return
 
         # '👋welcome' name er channel-ti khuje ber kora hocche
-        welcome_channel = discord.utils.get(member.guild.channels, name="👋welcome")
+        welcome_channel = self.client.resolver.channel(member.guild, "👋welcome")
 
         # Jodi channel-ti na thake, tahole bot kichu korbe na
         if welcome_channel is None:
@@ -23,9 +24,9 @@ class Welcome(commands.Cog):
         # --- NOTUN WELCOME MESSAGE FORMAT ---
 
         # Server er moddhe thaka channel guloke clickable korar jonno khuje neya hocche
-        intro_channel = discord.utils.get(member.guild.channels, name="introduction")
-        general_channel = discord.utils.get(member.guild.channels, name="general")
-        service_channel = discord.utils.get(member.guild.channels, name="post-service-or-jobs")
+        intro_channel = self.client.resolver.channel(member.guild, "introduction")
+        general_channel = self.client.resolver.channel(member.guild, "general")
+        service_channel = self.client.resolver.channel(member.guild, "post-service-or-jobs")
 
         # Jodi channel paoa jay, tahole mention kora hobe, noile sadharon text dekhabe
         intro_mention = intro_channel.mention if intro_channel else "#introduction"
@@ -51,12 +52,10 @@ class Welcome(commands.Cog):
         # Niche GIF set kora hocche
         embed.set_image(url="https://media3.giphy.com/media/v1.Y2lkPTc5MGI3NjExaGE4MmxxbmkyemFjMWFoM29wYnRrb2VtOGxjc3JiNW11ancxem5pNSZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/8z7SsFoVNCEOj4vKlK/giphy.gif") # Welcome GIF
 
-        try:
-            # Welcome message pathano hocche
-            # "Hy username" er jonno member.mention deya hocche
-            await welcome_channel.send(f"Hy {member.mention}", embed=embed)
-        except Exception as e:
-            print(f"Welcome message pathate error: {e}")
+        # Welcome message pathano hocche
+        # "Hy username" er jonno member.mention deya hocche
+        # Cosmetic: during a join raid these are shed before they compete with moderation
+        self.client.outbound.submit(Priority.COSMETIC, channel_bucket(welcome_channel.id), lambda: welcome_channel.send(f"Hy {member.mention}", embed=embed))
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
@@ -73,10 +72,7 @@ class Welcome(commands.Cog):
                 return
 
         if log_channel:
-            try:
-                await log_channel.send(f"{member.mention} left")
-            except Exception as e:
-                print(f"Error sending leave log message: {e}")
+            self.client.outbound.submit(Priority.LOG, channel_bucket(log_channel.id), lambda: log_channel.send(f"{member.mention} left"))
 
 
 async def setup(client):
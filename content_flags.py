@@ -0,0 +1,145 @@
+# content_flags.py
+import re
+from dataclasses import dataclass
+from enum import IntFlag
+
+import discord
+
+URL_PATTERN = re.compile(r'https?://\S+', re.IGNORECASE)
+
+
+class ContentFlags(IntFlag):
+    """What a message contains, computed once per message."""
+    NONE = 0
+    CONTENT = 1 << 0    # Any non-blank content, URLs included
+    TEXT = 1 << 1       # Text beyond the URLs
+    LINKS = 1 << 2
+    IMAGES = 1 << 3
+    VIDEOS = 1 << 4
+    FILES = 1 << 5      # Attachments that are neither images nor videos
+    STICKERS = 1 << 6
+    COMMAND = 1 << 7    # Starts with the bot's command prefix
+
+    ATTACHMENTS = IMAGES | VIDEOS | FILES
+    MEDIA = IMAGES | VIDEOS
+
+
+# Custom-mode content types (the CustomTypeSelect values) -> flags
+CUSTOM_TYPE_FLAGS = {
+    "text": ContentFlags.TEXT,
+    "links": ContentFlags.LINKS,
+    "images": ContentFlags.IMAGES,
+    "videos": ContentFlags.VIDEOS,
+    "files": ContentFlags.FILES,
+    "stickers": ContentFlags.STICKERS,
+}
+CUSTOM_TYPES = ContentFlags.TEXT | ContentFlags.LINKS | ContentFlags.ATTACHMENTS | ContentFlags.STICKERS
+
+# Policy mode -> (deny, require): a message violates the mode if it has any
+# `deny` flag, or if `require` is set and it has none of the `require` flags.
+MODE_RULES = {
+    "text_only":         (ContentFlags.ATTACHMENTS | ContentFlags.STICKERS, ContentFlags.NONE),
+    "image_only":        (ContentFlags.NONE, ContentFlags.IMAGES),
+    "video_only":        (ContentFlags.NONE, ContentFlags.VIDEOS),
+    "media_only":        (ContentFlags.NONE, ContentFlags.MEDIA),
+    "bot_commands_only": (ContentFlags.NONE, ContentFlags.COMMAND),
+    "links_only":        (ContentFlags.NONE, ContentFlags.LINKS),
+    "no_links":          (ContentFlags.LINKS, ContentFlags.NONE),
+    "no_files":          (ContentFlags.ATTACHMENTS, ContentFlags.NONE),
+    "no_bot_commands":   (ContentFlags.COMMAND, ContentFlags.NONE),
+    "no_text":           (ContentFlags.CONTENT, ContentFlags.NONE),
+    "no_images":         (ContentFlags.IMAGES, ContentFlags.NONE),
+    "no_videos":         (ContentFlags.VIDEOS, ContentFlags.NONE),
+    "no_media":          (ContentFlags.MEDIA, ContentFlags.NONE),
+    "no_stickers":       (ContentFlags.STICKERS, ContentFlags.NONE),
+}
+BLOCK_ALL_MODES = {"read_only", "locked"}  # Nothing a non-founder sends is allowed
+
+
+# Plain ints for the hot path; IntFlag arithmetic goes through enum code on every | and &
+_CONTENT, _TEXT, _LINKS = int(ContentFlags.CONTENT), int(ContentFlags.TEXT), int(ContentFlags.LINKS)
+_IMAGES, _VIDEOS, _FILES = int(ContentFlags.IMAGES), int(ContentFlags.VIDEOS), int(ContentFlags.FILES)
+_STICKERS, _COMMAND = int(ContentFlags.STICKERS), int(ContentFlags.COMMAND)
+
+
+def classify(message: discord.Message, command_prefix: str = "!") -> int:
+    """ContentFlags of a message, as an int (wrap in ContentFlags() to inspect it)."""
+    flags = 0
+    content = message.content
+    text = content.strip()
+    if text:
+        flags = _CONTENT
+        if content.startswith(command_prefix):
+            flags |= _COMMAND
+        # One regex pass tells us both whether there are links and whether anything else is left
+        rest, links = URL_PATTERN.subn("", text)
+        if links:
+            flags |= _LINKS
+        if not links or rest.strip():
+            flags |= _TEXT
+
+    for attachment in message.attachments:
+        content_type = attachment.content_type or ""
+        if content_type.startswith("image/"):
+            flags |= _IMAGES
+        elif content_type.startswith("video/"):
+            flags |= _VIDEOS
+        else:
+            flags |= _FILES
+
+    if message.stickers:
+        flags |= _STICKERS
+    return flags
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """A channel policy reduced to integer masks.
+
+    `deny` and `requires` answer the common "is this allowed?" question with a
+    couple of ANDs; `rules` (in the policy's mode order) is only walked to
+    find the violation message once a message has failed.
+    """
+    deny: int
+    requires: tuple[int, ...]
+    rules: tuple[tuple[int, int, str], ...]   # (deny, require, mode)
+    block_all: str | None = None              # read_only/locked mode that fails whatever passes `rules`
+
+    def violation(self, flags: int) -> str | None:
+        """The first mode the message violates, or None."""
+        if not self.block_all and not flags & self.deny:
+            for require in self.requires:
+                if not flags & require:
+                    break
+            else:
+                return None
+        for deny, require, mode in self.rules:
+            if flags & deny or (require and not flags & require):
+                return mode
+        return self.block_all
+
+
+def compile_policy(modes: list[str], custom_allowed: list[str] | None = None) -> CompiledPolicy:
+    rules = []
+    block_all = None
+    for mode in modes:
+        if mode in BLOCK_ALL_MODES:
+            # Every message fails here, so later modes can never be the reason
+            block_all = mode
+            break
+        if mode == "custom":
+            allowed = 0
+            for content_type in custom_allowed or []:
+                allowed |= CUSTOM_TYPE_FLAGS.get(content_type, 0)
+            rules.append((int(CUSTOM_TYPES & ~allowed), 0, mode))
+        elif mode in MODE_RULES:
+            deny, require = MODE_RULES[mode]
+            rules.append((int(deny), int(require), mode))
+
+    deny = 0
+    requires = []
+    for rule_deny, rule_require, _ in rules:
+        deny |= rule_deny
+        if rule_require:
+            requires.append(rule_require)
+    return CompiledPolicy(deny, tuple(requires), tuple(rules), block_all)
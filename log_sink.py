@@ -0,0 +1,128 @@
+# log_sink.py
+import asyncio
+import os
+
+import discord
+
+from outbound import OutboundDispatcher, Priority, channel_bucket
+
+# --- Configuration ---
+LOG_FLUSH_SECONDS = 2.0          # Events are collected this long before a batch goes out
+EMBEDS_PER_MESSAGE = 10          # Discord's per-message embed limit
+EMBED_CHARS_PER_MESSAGE = 6000   # Discord's combined embed text limit per message
+LOG_WEBHOOKS = os.getenv("LOG_SINK_WEBHOOKS", "0") == "1"  # Send through a per-channel webhook
+LOG_WEBHOOK_NAME = "Bot Logs"
+
+
+class LogSink:
+    """Buffers log embeds per channel and sends them up to 10 to a message.
+
+    Callers emit() and return immediately. Every LOG_FLUSH_SECONDS the buffers
+    are packed into messages and queued on the outbound dispatcher as LOG work.
+    With LOG_SINK_WEBHOOKS=1 each log channel gets a webhook, so logs use the
+    webhook's rate-limit bucket instead of the bot's channel send bucket.
+    """
+
+    def __init__(self, client: discord.Client, outbound: OutboundDispatcher, use_webhooks: bool = LOG_WEBHOOKS):
+        self.client = client
+        self.outbound = outbound
+        self.use_webhooks = use_webhooks
+        self._buffers: dict[int, tuple[discord.abc.Messageable, list[discord.Embed]]] = {}
+        self._webhooks: dict[int, discord.Webhook | None] = {}  # None: webhook unavailable, use the channel
+        self._pending = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.events = 0
+        self.flushed = 0
+        self.messages = 0
+        self.webhook_messages = 0
+
+    # ─────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def close(self):
+        """Queue everything still buffered; call before the outbound dispatcher drains."""
+        if self._task:
+            self._task.cancel()
+        self.flush()
+
+    async def _run(self):
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(LOG_FLUSH_SECONDS)
+            self._pending.clear()
+            self.flush()
+
+    # ─────────────────────────────────
+    # Emitting and flushing
+    # ─────────────────────────────────
+    def emit(self, channel: discord.abc.Messageable, embed: discord.Embed):
+        self.events += 1
+        self._buffers.setdefault(channel.id, (channel, []))[1].append(embed)
+        self._pending.set()
+
+    @staticmethod
+    def _batches(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+        batches, batch, chars = [], [], 0
+        for embed in embeds:
+            size = len(embed)
+            if batch and (len(batch) == EMBEDS_PER_MESSAGE or chars + size > EMBED_CHARS_PER_MESSAGE):
+                batches.append(batch)
+                batch, chars = [], 0
+            batch.append(embed)
+            chars += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def flush(self):
+        buffers, self._buffers = self._buffers, {}
+        for channel, embeds in buffers.values():
+            for batch in self._batches(embeds):
+                self.messages += 1
+                self.flushed += len(batch)
+                bucket = f"webhook:{channel.id}" if self.use_webhooks else channel_bucket(channel.id)
+                self.outbound.submit(Priority.LOG, bucket, lambda channel=channel, batch=batch: self._deliver(channel, batch))
+
+    # ─────────────────────────────────
+    # Delivery
+    # ─────────────────────────────────
+    async def _webhook_for(self, channel: discord.TextChannel) -> discord.Webhook | None:
+        if channel.id in self._webhooks:
+            return self._webhooks[channel.id]
+        webhook = None
+        try:
+            for existing in await channel.webhooks():
+                if existing.name == LOG_WEBHOOK_NAME and existing.user == self.client.user and existing.token:
+                    webhook = existing
+                    break
+            else:
+                webhook = await channel.create_webhook(name=LOG_WEBHOOK_NAME)
+        except (discord.HTTPException, AttributeError) as e:
+            print(f"[LogSink] No webhook for #{getattr(channel, 'name', channel.id)}, sending as the bot: {e}")
+        self._webhooks[channel.id] = webhook
+        return webhook
+
+    async def _deliver(self, channel: discord.abc.Messageable, embeds: list[discord.Embed]):
+        webhook = await self._webhook_for(channel) if self.use_webhooks else None
+        if webhook is not None:
+            try:
+                await webhook.send(embeds=embeds, username=self.client.user.name,
+                                   avatar_url=self.client.user.display_avatar.url)
+                self.webhook_messages += 1
+                return
+            except discord.NotFound:
+                # Deleted by someone; fall back to the channel and look again next time
+                self._webhooks.pop(channel.id, None)
+        await channel.send(embeds=embeds)
+
+    def stats(self) -> dict:
+        return {
+            "events": self.events,
+            "messages": self.messages,
+            "webhook_messages": self.webhook_messages,
+            "buffered": sum(len(embeds) for _, embeds in self._buffers.values()),
+            "embeds_per_message": self.flushed / self.messages if self.messages else 0.0,
+        }
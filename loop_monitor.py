@@ -0,0 +1,139 @@
+# loop_monitor.py
+import asyncio
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+
+# --- Configuration ---
+LOOP_BUDGET_MS = float(os.getenv("LOOP_BUDGET_MS", "100"))  # A stall longer than this is recorded
+SAMPLE_INTERVAL_SECONDS = 0.1      # How often the loop-side sampler wakes up
+LAG_WINDOW = 600                   # Samples kept for percentiles (~1 minute)
+SLOWEST_KEPT = 10                  # Worst stalls kept with their stack snapshot
+STACK_DEPTH = 12                   # Frames kept per snapshot
+LOG_INTERVAL_SECONDS = 300         # Periodic summary line
+
+
+def _coro_name(task: asyncio.Task) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures what the loop was running when it stalled.
+
+    A coroutine on the loop sleeps SAMPLE_INTERVAL_SECONDS at a time and
+    records how late it wakes up (the lag). A watchdog thread watches that
+    heartbeat; once the loop has been silent for longer than the budget, it
+    snapshots the loop thread's stack via sys._current_frames(). The sampler
+    pairs the snapshot with the stall's final duration and keeps the slowest.
+    """
+
+    def __init__(self, budget_ms: float = LOOP_BUDGET_MS):
+        self.budget = budget_ms / 1000
+        self.lags: deque[float] = deque(maxlen=LAG_WINDOW)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._slowest: list[tuple[float, int, dict]] = []  # min-heap of (lag, seq, record)
+        self._seq = itertools.count()
+
+        self._beat = 0
+        self._last_beat = time.monotonic()
+        self._snapshot: tuple[int, str] | None = None  # (beat, stack) written by the watchdog
+        self._loop_thread_id: int | None = None
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    # ─────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._sampler = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler:
+            self._sampler.cancel()
+
+    # ─────────────────────────────────
+    # Loop side
+    # ─────────────────────────────────
+    async def _sample(self):
+        next_log = time.monotonic() + LOG_INTERVAL_SECONDS
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+            now = time.monotonic()
+            lag = max(0.0, now - start - SAMPLE_INTERVAL_SECONDS)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            if lag > self.budget:
+                self._record_stall(lag)
+            self._beat += 1
+            self._last_beat = now
+
+            if now >= next_log:
+                next_log = now + LOG_INTERVAL_SECONDS
+                print(self.summary_line())
+
+    def _record_stall(self, lag: float):
+        self.stalls += 1
+        snapshot = self._snapshot
+        stack = snapshot[1] if snapshot and snapshot[0] == self._beat else "(stack not captured)"
+        record = {"lag_ms": lag * 1000, "at": time.time(), "stack": stack}
+        entry = (lag, next(self._seq), record)
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, entry)
+        elif lag > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    # ─────────────────────────────────
+    # Watchdog thread
+    # ─────────────────────────────────
+    def _watch(self):
+        check_every = max(self.budget / 2, 0.01)
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            silent_for = time.monotonic() - self._last_beat - SAMPLE_INTERVAL_SECONDS
+            if silent_for <= self.budget or (self._snapshot and self._snapshot[0] == beat):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH))
+            self._snapshot = (beat, stack)
+
+    # ─────────────────────────────────
+    # Reporting
+    # ─────────────────────────────────
+    def percentile(self, p: float) -> float:
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def slowest(self) -> list[dict]:
+        return [record for _, _, record in sorted(self._slowest, reverse=True)]
+
+    @staticmethod
+    def task_counts() -> Counter[str]:
+        """Live tasks on the running loop, grouped by coroutine name."""
+        return Counter(_coro_name(task) for task in asyncio.all_tasks() if not task.done())
+
+    def summary_line(self) -> str:
+        tasks = self.task_counts()
+        return (
+            f"[LoopMonitor] lag p50={self.percentile(0.5) * 1000:.1f}ms p95={self.percentile(0.95) * 1000:.1f}ms "
+            f"max={self.max_lag * 1000:.0f}ms stalls>{self.budget * 1000:.0f}ms={self.stalls} tasks={sum(tasks.values())}"
+        )
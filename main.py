@@ -1,7 +1,6 @@
 # main.py
 import discord
 import os
-import json
 from discord.ext import commands
 from dotenv import load_dotenv
 
@@ -24,68 +23,64 @@ from cogs.ticket_system import TicketCreateView, TicketCloseView
 from cogs.job_service_system import JobServiceView, ApplyView # Bidding/JobPost views removed
 from cogs.profile_system import ApprovalView
 from cogs.startup_showcase import ShowcaseVoteView
-from utils import is_authorized 
+from storage import Store, migrate_json_files
+from pipeline import MessagePipeline
+from resolver import NameResolver
+from authorization import AuthorizationService
+from router import InteractionRouter, RoutedCommandTree
+from loop_monitor import LoopMonitor
+from outbound import OutboundDispatcher
+from log_sink import LogSink
 
 class MyClient(commands.Bot):
     def __init__(self):
-        super().__init__(command_prefix="!", intents=intents)
-        self.permissions_filepath = "permissions.json"
-        self.permissions = self.load_permissions()
-        self.command_channel_name = "🤖bot-command" 
-        self.profile_channel_name = "🔍find-profile" 
-
-    def load_permissions(self):
-        if not os.path.exists(self.permissions_filepath):
-            with open(self.permissions_filepath, 'w') as f:
-                json.dump({"allowed_users": [], "allowed_roles": []}, f)
-            return {"allowed_users": [], "allowed_roles": []}
-        with open(self.permissions_filepath, 'r') as f:
-            return json.load(f)
-
-    def save_permissions(self):
-        with open(self.permissions_filepath, 'w') as f:
-            json.dump(self.permissions, f, indent=4)
-
-    async def on_interaction(self, interaction: discord.Interaction):
-        if interaction.type != discord.InteractionType.application_command:
-            return await super().on_interaction(interaction)
-
-        if is_authorized(interaction):
-            return await super().on_interaction(interaction)
-
-        command_name = interaction.data.get("name")
-        
-        # Dedicated Profile Channel Check (ID: 1416508832775012497)
-        if interaction.channel and interaction.channel.id == 1416508832775012497:
-            if command_name in ["profile", "setprofile", "deleteprofile"]:
-                return await super().on_interaction(interaction)
-            else:
-                await interaction.response.send_message("❌ Only `/profile`, `/setprofile`, and `/deleteprofile` commands can be used in <#1416508832775012497>.", ephemeral=True)
-                return
-
-        # Commands allowed in any channel (not restricted to bot-command)
-        if command_name in ["private", "founder", "channel", "showcase"]:
-            return await super().on_interaction(interaction)
-
-        if command_name in ["profile", "setprofile", "deleteprofile"]:
-            profile_channel = discord.utils.get(interaction.guild.channels, name=self.profile_channel_name)
-            if (profile_channel and interaction.channel.id == profile_channel.id) or (interaction.channel and interaction.channel.id == 1416508832775012497):
-                return await super().on_interaction(interaction)
-            else:
-                error_msg = f"The `/{command_name}` command can only be used in <#1416508832775012497>."
-                await interaction.response.send_message(error_msg, ephemeral=True)
-                return
-        
-        else:
-            command_channel = discord.utils.get(interaction.guild.channels, name=self.command_channel_name)
-            if command_channel and interaction.channel.id == command_channel.id:
-                return await super().on_interaction(interaction)
-            else:
-                error_msg = f"Bot commands (except profile commands) can only be used in {command_channel.mention}." if command_channel else f"The `{self.command_channel_name}` channel has not been set up."
-                await interaction.response.send_message(error_msg, ephemeral=True)
-                return
+        # Slash commands pass through RoutedCommandTree.interaction_check (channel routing)
+        super().__init__(command_prefix="!", intents=intents, tree_cls=RoutedCommandTree)
+        self.store = Store()
+        self.outbound = OutboundDispatcher()  # Prioritised queue for outgoing REST calls
+        self.log_sink = LogSink(self, self.outbound)  # Batched log-channel embeds
+        self.pipeline = MessagePipeline(self.outbound, self.command_prefix)  # Cogs register their on_message stages here
+        self.resolver = NameResolver(self)  # Cached channel/role lookups by name
+        self.authz = AuthorizationService(self)  # Cached is_authorized decisions
+        self.router = InteractionRouter(self)  # Per-command channel rules from routing.json
+        self.loop_monitor = LoopMonitor()  # Event-loop lag and stall snapshots
+        self.permissions = {"allowed_users": [], "allowed_roles": []}
+
+    async def load_permissions(self):
+        rows = await self.store.permissions.all()
+        return {
+            "allowed_users": [r["target_id"] for r in rows if r["kind"] == "user"],
+            "allowed_roles": [r["target_id"] for r in rows if r["kind"] == "role"],
+        }
+
+    async def save_permissions(self):
+        rows = [{"kind": "user", "target_id": uid} for uid in self.permissions["allowed_users"]]
+        rows += [{"kind": "role", "target_id": rid} for rid in self.permissions["allowed_roles"]]
+
+        def _replace(conn):
+            self.store.permissions._sync_delete_where(conn, {})
+            self.store.permissions._sync_upsert_many(conn, rows)
+
+        await self.store.transaction(_replace)
+
+    async def on_message(self, message: discord.Message):
+        ctx = await self.pipeline.dispatch(message)
+        if ctx and ctx.deleted:
+            return
+        await self.process_commands(message)
 
     async def setup_hook(self) -> None:
+        self.loop_monitor.start()
+        self.outbound.start()
+        self.log_sink.start()
+
+        # Opening the shared database before any cog needs it
+        await self.store.open()
+        await migrate_json_files(self.store)
+        self.permissions = await self.load_permissions()
+        self.authz.load(self.permissions)
+        self.router.load()
+
         # Registering all persistent views
         self.add_view(TicketCreateView())
         self.add_view(TicketCloseView())
@@ -107,6 +102,19 @@ class MyClient(commands.Bot):
         await self.tree.sync()
         print(f'Logged in as {self.user} and all commands are synced.')
 
+    async def close(self):
+        self.loop_monitor.stop()
+        # Unload cogs while the dispatcher still runs, so their last deletes and logs go out
+        for extension in tuple(self.extensions):
+            try:
+                await self.unload_extension(extension)
+            except Exception as e:
+                print(f"Failed to unload {extension}: {e}")
+        self.log_sink.close()  # Queue buffered logs so the dispatcher drains them
+        await self.outbound.stop()  # Drain before super().close() shuts the HTTP session
+        await super().close()
+        await self.store.close()
+
 client = MyClient()
 client.run(BOT_TOKEN)
 
@@ -0,0 +1,267 @@
+# outbound.py
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable
+
+import discord
+
+# --- Configuration ---
+WORKERS = 4                      # REST calls in flight at once (one per bucket)
+PRESSURE_DEPTH = 50              # Queued jobs at which the dispatcher counts as under pressure
+SLOW_CALL_SECONDS = 1.0          # A call this slow was almost certainly held by a 429 inside discord.py
+BUCKET_COOLDOWN_SECONDS = 5.0    # Low-priority work waits this long on a rate-limited bucket
+COSMETIC_MAX_AGE_SECONDS = 120   # Cosmetic jobs older than this are dropped instead of sent
+WAIT_WINDOW = 200                # Recent queue waits kept per priority for percentiles
+DRAIN_SECONDS = 5.0              # How long stop() lets queued work finish
+
+
+class Priority(IntEnum):
+    """Lower runs first."""
+    MODERATION = 0   # Deletes and timeouts
+    REPLY = 1        # Warnings, DMs and other messages a user is waiting for
+    LOG = 2          # Log channel embeds; deferred under pressure, never dropped
+    COSMETIC = 3     # Welcome embeds, label edits; shed under pressure
+
+
+def channel_bucket(channel_id: int, route: str = "send") -> str:
+    return f"channel:{channel_id}:{route}"
+
+
+def member_bucket(guild_id: int) -> str:
+    return f"guild:{guild_id}:members"
+
+
+def dm_bucket(user_id: int) -> str:
+    return f"dm:{user_id}"
+
+
+@dataclass
+class Job:
+    priority: Priority
+    bucket: str
+    factory: Callable[[], Awaitable[Any]]
+    submitted: float
+    future: asyncio.Future | None = None   # None for fire-and-forget jobs
+
+
+@dataclass
+class Bucket:
+    in_flight: bool = False
+    cooldown_until: float = 0.0
+    parked: list[tuple[int, int, Job]] = field(default_factory=list)
+    release: asyncio.TimerHandle | None = None
+    calls: int = 0
+    rate_limited: int = 0
+
+
+@dataclass
+class PriorityStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    shed: int = 0
+    expired: int = 0
+    queued: int = 0
+    wait_max_ms: float = 0.0
+    waits: deque = field(default_factory=lambda: deque(maxlen=WAIT_WINDOW))
+
+    def wait_percentile(self, p: float) -> float:
+        if not self.waits:
+            return 0.0
+        ordered = sorted(self.waits)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class OutboundDispatcher:
+    """One queue for outgoing REST calls, drained in priority order.
+
+    Calls are grouped into route buckets (see channel_bucket & co.) and at most
+    one call per bucket is in flight, so a flood of low-value sends to one
+    channel can't starve a moderation delete elsewhere. discord.py still does
+    the actual 429 handling; a call that comes back slow (or with a 429) marks
+    its bucket as cooling, and LOG/COSMETIC work for that bucket waits it out
+    while MODERATION/REPLY work goes ahead. Under pressure, COSMETIC work is
+    shed at submit time.
+    """
+
+    def __init__(self, workers: int = WORKERS):
+        self.worker_count = workers
+        self._queue: asyncio.PriorityQueue[tuple[int, int, Job]] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._workers: list[asyncio.Task] = []
+        self.buckets: dict[str, Bucket] = {}
+        self.stats: dict[Priority, PriorityStats] = {p: PriorityStats() for p in Priority}
+        self.stopped = False
+
+    # ─────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        """Give queued work a moment to go out, then stop the workers.
+
+        From here on submit() refuses work and call() raises, and callers still
+        waiting on work that didn't make it out get the same error.
+        """
+        self.stopped = True
+        deadline = time.monotonic() + DRAIN_SECONDS
+        while self.depth and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for worker in self._workers:
+            worker.cancel()
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        for bucket in self.buckets.values():
+            if bucket.release:
+                bucket.release.cancel()
+            leftover.extend(bucket.parked)
+            bucket.parked.clear()
+        for _, _, job in leftover:
+            if job.future and not job.future.done():
+                job.future.set_exception(RuntimeError("Outbound dispatcher is stopped"))
+
+    # ─────────────────────────────────
+    # Submitting work
+    # ─────────────────────────────────
+    @property
+    def depth(self) -> int:
+        return sum(s.queued for s in self.stats.values())
+
+    @property
+    def under_pressure(self) -> bool:
+        return self.depth >= PRESSURE_DEPTH
+
+    def _enqueue(self, job: Job) -> bool:
+        if self.stopped:
+            if job.future:
+                job.future.set_exception(RuntimeError("Outbound dispatcher is stopped"))
+            return False
+        stats = self.stats[job.priority]
+        stats.submitted += 1
+        if job.priority == Priority.COSMETIC and self.under_pressure:
+            stats.shed += 1
+            return False
+        stats.queued += 1
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+        return True
+
+    def submit(self, priority: Priority, bucket: str, factory: Callable[[], Awaitable[Any]]) -> bool:
+        """Queue a fire-and-forget call; False if it was shed or the dispatcher is stopped. Failures are logged, not raised."""
+        return self._enqueue(Job(priority, bucket, factory, time.monotonic()))
+
+    async def call(self, priority: Priority, bucket: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Queue a call and wait for its result; exceptions from the call are raised here."""
+        future = asyncio.get_running_loop().create_future()
+        if not self._enqueue(Job(priority, bucket, factory, time.monotonic(), future)) and not future.done():
+            return None  # Shed
+        return await future
+
+    # ─────────────────────────────────
+    # Workers
+    # ─────────────────────────────────
+    def _requeue(self, bucket: Bucket):
+        bucket.release = None
+        for entry in bucket.parked:
+            self._queue.put_nowait(entry)
+        bucket.parked.clear()
+
+    def _release(self, bucket: Bucket):
+        """Requeue a bucket's parked work after its call finished.
+
+        MODERATION/REPLY work goes straight back on the queue; LOG/COSMETIC work
+        on a cooling bucket stays parked until the cooldown timer fires.
+        """
+        now = time.monotonic()
+        if bucket.cooldown_until <= now:
+            if bucket.release:
+                bucket.release.cancel()
+            self._requeue(bucket)
+            return
+        deferred = []
+        for entry in bucket.parked:
+            if entry[0] < Priority.LOG:
+                self._queue.put_nowait(entry)
+            else:
+                deferred.append(entry)
+        bucket.parked = deferred
+        if deferred and bucket.release is None:
+            bucket.release = asyncio.get_running_loop().call_later(
+                bucket.cooldown_until - now, self._requeue, bucket
+            )
+
+    async def _worker(self):
+        while True:
+            entry = await self._queue.get()
+            priority, _, job = entry
+            bucket = self.buckets.setdefault(job.bucket, Bucket())
+            now = time.monotonic()
+
+            # One call per bucket; low-priority work also waits out a cooldown
+            cooling = bucket.cooldown_until > now and priority >= Priority.LOG
+            if bucket.in_flight or cooling:
+                bucket.parked.append(entry)
+                if cooling and not bucket.in_flight and bucket.release is None:
+                    bucket.release = asyncio.get_running_loop().call_later(
+                        bucket.cooldown_until - now, self._requeue, bucket
+                    )
+                continue
+
+            stats = self.stats[priority]
+            stats.queued -= 1
+            if priority == Priority.COSMETIC and now - job.submitted > COSMETIC_MAX_AGE_SECONDS:
+                stats.expired += 1
+                if job.future and not job.future.done():
+                    job.future.set_result(None)
+                continue
+
+            wait_ms = (now - job.submitted) * 1000
+            stats.waits.append(wait_ms)
+            stats.wait_max_ms = max(stats.wait_max_ms, wait_ms)
+
+            bucket.in_flight = True
+            bucket.calls += 1
+            started = time.monotonic()
+            try:
+                result = await job.factory()
+            except Exception as e:
+                stats.failed += 1
+                if isinstance(e, discord.HTTPException) and e.status == 429:
+                    self._cool(bucket)
+                if job.future:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                elif not (isinstance(e, discord.NotFound) or (isinstance(e, discord.Forbidden) and job.bucket.startswith("dm:"))):
+                    # Closed DMs and already-deleted messages are routine; anything else is worth a line
+                    print(f"[Outbound] {priority.name} call on {job.bucket} failed: {e}")
+            else:
+                stats.completed += 1
+                if job.future and not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                if time.monotonic() - started >= SLOW_CALL_SECONDS:
+                    self._cool(bucket)
+                bucket.in_flight = False
+                if bucket.parked:
+                    self._release(bucket)
+                elif bucket.cooldown_until <= time.monotonic():
+                    # Idle buckets are dropped so per-user DM buckets don't pile up
+                    self.buckets.pop(job.bucket, None)
+
+    def _cool(self, bucket: Bucket):
+        bucket.rate_limited += 1
+        bucket.cooldown_until = time.monotonic() + BUCKET_COOLDOWN_SECONDS
+
+    # ─────────────────────────────────
+    # Reporting
+    # ─────────────────────────────────
+    def hot_buckets(self, limit: int = 5) -> list[tuple[str, Bucket]]:
+        now = time.monotonic()
+        hot = [(name, b) for name, b in self.buckets.items() if b.parked or b.cooldown_until > now]
+        return sorted(hot, key=lambda item: (len(item[1].parked), item[1].rate_limited), reverse=True)[:limit]
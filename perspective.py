@@ -0,0 +1,225 @@
+# perspective.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+# Point this at tools/fake_perspective.py to exercise the bot offline
+PERSPECTIVE_API_URL = os.getenv(
+    "PERSPECTIVE_API_URL", "https://commentanalyzer.googleapis.com/v1alpha1/comments:analyze"
+)
+REQUESTED_ATTRIBUTES = ("TOXICITY", "SEVERE_TOXICITY", "INSULT", "THREAT")
+REQUEST_TIMEOUT_SECONDS = 5.0
+
+CACHE_SIZE = 5000                # Scored texts kept in memory
+CACHE_TTL_SECONDS = 60 * 60      # Scores are reused for an hour
+MAX_IN_FLIGHT = 4                # Concurrent API calls (and executor threads)
+QUEUE_WAIT_SECONDS = 2.0         # Give up on a message rather than queue behind a slow API
+
+BREAKER_WINDOW = 20              # Most recent calls the breaker looks at
+BREAKER_MIN_CALLS = 10           # Calls needed in the window before it can trip
+BREAKER_ERROR_RATE = 0.5         # Trip when half the recent calls failed...
+BREAKER_SLOW_SECONDS = 2.0
+BREAKER_SLOW_RATE = 0.5          # ...or half of them took longer than BREAKER_SLOW_SECONDS
+BREAKER_COOLDOWN_SECONDS = 60    # How long to stay open before letting one probe through
+
+
+def content_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """LRU cache of Perspective scores keyed by content hash, with a TTL per entry."""
+
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, scores = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return scores
+
+    def put(self, key: str, scores: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, scores)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CircuitBreaker:
+    """Stops calling the API while it is failing or slow; callers fail open (no scores)."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self):
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=BREAKER_WINDOW)  # (failed, slow)
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN_SECONDS:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record(self, failed: bool, latency: float):
+        slow = latency > BREAKER_SLOW_SECONDS
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._open()
+            else:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append((failed, slow))
+        if self.state == self.CLOSED and len(self._outcomes) >= BREAKER_MIN_CALLS:
+            calls = len(self._outcomes)
+            errors = sum(1 for f, _ in self._outcomes if f)
+            slows = sum(1 for _, s in self._outcomes if s)
+            if errors / calls >= BREAKER_ERROR_RATE or slows / calls >= BREAKER_SLOW_RATE:
+                self._open()
+
+    def abort_probe(self):
+        """Forget a half-open probe that never reached the API, so the next call can probe."""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._outcomes.clear()
+        print(f"[Perspective] Circuit breaker opened; skipping AI moderation for {BREAKER_COOLDOWN_SECONDS}s.")
+
+
+class PerspectiveClient:
+    """Cached, rate-limited Perspective API client that never blocks moderation on API trouble.
+
+    Identical texts share one cached result (and one in-flight request), at most
+    MAX_IN_FLIGHT calls run at once on a dedicated executor, and the circuit
+    breaker skips the API entirely while it is erroring or slow.
+    """
+
+    def __init__(self, api_key: str, url: str = PERSPECTIVE_API_URL):
+        self.api_key = api_key
+        self.url = url
+        self.cache = ScoreCache()
+        self.breaker = CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="perspective")
+        self._semaphore = asyncio.BoundedSemaphore(MAX_IN_FLIGHT)
+        self._pending: dict[str, asyncio.Future] = {}
+        self.counters = {"hits": 0, "misses": 0, "shared": 0, "calls": 0, "errors": 0, "skipped_open": 0, "shed": 0}
+
+    def _request(self, text: str) -> dict:
+        body = json.dumps({
+            "comment": {"text": text},
+            "requestedAttributes": {attr: {} for attr in REQUESTED_ATTRIBUTES},
+            "languages": ["en"],
+        }).encode("utf-8")
+        request = urllib.request.Request(
+            f"{self.url}?key={self.api_key}", data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+            payload = json.loads(response.read())
+        return {attr: value["summaryScore"]["value"] for attr, value in payload.get("attributeScores", {}).items()}
+
+    async def analyze(self, text: str) -> dict:
+        """Return attribute scores for `text`, or {} when the API is unavailable."""
+        key = content_key(text)
+        scores = self.cache.get(key)
+        if scores is not None:
+            self.counters["hits"] += 1
+            return scores
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.counters["shared"] += 1
+            return await asyncio.shield(pending)
+        self.counters["misses"] += 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            scores = await self._call(text)
+            if scores:
+                self.cache.put(key, scores)
+            future.set_result(scores)
+            return scores
+        except BaseException:
+            future.set_result({})
+            raise
+        finally:
+            del self._pending[key]
+
+    async def _call(self, text: str) -> dict:
+        if not self.breaker.allow():
+            self.counters["skipped_open"] += 1
+            return {}
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=QUEUE_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            self.counters["shed"] += 1
+            # The slot never opened up, which is itself a latency signal
+            self.breaker.record(failed=False, latency=QUEUE_WAIT_SECONDS + BREAKER_SLOW_SECONDS)
+            return {}
+        except asyncio.CancelledError:
+            # Cancelled before the call: no outcome to record, but a probe must not stay claimed
+            self.breaker.abort_probe()
+            raise
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            self.counters["calls"] += 1
+            loop = asyncio.get_running_loop()
+            scores = await loop.run_in_executor(self._executor, self._request, text)
+            failed = False
+            return scores
+        except urllib.error.HTTPError as e:
+            print(f"Perspective API HTTP error: {e.code}")
+        except Exception as e:
+            print(f"An unexpected error occurred with Perspective API: {e}")
+        finally:
+            self._semaphore.release()
+            self.breaker.record(failed, time.perf_counter() - start)
+            if failed:
+                self.counters["errors"] += 1
+        return {}
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"] + self.counters["shared"]
+        return {
+            **self.counters,
+            "hit_rate": (self.counters["hits"] + self.counters["shared"]) / lookups if lookups else 0.0,
+            "cached": len(self.cache),
+            "in_flight": MAX_IN_FLIGHT - self._semaphore._value,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
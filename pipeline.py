@@ -0,0 +1,168 @@
+# pipeline.py
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Awaitable, Callable
+
+import discord
+
+from content_flags import URL_PATTERN, classify
+from outbound import OutboundDispatcher, Priority, channel_bucket
+
+# --- Stage order (lower runs first) ---
+# Moderation deletes first so nothing downstream works on a removed message,
+# and OwnerNotify runs last so it never waits on a message that was removed.
+MODERATION_STAGE = 10
+CHANNEL_POLICY_STAGE = 20
+PRIVATE_ACTIVITY_STAGE = 30
+OWNER_NOTIFY_STAGE = 40
+
+
+class MessageContext:
+    """Facts about one message, computed at most once and shared by every stage."""
+
+    def __init__(self, message: discord.Message, outbound: OutboundDispatcher | None = None, command_prefix: str = "!"):
+        self.message = message
+        self.outbound = outbound
+        self.command_prefix = command_prefix
+        self.deleted = False   # Set by delete(); later stages are skipped
+        self.stopped = False   # Set by stop(); later stages are skipped
+
+    @cached_property
+    def content_lower(self) -> str:
+        return self.message.content.lower()
+
+    @cached_property
+    def is_admin(self) -> bool:
+        author = self.message.author
+        return isinstance(author, discord.Member) and author.guild_permissions.administrator
+
+    @cached_property
+    def is_user_message(self) -> bool:
+        return self.message.type in (discord.MessageType.default, discord.MessageType.reply)
+
+    @cached_property
+    def attachment_kinds(self) -> frozenset[str]:
+        """Top-level MIME types of the attachments, e.g. {"image", "video"}."""
+        return frozenset(
+            a.content_type.split("/", 1)[0] for a in self.message.attachments if a.content_type
+        )
+
+    @property
+    def has_attachments(self) -> bool:
+        return bool(self.message.attachments)
+
+    @property
+    def has_images(self) -> bool:
+        return "image" in self.attachment_kinds
+
+    @property
+    def has_videos(self) -> bool:
+        return "video" in self.attachment_kinds
+
+    @property
+    def has_stickers(self) -> bool:
+        return bool(self.message.stickers)
+
+    @cached_property
+    def has_links(self) -> bool:
+        return bool(URL_PATTERN.search(self.message.content))
+
+    @cached_property
+    def content_flags(self) -> int:
+        """Everything the message contains as one ContentFlags bitmask (see content_flags.classify)."""
+        return classify(self.message, self.command_prefix)
+
+    @property
+    def done(self) -> bool:
+        return self.deleted or self.stopped
+
+    async def delete(self):
+        """Delete the message once; a message that is already gone counts as deleted."""
+        if self.deleted:
+            return
+        try:
+            if self.outbound:
+                await self.outbound.call(
+                    Priority.MODERATION, channel_bucket(self.message.channel.id, "delete"), self.message.delete
+                )
+            else:
+                await self.message.delete()
+        except discord.NotFound:
+            pass
+        self.deleted = True
+
+    def stop(self):
+        self.stopped = True
+
+
+@dataclass
+class Stage:
+    name: str
+    order: int
+    callback: Callable[[MessageContext], Awaitable[None]]
+    runs: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    deletes: int = 0
+
+
+@dataclass
+class PipelineStats:
+    messages: int = 0
+    short_circuited: int = 0
+    stage_calls_skipped: int = 0
+
+
+class MessagePipeline:
+    """Runs registered stages over each guild message in a fixed order.
+
+    Cogs register a stage in cog_load instead of adding their own on_message
+    listener. Bot/DM filtering happens once here, and a stage that deletes the
+    message (via ctx.delete()) or calls ctx.stop() ends the run.
+    """
+
+    def __init__(self, outbound: OutboundDispatcher | None = None, command_prefix: str = "!"):
+        self.outbound = outbound
+        self.command_prefix = command_prefix
+        self._stages: list[Stage] = []
+        self.stats = PipelineStats()
+
+    def register(self, name: str, order: int, callback: Callable[[MessageContext], Awaitable[None]]):
+        self.unregister(name)
+        self._stages.append(Stage(name, order, callback))
+        self._stages.sort(key=lambda s: s.order)
+
+    def unregister(self, name: str):
+        self._stages = [s for s in self._stages if s.name != name]
+
+    @property
+    def stages(self) -> list[Stage]:
+        return list(self._stages)
+
+    async def dispatch(self, message: discord.Message) -> MessageContext | None:
+        if message.author.bot or not message.guild:
+            return None
+
+        ctx = MessageContext(message, self.outbound, self.command_prefix)
+        self.stats.messages += 1
+        for index, stage in enumerate(self._stages):
+            if ctx.done:
+                self.stats.short_circuited += 1
+                self.stats.stage_calls_skipped += len(self._stages) - index
+                break
+            start = time.perf_counter()
+            try:
+                await stage.callback(ctx)
+            except Exception as e:
+                stage.errors += 1
+                print(f"[Pipeline] Stage '{stage.name}' failed: {e}")
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                stage.runs += 1
+                stage.total_ms += elapsed_ms
+                stage.max_ms = max(stage.max_ms, elapsed_ms)
+                if ctx.deleted:
+                    stage.deletes += 1
+        return ctx
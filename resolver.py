@@ -0,0 +1,118 @@
+# resolver.py
+import discord
+
+# Each guild keeps name -> id tables for channels, text channels, categories and
+# roles. The first object with a name wins, matching what discord.utils.get returned.
+
+
+class NameResolver:
+    """O(1) per-guild lookups of channels, categories and roles by name.
+
+    A guild's tables are built on first use and dropped whenever a channel or
+    role in that guild is created, updated or deleted, so the next lookup
+    rebuilds them. Lookups verify the cached ID still resolves to an object
+    with that name, which also covers any change the gateway did not report.
+    """
+
+    def __init__(self, client: discord.Client):
+        self.client = client
+        self._tables: dict[int, dict[str, dict[str, int]]] = {}
+        self.versions: dict[int, int] = {}  # Bumped on every invalidation of a guild
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.invalidations = 0
+
+        for event in ("on_guild_channel_create", "on_guild_channel_delete"):
+            client.add_listener(self._on_channel_event, event)
+        client.add_listener(self._on_channel_update, "on_guild_channel_update")
+        for event in ("on_guild_role_create", "on_guild_role_delete"):
+            client.add_listener(self._on_role_event, event)
+        client.add_listener(self._on_role_update, "on_guild_role_update")
+        client.add_listener(self._on_guild_remove, "on_guild_remove")
+
+    # ─────────────────────────────────
+    # Table maintenance
+    # ─────────────────────────────────
+    def _build(self, guild: discord.Guild) -> dict[str, dict[str, int]]:
+        sources = {
+            "channels": guild.channels,
+            "text_channels": guild.text_channels,
+            "categories": guild.categories,
+            "roles": guild.roles,
+        }
+        tables = {}
+        for kind, objects in sources.items():
+            table: dict[str, int] = {}
+            for obj in objects:
+                table.setdefault(obj.name, obj.id)
+            tables[kind] = table
+        self._tables[guild.id] = tables
+        self.rebuilds += 1
+        return tables
+
+    def invalidate(self, guild_id: int):
+        if self._tables.pop(guild_id, None) is not None:
+            self.invalidations += 1
+        self.versions[guild_id] = self.versions.get(guild_id, 0) + 1
+
+    async def _on_channel_event(self, channel: discord.abc.GuildChannel):
+        self.invalidate(channel.guild.id)
+
+    async def _on_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if before.name != after.name or before.type != after.type:
+            self.invalidate(after.guild.id)
+
+    async def _on_role_event(self, role: discord.Role):
+        self.invalidate(role.guild.id)
+
+    async def _on_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            self.invalidate(after.guild.id)
+
+    async def _on_guild_remove(self, guild: discord.Guild):
+        self._tables.pop(guild.id, None)
+
+    # ─────────────────────────────────
+    # Lookups
+    # ─────────────────────────────────
+    def _resolve(self, guild: discord.Guild, kind: str, name: str):
+        getter = guild.get_role if kind == "roles" else guild.get_channel
+        tables = self._tables.get(guild.id) or self._build(guild)
+        object_id = tables[kind].get(name)
+        if object_id is not None:
+            obj = getter(object_id)
+            if obj is not None and obj.name == name:
+                self.hits += 1
+                return obj
+            # Stale entry (missed event); rebuild once and retry
+            tables = self._build(guild)
+            object_id = tables[kind].get(name)
+            if object_id is not None:
+                self.hits += 1
+                return getter(object_id)
+        self.misses += 1
+        return None
+
+    def channel(self, guild: discord.Guild, name: str) -> discord.abc.GuildChannel | None:
+        return self._resolve(guild, "channels", name)
+
+    def text_channel(self, guild: discord.Guild, name: str) -> discord.TextChannel | None:
+        return self._resolve(guild, "text_channels", name)
+
+    def category(self, guild: discord.Guild, name: str) -> discord.CategoryChannel | None:
+        return self._resolve(guild, "categories", name)
+
+    def role(self, guild: discord.Guild, name: str) -> discord.Role | None:
+        return self._resolve(guild, "roles", name)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "rebuilds": self.rebuilds,
+            "invalidations": self.invalidations,
+            "guilds_cached": len(self._tables),
+        }
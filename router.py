@@ -0,0 +1,167 @@
+# router.py
+import json
+from collections import Counter
+from dataclasses import dataclass
+
+import discord
+from discord import app_commands
+
+from utils import is_authorized
+
+ROUTING_FILEPATH = "routing.json"
+ANYWHERE = "*"
+
+
+@dataclass(frozen=True)
+class RoutingConfig:
+    """routing.json, validated.
+
+    channel_groups: group name -> channel IDs and/or channel names
+    default:        group(s) for commands not listed in `commands`, or "*"
+    exclusive:      groups whose channels only accept the commands routed to them
+    commands:       top-level command name -> group(s), or "*" for anywhere
+    """
+    channel_groups: dict[str, tuple[int | str, ...]]
+    default: tuple[str, ...] | None
+    exclusive: tuple[str, ...]
+    commands: dict[str, tuple[str, ...] | None]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RoutingConfig":
+        groups = {name: tuple(refs) for name, refs in data.get("channel_groups", {}).items()}
+
+        def targets(value, where: str) -> tuple[str, ...] | None:
+            if value == ANYWHERE:
+                return None
+            names = (value,) if isinstance(value, str) else tuple(value)
+            unknown = [n for n in names if n not in groups]
+            if unknown:
+                raise ValueError(f"{where} refers to unknown channel group(s): {', '.join(unknown)}")
+            return names
+
+        exclusive = tuple(data.get("exclusive", []))
+        unknown = [n for n in exclusive if n not in groups]
+        if unknown:
+            raise ValueError(f"exclusive refers to unknown channel group(s): {', '.join(unknown)}")
+
+        return cls(
+            channel_groups=groups,
+            default=targets(data.get("default", ANYWHERE), "default"),
+            exclusive=exclusive,
+            commands={name: targets(value, f"command '{name}'") for name, value in data.get("commands", {}).items()},
+        )
+
+    @classmethod
+    def load(cls, filepath: str = ROUTING_FILEPATH) -> "RoutingConfig":
+        with open(filepath, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass(frozen=True)
+class CompiledRoutes:
+    """A guild's routing table: channel references resolved to ID sets."""
+    commands: dict[str, frozenset[int] | None]
+    default: frozenset[int] | None
+    exclusive: dict[int, frozenset[str]]  # channel ID -> the only commands allowed there
+
+
+class InteractionRouter:
+    """Decides which channels each slash command may be used in.
+
+    The config is compiled per guild into plain dicts (names resolved via
+    client.resolver) and recompiled only when the config is reloaded or the
+    guild's channels change, so a check is a couple of dict lookups.
+    """
+
+    def __init__(self, client: discord.Client, filepath: str = ROUTING_FILEPATH):
+        self.client = client
+        self.filepath = filepath
+        self.config = RoutingConfig({}, None, (), {})
+        self.config_version = 0
+        self._compiled: dict[int, tuple[int, int, CompiledRoutes]] = {}
+        self.passed: Counter[str] = Counter()
+        self.rejected: Counter[str] = Counter()
+
+    def load(self):
+        """(Re)load routing.json; on error the current table stays in place and the error is raised."""
+        self.config = RoutingConfig.load(self.filepath)
+        self.config_version += 1
+        self._compiled = {}
+
+    def _resolve_group(self, guild: discord.Guild, group: str) -> frozenset[int]:
+        ids = set()
+        for ref in self.config.channel_groups[group]:
+            if isinstance(ref, int):
+                ids.add(ref)
+            else:
+                channel = self.client.resolver.channel(guild, ref)
+                if channel:
+                    ids.add(channel.id)
+        return frozenset(ids)
+
+    def _compile(self, guild: discord.Guild) -> CompiledRoutes:
+        groups = {name: self._resolve_group(guild, name) for name in self.config.channel_groups}
+
+        def channels(targets):
+            return None if targets is None else frozenset().union(*(groups[g] for g in targets))
+
+        exclusive: dict[int, set[str]] = {}
+        for group in self.config.exclusive:
+            routed_here = {name for name, targets in self.config.commands.items() if targets and group in targets}
+            for channel_id in groups[group]:
+                exclusive.setdefault(channel_id, set()).update(routed_here)
+
+        return CompiledRoutes(
+            commands={name: channels(targets) for name, targets in self.config.commands.items()},
+            default=channels(self.config.default),
+            exclusive={cid: frozenset(names) for cid, names in exclusive.items()},
+        )
+
+    def routes_for(self, guild: discord.Guild) -> CompiledRoutes:
+        resolver_version = self.client.resolver.versions.get(guild.id, 0)
+        cached = self._compiled.get(guild.id)
+        if cached and cached[0] == self.config_version and cached[1] == resolver_version:
+            return cached[2]
+        routes = self._compile(guild)
+        self._compiled[guild.id] = (self.config_version, resolver_version, routes)
+        return routes
+
+    def check(self, interaction: discord.Interaction) -> str | None:
+        """Return None if the command may run in this channel, else the rejection message."""
+        if interaction.guild is None:
+            return None
+        name = interaction.data.get("name")
+        channel_id = interaction.channel_id
+        routes = self.routes_for(interaction.guild)
+
+        only_here = routes.exclusive.get(channel_id)
+        if only_here is not None and name not in only_here:
+            self.rejected[name] += 1
+            commands = ", ".join(f"`/{n}`" for n in sorted(only_here))
+            return f"❌ Only {commands} can be used in <#{channel_id}>."
+
+        allowed = routes.commands.get(name, routes.default)
+        if allowed is None or channel_id in allowed:
+            self.passed[name] += 1
+            return None
+
+        self.rejected[name] += 1
+        if not allowed:
+            return f"❌ The `/{name}` command's channel has not been set up."
+        channels = ", ".join(f"<#{cid}>" for cid in sorted(allowed))
+        return f"❌ The `/{name}` command can only be used in {channels}."
+
+
+class RoutedCommandTree(app_commands.CommandTree):
+    """Command tree that applies the channel routing table before any command runs."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type != discord.InteractionType.application_command:
+            return True
+        if is_authorized(interaction):
+            return True
+        rejection = self.client.router.check(interaction)
+        if rejection is None:
+            return True
+        await interaction.response.send_message(rejection, ephemeral=True)
+        return False
@@ -0,0 +1,449 @@
+# storage.py
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+DB_FILEPATH = "startupbd.db"
+
+# ─────────────────────────────────────────────────
+# Schema
+# ─────────────────────────────────────────────────
+# Every table is declared as (primary key, columns). INTEGER and TEXT map
+# straight to SQLite; JSON columns are stored as TEXT and decoded on read.
+SCHEMA = {
+    "profiles": ("user_id", {
+        "user_id": "INTEGER",
+        "name": "TEXT",
+        "skills": "TEXT",
+        "portfolio": "TEXT",
+        "experience": "TEXT",
+        "certification": "TEXT",
+    }),
+    "private_rooms": ("channel_id", {
+        "channel_id": "INTEGER",
+        "owner_id": "INTEGER",
+        "type": "TEXT",
+        "members": "JSON",
+        "status": "TEXT",
+        "created_at": "TEXT",
+        "last_activity": "TEXT",
+    }),
+    "channel_policies": ("channel_id", {
+        "channel_id": "INTEGER",
+        "modes": "JSON",
+        "notify": "TEXT",
+        "custom_allowed": "JSON",
+        "set_by": "INTEGER",
+        "set_at": "TEXT",
+    }),
+    "founders": ("user_id", {
+        "user_id": "INTEGER",
+    }),
+    "showcases": ("id", {
+        "id": "INTEGER",
+        "founder_id": "INTEGER",
+        "name": "TEXT",
+        "tagline": "TEXT",
+        "category": "TEXT",
+        "link": "TEXT",
+        "description": "TEXT",
+        "message_id": "INTEGER",
+        "channel_id": "INTEGER",
+        "thread_id": "INTEGER",
+        "created_at": "TEXT",
+    }),
+    "showcase_upvotes": (("showcase_id", "user_id"), {
+        "showcase_id": "INTEGER",
+        "user_id": "INTEGER",
+        "voted_at": "TEXT",
+    }),
+    "permissions": (("kind", "target_id"), {
+        "kind": "TEXT",
+        "target_id": "INTEGER",
+    }),
+    "tickets": (("guild_id", "user_id"), {
+        "guild_id": "INTEGER",
+        "user_id": "INTEGER",
+        "channel_id": "INTEGER",
+        "reason": "TEXT",
+        "created_at": "TEXT",
+    }),
+    "deals": ("deal_number", {
+        "deal_number": "INTEGER",
+        "buyer_id": "INTEGER",
+        "seller_id": "INTEGER",
+        "channel_id": "INTEGER",
+        "status": "TEXT",
+        "registered_by": "INTEGER",
+        "created_at": "TEXT",
+        "updated_at": "TEXT",
+    }),
+    "deal_status_history": (("deal_number", "seq"), {
+        "deal_number": "INTEGER",
+        "seq": "INTEGER",
+        "status": "TEXT",
+        "details": "TEXT",
+        "updated_by": "INTEGER",
+        "updated_at": "TEXT",
+    }),
+    "retention_policies": ("channel_id", {
+        "channel_id": "INTEGER",
+        "guild_id": "INTEGER",
+        "max_age_hours": "INTEGER",
+        "max_count": "INTEGER",
+        "set_by": "INTEGER",
+        "set_at": "TEXT",
+    }),
+    "retention_progress": ("channel_id", {
+        "channel_id": "INTEGER",
+        "cursor_id": "INTEGER",
+        "deleted": "INTEGER",
+        "bulk_requests": "INTEGER",
+        "single_deletes": "INTEGER",
+        "busy_ms": "INTEGER",
+        "last_pass_at": "TEXT",
+    }),
+    "counters": ("name", {
+        "name": "TEXT",
+        "value": "INTEGER",
+    }),
+    "meta": ("key", {
+        "key": "TEXT",
+        "value": "TEXT",
+    }),
+}
+
+# (table, column, unique)
+INDEXES = [
+    ("showcases", "message_id", True),
+    ("showcases", "founder_id", False),
+    ("private_rooms", "owner_id", False),
+    ("tickets", "channel_id", True),
+]
+
+# Tables that only index state rebuilt from Discord on startup. If their key
+# changes they are dropped and recreated rather than migrated.
+REBUILT_ON_STARTUP = {"tickets"}  # TicketSystem re-adopts open tickets from channel topics
+
+
+def _quote(name: str) -> str:
+    return f'"{name}"'
+
+
+class Table:
+    """Keyed access to one table of the store. All methods run on the store thread."""
+
+    def __init__(self, store: "Store", name: str, key, columns: dict):
+        self.store = store
+        self.name = name
+        self.key = (key,) if isinstance(key, str) else tuple(key)
+        self.columns = columns
+        self._json_columns = {c for c, t in columns.items() if t == "JSON"}
+
+    # ── Encoding ──────────────────────────────────
+    def _encode(self, row: dict) -> dict:
+        return {
+            c: json.dumps(v) if c in self._json_columns and v is not None else v
+            for c, v in row.items() if c in self.columns
+        }
+
+    def _decode(self, row: sqlite3.Row | None) -> dict | None:
+        if row is None:
+            return None
+        data = dict(row)
+        for c in self._json_columns:
+            if data.get(c) is not None:
+                data[c] = json.loads(data[c])
+        return data
+
+    def _key_clause(self, key: tuple) -> tuple[str, tuple]:
+        if len(key) != len(self.key):
+            raise ValueError(f"{self.name} is keyed by {self.key}, got {key!r}")
+        return " AND ".join(f"{_quote(c)} = ?" for c in self.key), key
+
+    @staticmethod
+    def _where_clause(where: dict) -> tuple[str, tuple]:
+        if not where:
+            return "", ()
+        return " WHERE " + " AND ".join(f"{_quote(c)} = ?" for c in where), tuple(where.values())
+
+    # ── Sync implementations (store thread) ───────
+    def _upsert_sql(self, columns: list[str]) -> str:
+        cols = ", ".join(_quote(c) for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        updates = [c for c in columns if c not in self.key]
+        conflict = ", ".join(_quote(c) for c in self.key)
+        if updates:
+            action = "DO UPDATE SET " + ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in updates)
+        else:
+            action = "DO NOTHING"
+        return f"INSERT INTO {_quote(self.name)} ({cols}) VALUES ({marks}) ON CONFLICT ({conflict}) {action}"
+
+    def _sync_get(self, conn: sqlite3.Connection, key: tuple) -> dict | None:
+        clause, params = self._key_clause(key)
+        cur = conn.execute(f"SELECT * FROM {_quote(self.name)} WHERE {clause}", params)
+        return self._decode(cur.fetchone())
+
+    def _sync_all(self, conn: sqlite3.Connection, where: dict) -> list[dict]:
+        clause, params = self._where_clause(where)
+        cur = conn.execute(f"SELECT * FROM {_quote(self.name)}{clause}", params)
+        return [self._decode(r) for r in cur.fetchall()]
+
+    def _sync_count(self, conn: sqlite3.Connection, where: dict) -> int:
+        clause, params = self._where_clause(where)
+        cur = conn.execute(f"SELECT COUNT(*) FROM {_quote(self.name)}{clause}", params)
+        return cur.fetchone()[0]
+
+    def _sync_upsert_many(self, conn: sqlite3.Connection, rows: list[dict]):
+        by_shape: dict[tuple, list[tuple]] = {}
+        for row in rows:
+            encoded = self._encode(row)
+            by_shape.setdefault(tuple(encoded), []).append(tuple(encoded.values()))
+        for columns, values in by_shape.items():
+            conn.executemany(self._upsert_sql(list(columns)), values)
+
+    def _sync_update(self, conn: sqlite3.Connection, key: tuple, fields: dict) -> bool:
+        encoded = self._encode(fields)
+        if not encoded:
+            return False
+        clause, params = self._key_clause(key)
+        sets = ", ".join(f"{_quote(c)} = ?" for c in encoded)
+        cur = conn.execute(
+            f"UPDATE {_quote(self.name)} SET {sets} WHERE {clause}",
+            tuple(encoded.values()) + params,
+        )
+        return cur.rowcount > 0
+
+    def _sync_delete(self, conn: sqlite3.Connection, key: tuple) -> bool:
+        clause, params = self._key_clause(key)
+        cur = conn.execute(f"DELETE FROM {_quote(self.name)} WHERE {clause}", params)
+        return cur.rowcount > 0
+
+    def _sync_delete_where(self, conn: sqlite3.Connection, where: dict) -> int:
+        clause, params = self._where_clause(where)
+        cur = conn.execute(f"DELETE FROM {_quote(self.name)}{clause}", params)
+        return cur.rowcount
+
+    # ── Async API ─────────────────────────────────
+    async def get(self, *key) -> dict | None:
+        return await self.store.read(self._sync_get, key)
+
+    async def all(self, **where) -> list[dict]:
+        return await self.store.read(self._sync_all, where)
+
+    async def count(self, **where) -> int:
+        return await self.store.read(self._sync_count, where)
+
+    async def upsert(self, row: dict):
+        await self.store.transaction(self._sync_upsert_many, [row])
+
+    async def upsert_many(self, rows: list[dict]):
+        if rows:
+            await self.store.transaction(self._sync_upsert_many, list(rows))
+
+    async def update(self, *key, **fields) -> bool:
+        return await self.store.transaction(self._sync_update, key, fields)
+
+    async def delete(self, *key) -> bool:
+        return await self.store.transaction(self._sync_delete, key)
+
+    async def delete_where(self, **where) -> int:
+        return await self.store.transaction(self._sync_delete_where, where)
+
+
+class Store:
+    """SQLite (WAL) storage shared by every cog.
+
+    The connection lives on a single worker thread, so calls are serialised
+    in submission order and never block the event loop.
+    """
+
+    def __init__(self, filepath: str = DB_FILEPATH):
+        self.filepath = filepath
+        self._conn: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self.tables: dict[str, Table] = {}
+        for name, (key, columns) in SCHEMA.items():
+            table = Table(self, name, key, columns)
+            self.tables[name] = table
+            setattr(self, name, table)
+
+    # ─────────────────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────────────────
+    async def open(self):
+        if self._conn is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store")
+        await self._submit(self._sync_open)
+
+    async def close(self):
+        if self._conn is None:
+            return
+        await self._submit(self._sync_close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _sync_open(self):
+        conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            for name in REBUILT_ON_STARTUP:
+                key = SCHEMA[name][0]
+                key = (key,) if isinstance(key, str) else key
+                info = conn.execute(f"PRAGMA table_info({_quote(name)})").fetchall()
+                existing = tuple(r["name"] for r in sorted(info, key=lambda r: r["pk"]) if r["pk"])
+                if existing and existing != tuple(key):
+                    conn.execute(f"DROP TABLE {_quote(name)}")
+            for name, (key, columns) in SCHEMA.items():
+                key = (key,) if isinstance(key, str) else key
+                cols = ", ".join(
+                    f"{_quote(c)} {'TEXT' if t == 'JSON' else t}" for c, t in columns.items()
+                )
+                pk = ", ".join(_quote(c) for c in key)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(name)} ({cols}, PRIMARY KEY ({pk}))")
+            for table, column, unique in INDEXES:
+                conn.execute(
+                    f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+                    f"{_quote(f'idx_{table}_{column}')} ON {_quote(table)} ({_quote(column)})"
+                )
+        self._conn = conn
+
+    def _sync_close(self):
+        self._conn.close()
+        self._conn = None
+
+    # ─────────────────────────────────────────────
+    # Execution helpers
+    # ─────────────────────────────────────────────
+    def _submit(self, fn, *args):
+        if self._executor is None:
+            raise RuntimeError("Store is not open.")
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def _sync_read(self, fn, *args):
+        return fn(self._conn, *args)
+
+    def _sync_transaction(self, fn, *args):
+        with self._conn:
+            return fn(self._conn, *args)
+
+    async def read(self, fn, *args):
+        """Run ``fn(conn, *args)`` on the store thread."""
+        return await self._submit(self._sync_read, fn, *args)
+
+    async def transaction(self, fn, *args):
+        """Run ``fn(conn, *args)`` on the store thread inside one transaction."""
+        return await self._submit(self._sync_transaction, fn, *args)
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> list[dict]:
+        def _fetch(conn):
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+        return await self.read(_fetch)
+
+    async def execute(self, sql: str, params: tuple = ()):
+        await self.transaction(lambda conn: conn.execute(sql, params))
+
+    # ─────────────────────────────────────────────
+    # Counters
+    # ─────────────────────────────────────────────
+    @staticmethod
+    def _sync_next_value(conn: sqlite3.Connection, name: str) -> int:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+        return conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+
+    async def next_value(self, name: str) -> int:
+        """Atomically increment a named counter and return the new value."""
+        return await self.transaction(self._sync_next_value, name)
+
+
+# ─────────────────────────────────────────────────
+# One-shot migration from the legacy JSON files
+# ─────────────────────────────────────────────────
+def _read_json(filepath: str):
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+
+def _import_profiles(store: Store, conn: sqlite3.Connection, data: dict):
+    rows = [{"user_id": int(uid), **profile} for uid, profile in data.items()]
+    store.profiles._sync_upsert_many(conn, rows)
+    return len(rows)
+
+
+def _import_private_channels(store: Store, conn: sqlite3.Connection, data: dict):
+    rows = list(data.get("rooms", {}).values())
+    store.private_rooms._sync_upsert_many(conn, rows)
+    return len(rows)
+
+
+def _import_channel_policies(store: Store, conn: sqlite3.Connection, data: dict):
+    rows = [{"channel_id": int(cid), **policy} for cid, policy in data.get("policies", {}).items()]
+    store.channel_policies._sync_upsert_many(conn, rows)
+    store.founders._sync_upsert_many(conn, [{"user_id": fid} for fid in data.get("founders", [])])
+    return len(rows)
+
+
+def _import_showcases(store: Store, conn: sqlite3.Connection, data: dict):
+    showcases = list(data.get("showcases", {}).values())
+    store.showcases._sync_upsert_many(conn, showcases)
+    votes = [
+        {"showcase_id": s["id"], "user_id": uid, "voted_at": s.get("created_at")}
+        for s in showcases for uid in s.get("upvotes", [])
+    ]
+    store.showcase_upvotes._sync_upsert_many(conn, votes)
+    store.counters._sync_upsert_many(conn, [{"name": "showcase_id", "value": data.get("next_id", 1) - 1}])
+    return len(showcases)
+
+
+def _import_punishment_cases(store: Store, conn: sqlite3.Connection, data: dict):
+    store.counters._sync_upsert_many(conn, [{"name": "case_number", "value": data.get("case_number", 0)}])
+    return 1
+
+
+def _import_permissions(store: Store, conn: sqlite3.Connection, data: dict):
+    rows = [{"kind": "user", "target_id": uid} for uid in data.get("allowed_users", [])]
+    rows += [{"kind": "role", "target_id": rid} for rid in data.get("allowed_roles", [])]
+    store.permissions._sync_upsert_many(conn, rows)
+    return len(rows)
+
+
+LEGACY_JSON_FILES = [
+    ("profiles.json", _import_profiles),
+    ("private_channels.json", _import_private_channels),
+    ("channel_policies.json", _import_channel_policies),
+    ("startups_showcase.json", _import_showcases),
+    ("punishment_cases.json", _import_punishment_cases),
+    ("permissions.json", _import_permissions),
+]
+
+
+async def migrate_json_files(store: Store):
+    """Import every legacy JSON file once. The files are left untouched as a backup."""
+    for filepath, importer in LEGACY_JSON_FILES:
+        flag = f"migrated:{filepath}"
+        if await store.meta.get(flag) or not os.path.exists(filepath):
+            continue
+        try:
+            data = await asyncio.to_thread(_read_json, filepath)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[Storage] Skipping migration of {filepath}: {e}")
+            continue
+
+        def _migrate(conn, data=data, importer=importer, flag=flag):
+            count = importer(store, conn, data)
+            store.meta._sync_upsert_many(conn, [{"key": flag, "value": "1"}])
+            return count
+
+        count = await store.transaction(_migrate)
+        print(f"[Storage] Migrated {count} record(s) from {filepath}.")
@@ -0,0 +1,82 @@
+# tools/fake_perspective.py
+"""Local stand-in for the Perspective comments:analyze endpoint.
+
+Run it, then start the bot with
+    PERSPECTIVE_API_URL=http://127.0.0.1:8765/v1alpha1/comments:analyze
+(any PERSPECTIVE_API_KEY works). Scores are deterministic: each word from
+TOXIC_WORDS raises TOXICITY and INSULT, and "kill"/"hurt" raise THREAT.
+--latency and --error-rate simulate a slow or failing API so the cache,
+concurrency limit and circuit breaker in perspective.py can be exercised.
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOXIC_WORDS = {"idiot", "stupid", "loser", "trash", "dumb"}
+THREAT_WORDS = {"kill", "hurt"}
+
+
+def score(text: str) -> dict:
+    words = text.lower().split()
+    toxic = sum(1 for w in words if w in TOXIC_WORDS)
+    threat = sum(1 for w in words if w in THREAT_WORDS)
+    values = {
+        "TOXICITY": min(0.1 + 0.3 * toxic, 0.99),
+        "SEVERE_TOXICITY": min(0.05 + 0.2 * toxic, 0.99),
+        "INSULT": min(0.1 + 0.3 * toxic, 0.99),
+        "THREAT": min(0.05 + 0.5 * threat, 0.99),
+    }
+    return {attr: {"summaryScore": {"value": value, "type": "PROBABILITY"}} for attr, value in values.items()}
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    requests = 0
+
+    def do_POST(self):
+        Handler.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            self.send_error(503, "Simulated Perspective outage")
+            return
+        text = body.get("comment", {}).get("text", "")
+        requested = body.get("requestedAttributes") or {}
+        scores = {attr: value for attr, value in score(text).items() if not requested or attr in requested}
+        payload = json.dumps({"attributeScores": scores, "languages": ["en"]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        print(f"[FakePerspective] #{Handler.requests} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    args = parser.parse_args()
+
+    Handler.latency = args.latency
+    Handler.error_rate = args.error_rate
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Fake Perspective listening on http://{args.host}:{args.port}/v1alpha1/comments:analyze")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# transcripts.py
+import datetime
+import gzip
+import html
+import io
+import json
+import tempfile
+
+import discord
+
+# --- Configuration ---
+SPOOL_MAX_BYTES = 1024 * 1024   # Each output stays in memory up to 1 MB, then spills to a temp file
+EMBED_TEXT_LIMIT = 200          # Characters of an embed description kept in the summary
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+HTML_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body{{font-family:sans-serif;background:#313338;color:#dbdee1;margin:24px}}
+.m{{margin:6px 0}}.t{{color:#949ba4;font-size:12px}}.a{{font-weight:bold;color:#f2f3f5}}
+.e{{color:#949ba4;font-size:12px;margin-left:8px}}.x{{border-left:3px solid #5865f2;padding-left:8px;margin:4px 0 4px 16px}}
+a{{color:#00a8fc}}
+</style></head><body><h2>{title}</h2>
+"""
+HTML_TAIL = "</body></html>\n"
+
+
+def _embed_summary(embed: discord.Embed) -> str:
+    parts = [embed.title or "", (embed.description or "")[:EMBED_TEXT_LIMIT]]
+    parts += [f"{field.name}: {field.value}"[:EMBED_TEXT_LIMIT] for field in embed.fields]
+    return " | ".join(p for p in parts if p) or "(empty embed)"
+
+
+class TranscriptExport:
+    """A channel transcript as gzip text + gzip HTML on spooled temp files, plus a JSON index."""
+
+    def __init__(self, channel_name: str):
+        self.channel_name = channel_name
+        self.text = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        self.html = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        self._text_gz = io.TextIOWrapper(gzip.GzipFile(fileobj=self.text, mode="wb"), encoding="utf-8")
+        self._html_gz = io.TextIOWrapper(gzip.GzipFile(fileobj=self.html, mode="wb"), encoding="utf-8")
+        self._html_gz.write(HTML_HEAD.format(title=html.escape(f"#{channel_name}")))
+        self.index = {
+            "channel": channel_name,
+            "messages": 0,
+            "attachments": 0,
+            "embeds": 0,
+            "edited": 0,
+            "first_message_at": None,
+            "last_message_at": None,
+            "participants": {},  # user ID -> {"name", "messages"}
+        }
+
+    def add(self, message: discord.Message):
+        created = message.created_at.strftime(TIME_FORMAT)
+        edited = message.edited_at.strftime(TIME_FORMAT) if message.edited_at else None
+        author = message.author
+
+        # --- Plain text ---
+        line = f"[{created}] {author.name}: {message.content}"
+        if edited:
+            line += f" (edited {edited})"
+        lines = [line]
+        lines += [f"    📎 {a.filename} ({a.size} bytes) {a.url}" for a in message.attachments]
+        lines += [f"    🧩 Embed: {_embed_summary(e)}" for e in message.embeds]
+        lines += [f"    🏷️ Sticker: {s.name}" for s in message.stickers]
+        self._text_gz.write("\n".join(lines) + "\n")
+
+        # --- HTML ---
+        parts = [
+            f'<div class="m"><span class="t">{created}</span> <span class="a">{html.escape(author.name)}</span> ',
+            html.escape(message.content).replace("\n", "<br>"),
+        ]
+        if edited:
+            parts.append(f'<span class="e">(edited {edited})</span>')
+        for a in message.attachments:
+            parts.append(f'<div class="x">📎 <a href="{html.escape(a.url)}">{html.escape(a.filename)}</a> ({a.size} bytes)</div>')
+        for e in message.embeds:
+            parts.append(f'<div class="x">{html.escape(_embed_summary(e))}</div>')
+        for s in message.stickers:
+            parts.append(f'<div class="x">🏷️ {html.escape(s.name)}</div>')
+        parts.append("</div>\n")
+        self._html_gz.write("".join(parts))
+
+        # --- Index ---
+        index = self.index
+        index["messages"] += 1
+        index["attachments"] += len(message.attachments)
+        index["embeds"] += len(message.embeds)
+        index["edited"] += 1 if edited else 0
+        index["first_message_at"] = index["first_message_at"] or message.created_at.isoformat()
+        index["last_message_at"] = message.created_at.isoformat()
+        participant = index["participants"].setdefault(str(author.id), {"name": author.name, "messages": 0})
+        participant["messages"] += 1
+
+    def finish(self):
+        self._html_gz.write(HTML_TAIL)
+        # Closing the wrappers flushes the gzip trailers; the spooled files stay open
+        for wrapper in (self._text_gz, self._html_gz):
+            wrapper.flush()
+            wrapper.detach().close()
+        self.text.seek(0)
+        self.html.seek(0)
+
+    @staticmethod
+    def _size(fp) -> int:
+        fp.seek(0, io.SEEK_END)
+        size = fp.tell()
+        fp.seek(0)
+        return size
+
+    def files(self, size_limit: int) -> list[discord.File]:
+        """The transcript files for upload; any output larger than `size_limit` is left out."""
+        base = f"{self.channel_name}-transcript"
+        index_bytes = json.dumps(self.index, separators=(",", ":")).encode("utf-8")
+        files = [discord.File(io.BytesIO(index_bytes), filename=f"{base}.json")]
+        for fp, filename in ((self.text, f"{base}.txt.gz"), (self.html, f"{base}.html.gz")):
+            if self._size(fp) <= size_limit:
+                files.append(discord.File(fp, filename=filename))
+            else:
+                print(f"[Transcripts] {filename} exceeds the upload limit and was skipped.")
+        return files
+
+    def close(self):
+        self.text.close()
+        self.html.close()
+
+
+async def export_transcript(channel: discord.TextChannel) -> TranscriptExport:
+    """Stream the whole channel history into a TranscriptExport, one message at a time."""
+    export = TranscriptExport(channel.name)
+    try:
+        async for message in channel.history(limit=None, oldest_first=True):
+            export.add(message)
+        export.index["exported_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        export.finish()
+    except BaseException:
+        export.close()
+        raise
+    return export